@@ -0,0 +1,101 @@
+#benchmarks/ladder_engine_benchmark.py
+
+import os
+import random
+import sys
+import time
+
+# Allow running as "python benchmarks/ladder_engine_benchmark.py" from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ladder_engine import DivisionLadder
+
+"""
+Benchmark for the ladder engine.
+
+Builds in memory divisions of several sizes, up to 100k
+teams, and measures the average time the rules take to
+plan and apply a batch of random challenges, match reports,
+manual moves, removals and registrations. Nothing touches
+the disk, so this is the cost of the rules alone.
+
+Usage:
+    python benchmarks/ladder_engine_benchmark.py
+"""
+
+DIVISION_SIZES = (1000, 10000, 100000)
+
+DIVISION_TYPE = '1v1'
+
+OPERATIONS_PER_SIZE = 1000
+
+def measure(ladder: DivisionLadder, operation_count: int, plan):
+    """
+    Plans and applies operation_count changes made by plan(ladder, rng)
+    and returns the average microseconds per change
+    """
+    rng = random.Random(operation_count)
+    start = time.perf_counter()
+
+    for _ in range(operation_count):
+        ladder.apply(plan(ladder, rng))
+
+    return (time.perf_counter() - start) * 1000000 / operation_count
+
+def plan_report_win(ladder: DivisionLadder, rng: random.Random):
+    """
+    A random team beats a team within its challenge window
+    """
+    challenger_rank = rng.randint(3, len(ladder))
+    challenged_rank = challenger_rank - rng.randint(1, 2)
+    return ladder.plan_match(ladder.team_at(challenger_rank), ladder.team_at(challenged_rank), challenger_won=True)
+
+def plan_set_rank(ladder: DivisionLadder, rng: random.Random):
+    """
+    An Admin moves a random team to a random rank
+    """
+    return ladder.plan_move(ladder.team_at(rng.randint(1, len(ladder))), rng.randint(1, len(ladder)))
+
+def plan_remove_and_register(ladder: DivisionLadder, rng: random.Random):
+    """
+    A random team leaves and comes back at the bottom,
+    keeping the division the same size
+    """
+    team_name = ladder.team_at(rng.randint(1, len(ladder)))
+    ladder.apply(ladder.plan_remove(team_name))
+    return ladder.plan_register(team_name)
+
+def measure_reads(ladder: DivisionLadder, operation_count: int):
+    """
+    Returns the average microseconds of a rank-of, a
+    team-at and a challenge window check together
+    """
+    rng = random.Random(operation_count)
+    team_names = [ladder.team_at(rng.randint(3, len(ladder))) for _ in range(operation_count)]
+    start = time.perf_counter()
+
+    for team_name in team_names:
+        rank = ladder.rank_of(team_name)
+        ladder.can_challenge(team_name, ladder.team_at(rank - 2))
+
+    return (time.perf_counter() - start) * 1000000 / operation_count
+
+def run_benchmark():
+    print(f"{'Teams':>7} | {'Operation':<24} | {'us/op':>10}")
+    print("-" * 48)
+
+    for team_count in DIVISION_SIZES:
+        ladder = DivisionLadder(DIVISION_TYPE, [f"Team{rank}" for rank in range(1, team_count + 1)])
+
+        results = [
+            ("report win (in window)", measure(ladder, OPERATIONS_PER_SIZE, plan_report_win)),
+            ("set rank (random)", measure(ladder, OPERATIONS_PER_SIZE, plan_set_rank)),
+            ("remove + register", measure(ladder, OPERATIONS_PER_SIZE, plan_remove_and_register)),
+            ("rank of + window check", measure_reads(ladder, OPERATIONS_PER_SIZE))
+        ]
+
+        for operation, microseconds in results:
+            print(f"{team_count:>7} | {operation:<24} | {microseconds:>10.2f}")
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,117 @@
+#benchmarks/rankings_benchmark.py
+
+import os
+import sys
+import tempfile
+import time
+
+# Allow running as "python benchmarks/rankings_benchmark.py" from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import initialize_database, set_database_path, close_all_connections, get_connection, transaction, db_update_rankings, db_apply_rank_diff, db_materialize_ranks, db_set_rank_mode
+from ladder_engine import DivisionLadder
+from config import VALID_RANK_MODES
+
+"""
+Benchmark for the rank maintenance functions.
+
+Builds a throwaway database for several division sizes and
+measures the statements run, rows written and time taken
+by a match report near the top of the ladder, manual rank
+moves and a team removal, in every rank mode. The cost should
+stay flat as the division grows instead of scaling with its
+size. In the dense mode the rank column is written afterwards
+in one batch by db_materialize_ranks, measured last, in the
+sparse mode a move only ever writes the moved team.
+
+Usage:
+    python benchmarks/rankings_benchmark.py
+"""
+
+DIVISION_SIZES = (100, 1000, 2000, 10000)
+
+DIVISION_TYPE = '1v1'
+
+def fill_division(team_count: int):
+    """
+    Bulk INSERT's team_count teams ranked 1 to team_count
+    """
+    with transaction() as cursor:
+        cursor.executemany(
+        "INSERT INTO teams (team_name, division, rank, wins, losses, win_streak, lose_streak) VALUES (?, ?, ?, 0, 0, 0, 0)",
+        [(f"Team{rank}", DIVISION_TYPE, rank) for rank in range(1, team_count + 1)]
+        )
+
+def measure(func, *args):
+    """
+    Runs func and returns how many statements it
+    executed, how many rows it changed and how long it took
+    """
+    conn = get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+
+    changes_before = conn.total_changes
+    start = time.perf_counter()
+    func(*args)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    conn.set_trace_callback(None)
+
+    # BEGIN and COMMIT are not real work
+    statement_count = len([s for s in statements if s not in ("BEGIN IMMEDIATE", "COMMIT")])
+    return statement_count, conn.total_changes - changes_before, elapsed_ms
+
+def run_benchmark():
+    print(f"{'Teams':>7} | {'Mode':<6} | {'Operation':<22} | {'Statements':>10} | {'Rows':>6} | {'ms':>8}")
+    print("-" * 75)
+
+    for team_count in DIVISION_SIZES:
+        for rank_mode in VALID_RANK_MODES:
+            run_division(team_count, rank_mode)
+
+def run_division(team_count: int, rank_mode: str):
+    """
+    Measures every operation on a new division of
+    team_count teams stored in the given rank mode
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        set_database_path(os.path.join(temp_dir, 'benchmark.db'))
+        initialize_database()
+        fill_division(team_count)
+        db_set_rank_mode(DIVISION_TYPE, rank_mode)
+
+        # The ladder engine plans each change, only persisting it is measured
+        ladder = DivisionLadder(DIVISION_TYPE, [f"Team{rank}" for rank in range(1, team_count + 1)])
+        results = []
+
+        # Rank 5 challenges and beats rank 3
+        rank_diff = ladder.plan_match("Team5", "Team3", challenger_won=True)
+        results.append(("report win (5 beats 3)", measure(db_update_rankings, DIVISION_TYPE, "Team5", "Team3", rank_diff)))
+        ladder.apply(rank_diff)
+
+        # Admin moves rank 10 up to rank 8
+        rank_diff = ladder.plan_move("Team10", 8)
+        results.append(("set rank (10 -> 8)", measure(db_apply_rank_diff, DIVISION_TYPE, rank_diff)))
+        ladder.apply(rank_diff)
+
+        # Admin moves the bottom team to the top, passing every other team
+        rank_diff = ladder.plan_move(ladder.team_at(team_count), 1)
+        results.append(("set rank (bottom -> 1)", measure(db_apply_rank_diff, DIVISION_TYPE, rank_diff)))
+        ladder.apply(rank_diff)
+
+        # Remove a team near the bottom
+        rank_diff = ladder.plan_remove(f"Team{team_count - 1}")
+        results.append(("remove team (bottom)", measure(db_apply_rank_diff, DIVISION_TYPE, rank_diff)))
+        ladder.apply(rank_diff)
+
+        # Write the logged changes to the rank column
+        results.append(("materialize ranks", measure(db_materialize_ranks)))
+
+        for operation, (statement_count, rows_changed, elapsed_ms) in results:
+            print(f"{team_count:>7} | {rank_mode:<6} | {operation:<22} | {statement_count:>10} | {rows_changed:>6} | {elapsed_ms:>8.3f}")
+
+        close_all_connections()
+
+if __name__ == '__main__':
+    run_benchmark()
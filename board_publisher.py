@@ -0,0 +1,84 @@
+import asyncio
+
+from config import BOARD_PUBLISH_DEBOUNCE_SECONDS
+
+from logs.logger import logger
+
+class BoardPublisher:
+    """
+    Keeps the standings, challenges and teams boards
+    up to date by reacting to changes instead of polling.
+
+    Whenever the ladder state changes a board-changed event
+    for the division and board is put on a queue. One task
+    reads the queue, waits a short debounce so a burst of
+    changes (a reported match changes the standings and
+    the challenges) turns into a single edit per board,
+    then publishes only the boards that were changed.
+    """
+    def __init__(self, publish_board, debounce_seconds: float = BOARD_PUBLISH_DEBOUNCE_SECONDS):
+        """
+        Constructs the BoardPublisher
+
+        Args:
+            publish_board: Coroutine function called as publish_board(division_type, board, force)
+                that edits the board into its channel.
+            debounce_seconds (float): How long to wait for more events before publishing.
+        """
+        self.publish_board = publish_board
+        self.debounce_seconds = debounce_seconds
+
+        # (division_type, board, force) events waiting to be published
+        self.queue = asyncio.Queue()
+        self.task = None
+
+    def start(self):
+        """
+        Starts the publisher task if it is not running
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """
+        Stops the publisher task
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def notify(self, division_type: str, *boards: str, force: bool = False):
+        """
+        Emits a board-changed event for each board given.
+        force publishes the board even if it looks up to date.
+        """
+        for board in boards:
+            self.queue.put_nowait((division_type, board, force))
+
+    def drain(self, pending: dict):
+        """
+        Moves every event already on the queue into
+        pending, merging repeats of the same board
+        """
+        while not self.queue.empty():
+            division_type, board, force = self.queue.get_nowait()
+            pending[(division_type, board)] = pending.get((division_type, board), False) or force
+
+    async def run(self):
+        """
+        Waits for events, debounces them and
+        publishes each changed board once
+        """
+        while True:
+            division_type, board, force = await self.queue.get()
+            pending = {(division_type, board): force}
+
+            # Let the rest of the burst arrive
+            await asyncio.sleep(self.debounce_seconds)
+            self.drain(pending)
+
+            for (division_type, board), force in pending.items():
+                try:
+                    await self.publish_board(division_type, board, force)
+                except Exception as e:
+                    logger.error(f'BoardPublisher: Failed to publish the {board} board for the {division_type} division. Error: {e}')
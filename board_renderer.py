@@ -0,0 +1,92 @@
+import hashlib
+
+from utils import join_board, split_board_rows, get_standings_header, format_standings_row, get_challenges_header, format_challenges_row, get_teams_header, format_teams_row
+
+# board -> (function returning the board's (title, table_header), function formatting one row)
+BOARD_FORMATS = {
+    'standings': (get_standings_header, format_standings_row),
+    'challenges': (get_challenges_header, format_challenges_row),
+    'teams': (get_teams_header, format_teams_row)
+}
+
+class BoardRenderer:
+    """
+    Renders the boards into pages, keeping every formatted row
+    and every page between refreshes.
+
+    Rows are cached by their first column (the team name, or
+    the challenger team on the challenges board) together with
+    the data they were formatted from, so a refresh only formats
+    the rows whose rank, record, members or opponent changed.
+    Pages are cached with the rows they were joined from, so a
+    page is only joined and hashed again when one of its rows
+    changed, moved to another page or it gained the footer.
+    """
+    def __init__(self):
+        """
+        Constructs an empty BoardRenderer
+        """
+        # (division_type, board) -> {row key: (row data, formatted row)}
+        self.rows = {}
+
+        # (division_type, board) -> [((title, rows, footer), page_text, content_hash)] of the last render
+        self.pages = {}
+
+        # Counters of the work saved by the caches
+        self.formatted_row_count = 0
+        self.reused_row_count = 0
+        self.rendered_page_count = 0
+        self.reused_page_count = 0
+
+    def render(self, division_type: str, board: str, raw_data, footer: str = ""):
+        """
+        Returns the (page_text, content_hash) of every page of the
+        division's board from the same rows the database returns
+        for it, with the footer at the end of the last page
+        """
+        key = (division_type, board)
+        get_header, format_row = BOARD_FORMATS[board]
+        title, table_header = get_header(division_type)
+
+        # Reuse every row whose data has not changed, dropping rows no longer on the board
+        cached_rows = self.rows.get(key, {})
+        board_rows = {}
+        rows = []
+
+        for row_data in raw_data:
+            row_key = row_data[0]
+            cached_row = cached_rows.get(row_key)
+
+            if cached_row is not None and cached_row[0] == row_data:
+                row_text = cached_row[1]
+                self.reused_row_count += 1
+            else:
+                row_text = format_row(*row_data)
+                self.formatted_row_count += 1
+
+            board_rows[row_key] = (row_data, row_text)
+            rows.append(row_text)
+
+        self.rows[key] = board_rows
+
+        # Reuse every page made of the same rows as last time
+        cached_pages = self.pages.get(key, [])
+        board_pages = []
+        pages_rows = split_board_rows(title, table_header, rows, footer)
+
+        for page, page_rows in enumerate(pages_rows):
+            page_key = (title if page == 0 else "", tuple(page_rows), footer if page == len(pages_rows) - 1 else "")
+
+            if page < len(cached_pages) and cached_pages[page][0] == page_key:
+                board_pages.append(cached_pages[page])
+                self.reused_page_count += 1
+                continue
+
+            page_title, page_rows, page_footer = page_key
+            page_text = join_board(page_title, table_header, list(page_rows), page_footer)
+            board_pages.append((page_key, page_text, hashlib.sha256(page_text.encode()).hexdigest()))
+            self.rendered_page_count += 1
+
+        self.pages[key] = board_pages
+
+        return [(page_text, content_hash) for page_key, page_text, content_hash in board_pages]
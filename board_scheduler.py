@@ -0,0 +1,237 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+
+from config import BOARD_EDIT_RATE_LIMIT, BOARD_EDIT_RATE_PERIOD_SECONDS
+
+from logs.logger import logger
+
+# Edits for boards earlier in this order go first, players act on the challenges board
+BOARD_PRIORITIES = {'challenges': 0, 'standings': 1, 'teams': 2}
+
+class BoardScheduler:
+    """
+    Owns every board edit sent to Discord.
+
+    Edits wait in a priority queue, edits for changed boards
+    before safety resyncs and then in board priority order.
+    Only the latest pages of each board are kept, so a board
+    that changes again while its edit is waiting is sent once
+    with the newest pages. Every channel has a rate limit bucket
+    and every request to a channel waits for its bucket instead
+    of bursting into Discord's rate limit, where discord.py
+    would sleep and hold every other board back.
+    """
+    def __init__(self, edit_board, rate_limit: int = BOARD_EDIT_RATE_LIMIT, rate_period_seconds: float = BOARD_EDIT_RATE_PERIOD_SECONDS):
+        """
+        Constructs the BoardScheduler
+
+        Args:
+            edit_board: Coroutine function called as edit_board(division_type, board, channel, board_pages, board_version, resync)
+                that puts the board's (page_text, content_hash) pages into the channel, calling acquire_channel
+                before every request.
+            rate_limit (int): How many requests a channel may get within rate_period_seconds.
+            rate_period_seconds (float): The length of a channel's rate limit window.
+        """
+        self.edit_board = edit_board
+        self.rate_limit = rate_limit
+        self.rate_period_seconds = rate_period_seconds
+
+        # (division_type, board) -> the edit waiting to be sent for that board's messages
+        self.pending = {}
+
+        # (priority, sequence, (division_type, board)) entries, an entry whose sequence no longer matches its pending edit is stale
+        self.queue = []
+        self.sequence = 0
+
+        # channel_id -> times of the requests sent to the channel within the rate limit window
+        self.channel_edit_times = {}
+
+        # Set whenever an edit is submitted so a waiting run loop looks again
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+        # Counters reported by get_stats
+        self.submitted_count = 0
+        self.coalesced_count = 0
+        self.sent_count = 0
+        self.failed_count = 0
+        self.rate_limited_count = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def start(self):
+        """
+        Starts the scheduler task if it is not running
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """
+        Stops the scheduler task
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def submit(self, division_type: str, board: str, channel, board_pages: list, board_version: int, resync: bool = False):
+        """
+        Queues an edit of a board's pages. If an edit of the same
+        board is already waiting it is given the new pages and keeps
+        its place in the queue. resync edits go after change edits.
+        """
+        key = (division_type, board)
+        priority = (1 if resync else 0, BOARD_PRIORITIES.get(board, len(BOARD_PRIORITIES)))
+        self.submitted_count += 1
+
+        edit = self.pending.get(key)
+        if edit is not None:
+            # Coalesce, only the newest pages for the messages are sent
+            self.coalesced_count += 1
+            edit['channel'] = channel
+            edit['board_pages'] = board_pages
+            edit['board_version'] = board_version
+            edit['resync'] = edit['resync'] or resync
+            if priority >= edit['priority']:
+                return
+        else:
+            edit = {
+                'division_type': division_type,
+                'board': board,
+                'channel': channel,
+                'board_pages': board_pages,
+                'board_version': board_version,
+                'resync': resync,
+                'queued_at': time.monotonic()
+            }
+            self.pending[key] = edit
+
+        # Queue the edit, a coalesced edit that moved up leaves a stale entry behind
+        self.sequence += 1
+        edit['priority'] = priority
+        edit['sequence'] = self.sequence
+        heapq.heappush(self.queue, (priority, self.sequence, key))
+
+        self.max_queue_depth = max(self.max_queue_depth, len(self.pending))
+        self.wakeup.set()
+
+    def get_channel_wait(self, channel_id: int, now: float):
+        """
+        Returns how many seconds until the
+        channel's bucket allows another request
+        """
+        edit_times = self.channel_edit_times.get(channel_id)
+        if not edit_times:
+            return 0
+
+        # Forget requests that left the window
+        while edit_times and now - edit_times[0] >= self.rate_period_seconds:
+            edit_times.popleft()
+
+        if len(edit_times) < self.rate_limit:
+            return 0
+        return edit_times[0] + self.rate_period_seconds - now
+
+    async def acquire_channel(self, channel_id: int):
+        """
+        Waits until the channel's bucket allows another
+        request and takes a place in it, called by
+        edit_board before every request to the channel
+        """
+        while True:
+            now = time.monotonic()
+            channel_wait = self.get_channel_wait(channel_id, now)
+            if channel_wait <= 0:
+                self.channel_edit_times.setdefault(channel_id, deque()).append(now)
+                return
+
+            self.rate_limited_count += 1
+            await asyncio.sleep(channel_wait)
+
+    def next_edit(self, now: float):
+        """
+        Takes the highest priority edit whose channel can be
+        edited now off the queue. Returns (edit, None), or
+        (None, seconds until a waiting edit's channel allows
+        it) with None seconds when the queue is empty.
+        """
+        blocked = []
+        wait = None
+        edit = None
+
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            priority, sequence, key = entry
+
+            candidate = self.pending.get(key)
+            if candidate is None or candidate['sequence'] != sequence:
+                continue
+
+            channel_wait = self.get_channel_wait(candidate['channel'].id, now)
+            if channel_wait <= 0:
+                edit = candidate
+                del self.pending[key]
+                break
+
+            blocked.append(entry)
+            wait = channel_wait if wait is None else min(wait, channel_wait)
+
+        # Edits held back by their channel keep their place
+        for entry in blocked:
+            heapq.heappush(self.queue, entry)
+
+        return edit, wait
+
+    async def run(self):
+        """
+        Sends the queued edits one at a time, starting an
+        edit only once its channel's bucket has room
+        """
+        while True:
+            edit, wait = self.next_edit(time.monotonic())
+
+            if edit is None:
+                if wait is not None:
+                    self.rate_limited_count += 1
+
+                # Sleep until something is submitted or a channel's bucket refills
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            wait_seconds = time.monotonic() - edit['queued_at']
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+            try:
+                await self.edit_board(edit['division_type'], edit['board'], edit['channel'], edit['board_pages'], edit['board_version'], edit['resync'])
+                self.sent_count += 1
+            except Exception as e:
+                self.failed_count += 1
+                logger.error(f"BoardScheduler: Failed to edit the {edit['board']} board for the {edit['division_type']} division. Error: {e}")
+
+    def get_stats(self):
+        """
+        Returns the queue depth and wait time counters
+        """
+        now = time.monotonic()
+        edit_count = self.sent_count + self.failed_count
+
+        return {
+            'queue_depth': len(self.pending),
+            'max_queue_depth': self.max_queue_depth,
+            'oldest_wait_seconds': max((now - edit['queued_at'] for edit in self.pending.values()), default=0.0),
+            'average_wait_seconds': self.total_wait_seconds / edit_count if edit_count else 0.0,
+            'max_wait_seconds': self.max_wait_seconds,
+            'submitted': self.submitted_count,
+            'coalesced': self.coalesced_count,
+            'sent': self.sent_count,
+            'failed': self.failed_count,
+            'rate_limited': self.rate_limited_count
+        }
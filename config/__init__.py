@@ -1,3 +1,3 @@
-from .settings import LADDERBOT_DB, VALID_DIVISION_TYPES
+from .settings import LADDERBOT_DB, VALID_DIVISION_TYPES, SQLITE_PERFORMANCE_PROFILE, BOARD_PUBLISH_DEBOUNCE_SECONDS, BOARD_RESYNC_MINUTES, RANK_MATERIALIZE_SECONDS, VALID_RANK_MODES, RANK_KEY_GAP, RANK_KEY_REBALANCE_GAP, BOARD_PAGE_CHARACTER_LIMIT, BOARD_EDIT_RATE_LIMIT, BOARD_EDIT_RATE_PERIOD_SECONDS, NOTIFICATION_MAX_CONCURRENCY, NOTIFICATION_MAX_ATTEMPTS, NOTIFICATION_RETRY_BACKOFF_SECONDS, NOTIFICATION_OUTBOX_BATCH_SIZE
 
-__all__ = ['LADDERBOT_DB', 'VALID_DIVISION_TYPES']
\ No newline at end of file
+__all__ = ['LADDERBOT_DB', 'VALID_DIVISION_TYPES', 'SQLITE_PERFORMANCE_PROFILE', 'BOARD_PUBLISH_DEBOUNCE_SECONDS', 'BOARD_RESYNC_MINUTES', 'RANK_MATERIALIZE_SECONDS', 'VALID_RANK_MODES', 'RANK_KEY_GAP', 'RANK_KEY_REBALANCE_GAP', 'BOARD_PAGE_CHARACTER_LIMIT', 'BOARD_EDIT_RATE_LIMIT', 'BOARD_EDIT_RATE_PERIOD_SECONDS', 'NOTIFICATION_MAX_CONCURRENCY', 'NOTIFICATION_MAX_ATTEMPTS', 'NOTIFICATION_RETRY_BACKOFF_SECONDS', 'NOTIFICATION_OUTBOX_BATCH_SIZE']
@@ -2,4 +2,57 @@
 
 LADDERBOT_DB = 'database/ladderbot.db'
 
-VALID_DIVISION_TYPES = ('1v1', '2v2', '3v3')
\ No newline at end of file
+VALID_DIVISION_TYPES = ('1v1', '2v2', '3v3')
+
+# SQLite performance profile applied to every database connection.
+# Tune these for the hardware the bot is running on.
+SQLITE_PERFORMANCE_PROFILE = {
+    # WAL lets the board refreshes keep reading while a match report is writing
+    'journal_mode': 'WAL',
+    # NORMAL only fsyncs at WAL checkpoints, FULL fsyncs on every commit
+    'synchronous': 'NORMAL',
+    # Negative values are in KiB, so this is a 16 MB page cache per connection
+    'cache_size': -16000,
+    # Bytes of the database file to memory map, 0 turns it off
+    'mmap_size': 268435456,
+    # Keep temporary tables and indexes used by sorting in memory
+    'temp_store': 'MEMORY'
+}
+
+# How long the board publisher waits after a board changes before editing it,
+# so a burst of changes (like a reported match) becomes a single edit
+BOARD_PUBLISH_DEBOUNCE_SECONDS = 2
+
+# How often every board is republished in case a message was deleted or an edit failed
+BOARD_RESYNC_MINUTES = 10
+
+# How often the rank changes logged by commands are written to the teams rank column
+# and crowded sparse rank keys are spread out again
+RANK_MATERIALIZE_SECONDS = 30
+
+# How each division stores ranks. 'dense' keeps the rank itself in the rank column,
+# 'sparse' keeps a sortable rank_key with gaps so a move only rewrites the moved team
+VALID_RANK_MODES = ('dense', 'sparse')
+
+# The gap left between neighbouring sparse rank keys when they are spread out,
+# and the smallest gap allowed before the division's keys are spread out again
+RANK_KEY_GAP = 1048576
+RANK_KEY_REBALANCE_GAP = 64
+
+# Discord rejects messages longer than this, larger boards are split into pages of at most this many characters
+BOARD_PAGE_CHARACTER_LIMIT = 2000
+
+# Discord rate limits edits per channel, the board scheduler lets each
+# channel have at most this many board edits within the period
+BOARD_EDIT_RATE_LIMIT = 5
+BOARD_EDIT_RATE_PERIOD_SECONDS = 5
+
+# Challenge notifications are sent as direct messages in the background,
+# at most this many at once, and a failed message is retried with a backoff
+# that starts at NOTIFICATION_RETRY_BACKOFF_SECONDS and doubles every attempt
+NOTIFICATION_MAX_CONCURRENCY = 5
+NOTIFICATION_MAX_ATTEMPTS = 3
+NOTIFICATION_RETRY_BACKOFF_SECONDS = 2
+
+# How many notifications the dispatcher reads from the outbox table at a time
+NOTIFICATION_OUTBOX_BATCH_SIZE = 50
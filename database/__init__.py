@@ -1,8 +1,13 @@
 # Import specific functions or classes to be accessible at the package level
-from .database_setup import initialize_database
-from .team_management import count_teams, is_team_name_unique, is_member_registered, is_member_on_team, does_team_exist, give_team_rank, check_team_division, db_register_team, db_remove_team, db_update_rankings, db_set_rank, add_team_wins_losses, subtract_team_wins_losses, get_wins_or_losses, get_standings_data, get_team_members, db_clear_all_teams, get_teams_data
-from .challenge_management import find_opponent_team, is_team_challenged, has_team_challenged, db_register_challenge, db_remove_challenge, remove_challenge, get_challenges_data, db_clear_all_challenges
-from .state_management import is_ladder_running, set_ladder_running, db_set_standings_channel, db_set_challenges_channel, is_standings_channel_set, get_standings_channel_id, is_challenges_channel_set, get_challenges_channel_id, db_clear_standings_channel, db_clear_challenges_channel, db_set_teams_channel, db_clear_teams_channel, is_teams_channel_set, get_teams_channel_id
-from .member_management import is_member_in_members_table, increment_all_teams_count, add_division_win, add_division_loss, db_register_member, get_player_stats, increment_participation_count
+from .connection import get_connection, transaction, call_after_commit, close_all_connections, set_database_path
+from .async_access import run_db, shutdown_db_executor
+from .database_setup import initialize_database, check_performance_profile
+from .team_management import StaleRankDiffError, count_teams, is_team_name_unique, is_member_registered, is_member_on_team, does_team_exist, give_team_rank, check_team_division, db_register_team, db_apply_rank_diff, db_materialize_ranks, db_rebalance_rank_keys, db_set_rank_mode, db_update_rankings, add_team_wins_losses, subtract_team_wins_losses, get_wins_or_losses, get_standings_data, get_team_members, db_clear_all_teams, get_teams_data, get_all_teams_data, get_all_rank_changes_data, replay_rank_changes, get_all_team_members_data
+from .challenge_management import find_opponent_team, is_team_challenged, has_team_challenged, db_register_challenge, db_remove_challenge, remove_challenge, remove_match_challenge, get_challenges_data, get_all_challenges_data, db_clear_all_challenges
+from .state_management import get_states, invalidate_states, get_rank_mode, is_ladder_running, set_ladder_running, db_set_standings_channel, db_set_challenges_channel, is_standings_channel_set, get_standings_channel_id, is_challenges_channel_set, get_challenges_channel_id, db_clear_standings_channel, db_clear_challenges_channel, db_set_teams_channel, db_clear_teams_channel, is_teams_channel_set, get_teams_channel_id
+from .outbox_management import db_enqueue_notifications, get_due_notifications, get_next_notification_attempt_at, db_record_notification_results
+from .board_message_management import get_board_pages, db_set_board_page, db_delete_board_pages
+from .match_reporting import db_report_match
+from .member_management import is_member_in_members_table, increment_all_teams_count, add_division_win, add_division_loss, db_register_member, get_player_stats, increment_participation_count, get_registered_member_ids, increment_all_teams_counts, add_division_wins_losses, db_register_members
 
-__all__ = ['initialize_database', 'set_ladder_running', 'count_teams', 'is_team_name_unique', 'db_register_team', 'is_member_registered', 'db_remove_team', 'db_update_rankings', 'does_team_exist', 'is_team_challenged', 'has_team_challenged', 'give_team_rank', 'find_opponent_team', 'db_register_challenge', 'db_remove_challenge', 'check_team_division', 'is_member_on_team', 'add_team_wins_losses', 'remove_challenge', 'db_set_rank', 'is_ladder_running', 'subtract_team_wins_losses', 'get_wins_or_losses', 'get_standings_data', 'get_challenges_data', 'db_set_standings_channel', 'db_set_challenges_channel', 'is_standings_channel_set', 'get_standings_channel_id', 'is_challenges_channel_set', 'get_challenges_channel_id', 'db_clear_standings_channel', 'db_clear_challenges_channel', 'get_team_members', 'db_clear_all_challenges', 'db_clear_all_teams', 'get_teams_data', 'db_set_teams_channel', 'db_clear_teams_channel', 'is_teams_channel_set', 'get_teams_channel_id', 'is_member_in_members_table', 'db_register_member', 'increment_all_teams_count', 'add_division_win', 'add_division_loss', 'get_player_stats', 'increment_participation_count']
+__all__ = ['get_connection', 'transaction', 'call_after_commit', 'close_all_connections', 'set_database_path', 'run_db', 'shutdown_db_executor', 'initialize_database', 'check_performance_profile', 'set_ladder_running', 'StaleRankDiffError', 'count_teams', 'is_team_name_unique', 'db_register_team', 'is_member_registered', 'db_apply_rank_diff', 'db_materialize_ranks', 'db_rebalance_rank_keys', 'db_set_rank_mode', 'db_update_rankings', 'does_team_exist', 'is_team_challenged', 'has_team_challenged', 'give_team_rank', 'find_opponent_team', 'db_register_challenge', 'db_remove_challenge', 'check_team_division', 'is_member_on_team', 'add_team_wins_losses', 'remove_challenge', 'remove_match_challenge', 'get_states', 'invalidate_states', 'get_rank_mode', 'is_ladder_running', 'subtract_team_wins_losses', 'get_wins_or_losses', 'get_standings_data', 'get_challenges_data', 'get_all_challenges_data', 'db_set_standings_channel', 'db_set_challenges_channel', 'is_standings_channel_set', 'get_standings_channel_id', 'is_challenges_channel_set', 'get_challenges_channel_id', 'db_clear_standings_channel', 'db_clear_challenges_channel', 'get_team_members', 'db_clear_all_challenges', 'db_clear_all_teams', 'get_teams_data', 'get_all_teams_data', 'get_all_rank_changes_data', 'replay_rank_changes', 'get_all_team_members_data', 'db_set_teams_channel', 'db_clear_teams_channel', 'is_teams_channel_set', 'get_teams_channel_id', 'is_member_in_members_table', 'db_register_member', 'increment_all_teams_count', 'add_division_win', 'add_division_loss', 'get_player_stats', 'get_board_pages', 'db_set_board_page', 'db_delete_board_pages', 'db_enqueue_notifications', 'get_due_notifications', 'get_next_notification_attempt_at', 'db_record_notification_results', 'db_report_match', 'increment_participation_count', 'get_registered_member_ids', 'increment_all_teams_counts', 'add_division_wins_losses', 'db_register_members']
@@ -0,0 +1,40 @@
+#database/async_access.py
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .connection import close_all_connections
+
+"""
+Awaitable access to the database for the
+LadderManager coroutines. Every call is run on
+one dedicated database thread so the discord.py
+event loop never waits on disk I/O. Once the bot
+has started the LadderManager sends every database
+call through run_db, so its writes are serialized
+on that thread instead of the event loop waiting
+on the SQLite write lock held by it.
+"""
+
+# The single thread every awaited database call runs on
+db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ladderbot-db')
+
+async def run_db(func, *args, **kwargs):
+    """
+    Runs a synchronous database function on the
+    database thread and returns its result
+
+    Example:
+        rank = await run_db(give_team_rank, '1v1', 'Alpha')
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """
+    Waits for queued database calls to finish,
+    then closes the connections and the thread
+    """
+    db_executor.submit(close_all_connections).result()
+    db_executor.shutdown(wait=True)
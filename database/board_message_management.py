@@ -0,0 +1,43 @@
+from .connection import get_connection, transaction
+
+"""
+The messages that show each division's boards. A board
+too long for one Discord message is split into pages and
+every page has its own message, stored with a hash of the
+content it was last edited to so unchanged pages are skipped.
+"""
+
+def get_board_pages(division_type: str, board: str):
+    """
+    Returns the (page, message_id, content_hash) of every
+    stored message of the division's board, in page order
+    """
+    cursor = get_connection().cursor()
+
+    cursor.execute('''
+    SELECT page, message_id, content_hash
+    FROM board_messages
+    WHERE division = ? AND board = ?
+    ORDER BY page
+    ''', (division_type, board))
+    return cursor.fetchall()
+
+def db_set_board_page(division_type: str, board: str, page: int, message_id: int, content_hash: str):
+    """
+    Stores the message showing one page of the division's
+    board and the hash of the content it now shows
+    """
+    with transaction() as cursor:
+        cursor.execute('''
+        INSERT INTO board_messages (division, board, page, message_id, content_hash)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (division, board, page) DO UPDATE SET message_id = excluded.message_id, content_hash = excluded.content_hash
+        ''', (division_type, board, page, message_id, content_hash))
+
+def db_delete_board_pages(division_type: str, board: str, from_page: int = 0):
+    """
+    Forgets the stored messages of the division's
+    board from the given page onwards
+    """
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM board_messages WHERE division = ? AND board = ? AND page >= ?", (division_type, board, from_page))
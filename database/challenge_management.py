@@ -1,32 +1,28 @@
-import sqlite3
-from config import LADDERBOT_DB
+from .connection import get_connection, transaction
+from .outbox_management import db_enqueue_notifications
 
-def connect_db():
-    return sqlite3.connect(LADDERBOT_DB)
+# Subquery used to turn a team name in a division into its teams.id
+TEAM_ID_QUERY = "SELECT id FROM teams WHERE team_name = ? AND division = ?"
 
 def find_opponent_team(division_type: str, opponent_team: str):
     """
     Finds who a team is facing in a match within
     the given division type
     """
-
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Variable to hold correct challenges location
-    table_name = f'challenges_{division_type}'
+    cursor = get_connection().cursor()
 
     # Query to find the opponent
     cursor.execute(f'''
-    SELECT challenger, challenged
-    FROM {table_name}
-    WHERE challenger = ? OR challenged = ?
-    ''', (opponent_team, opponent_team))
+    SELECT challenger.team_name, challenged.team_name
+    FROM challenges
+    JOIN teams AS challenger ON challenger.id = challenges.challenger_id
+    JOIN teams AS challenged ON challenged.id = challenges.challenged_id
+    WHERE challenges.challenger_id = ({TEAM_ID_QUERY})
+    OR challenges.challenged_id = ({TEAM_ID_QUERY})
+    ''', (opponent_team, division_type, opponent_team, division_type))
 
     match = cursor.fetchone()
 
-    conn.close()
-
     if match:
         # Determine the opponent team based on which team is the given team
         if match[0] == opponent_team:
@@ -43,26 +39,11 @@ def is_team_challenged(division_type: str, team_name: str):
     and therefore cannot be challenged by another team
     until their 'pending' status has resolved
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    if division_type == '1v1':
-        cursor.execute("SELECT COUNT(*) FROM challenges_1v1 WHERE challenged = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    
-    if division_type == '2v2':
-        cursor.execute("SELECT COUNT(*) FROM challenges_2v2 WHERE challenged = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    
-    if division_type == '3v3':
-        cursor.execute("SELECT COUNT(*) FROM challenges_3v3 WHERE challenged = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+    cursor = get_connection().cursor()
+
+    cursor.execute(f"SELECT COUNT(*) FROM challenges WHERE challenged_id = ({TEAM_ID_QUERY})", (team_name, division_type))
+    count = cursor.fetchone()[0]
+    return count > 0
 
 def has_team_challenged(division_type: str, team_name: str):
     """
@@ -71,26 +52,11 @@ def has_team_challenged(division_type: str, team_name: str):
     and therefore cannot send out another until their
     'pending' challenge has resolved
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    if division_type == '1v1':
-        cursor.execute("SELECT COUNT(*) FROM challenges_1v1 WHERE challenger = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    
-    if division_type == '2v2':
-        cursor.execute("SELECT COUNT(*) FROM challenges_2v2 WHERE challenger = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    
-    if division_type == '3v3':
-        cursor.execute("SELECT COUNT(*) FROM challenges_3v3 WHERE challenger = ?", (team_name,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+    cursor = get_connection().cursor()
+
+    cursor.execute(f"SELECT COUNT(*) FROM challenges WHERE challenger_id = ({TEAM_ID_QUERY})", (team_name, division_type))
+    count = cursor.fetchone()[0]
+    return count > 0
 
 def get_challenges_data(division_type: str):
     """
@@ -98,118 +64,95 @@ def get_challenges_data(division_type: str):
     division type to then format for
     post_challenges method
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Pick correct challenges table
-    table_name = f"challenges_{division_type}"
+    cursor = get_connection().cursor()
 
     # Fetch the current challenges for division type
-    cursor.execute(f"SELECT challenger, challenged FROM {table_name} ORDER BY id ASC")
+    cursor.execute('''
+    SELECT challenger.team_name, challenged.team_name
+    FROM challenges
+    JOIN teams AS challenger ON challenger.id = challenges.challenger_id
+    JOIN teams AS challenged ON challenged.id = challenges.challenged_id
+    WHERE challenges.division = ?
+    ORDER BY challenges.id ASC
+    ''', (division_type,))
     challenges = cursor.fetchall()
-    conn.close()
 
     # Return raw data to be used in helper function to format neatly
     return challenges
 
-def db_register_challenge(division_type: str, challenger_team: str, challenged_team: str):
-    """
-    INSERT's given data into the correct division table and also
-    uses the challenger's team name as the match_id
-    """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Status string to add to row
-    status = 'pending'
-
-    # If challenge is a 1v1
-    if division_type == '1v1':
-        cursor.execute('''
-        INSERT INTO challenges_1v1 (match_id, challenger, challenged, status)
-        VALUES (?, ?, ?, ?)
-''', (challenger_team, challenger_team, challenged_team, status))
-        
-        conn.commit()
-        conn.close()
-    
-    # If challenge is a 2v2
-    if division_type == '2v2':
-        cursor.execute('''
-        INSERT INTO challenges_2v2 (match_id, challenger, challenged, status)
-        VALUES (?, ?, ?, ?)
-''', (challenger_team, challenger_team, challenged_team, status))
-        
-        conn.commit()
-        conn.close()
-    
-    # If challenge is a 3v3
-    if division_type == '3v3':
-        cursor.execute('''
-        INSERT INTO challenges_3v3 (match_id, challenger, challenged, status)
-        VALUES (?, ?, ?, ?)
-''', (challenger_team, challenger_team, challenged_team, status))
-        
-        conn.commit()
-        conn.close()
-
-def db_remove_challenge(division_type: str, challenger_team: str):
+def get_all_challenges_data():
     """
-    Removes a challenge some specific team
-    in a specific division
+    Grabs every open challenge across all
+    divisions in the order they were made
     """
+    cursor = get_connection().cursor()
 
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor.execute('''
+    SELECT challenges.division, challenger.team_name, challenged.team_name, challenges.created_at
+    FROM challenges
+    JOIN teams AS challenger ON challenger.id = challenges.challenger_id
+    JOIN teams AS challenged ON challenged.id = challenges.challenged_id
+    ORDER BY challenges.id ASC
+    ''')
+    challenges = cursor.fetchall()
 
-    # If division type is 1v1
-    if division_type == '1v1':
-        cursor.execute("DELETE FROM challenges_1v1 WHERE match_id = ?", (challenger_team,))
+    return challenges
 
-        conn.commit()
-        conn.close()
-    
-    # If division type is 2v2
-    if division_type == '2v2':
-        cursor.execute("DELETE FROM challenges_2v2 WHERE match_id = ?", (challenger_team,))
+def db_register_challenge(division_type: str, challenger_team: str, challenged_team: str, guild_id: int = None, recipient_ids: list = (), notification: str = None):
+    """
+    INSERT's a challenge between the two given
+    teams in the given division. If a notification
+    is given it is added to the outbox for every
+    recipient in the same transaction.
+    """
+    with transaction() as cursor:
+        # Status string to add to row
+        status = 'pending'
 
-        conn.commit()
-        conn.close()
+        cursor.execute(f'''
+        INSERT INTO challenges (division, challenger_id, challenged_id, status)
+        VALUES (?, ({TEAM_ID_QUERY}), ({TEAM_ID_QUERY}), ?)
+        ''', (division_type, challenger_team, division_type, challenged_team, division_type, status))
 
-    # If division type is 3v3
-    if division_type == '3v3':
-        cursor.execute("DELETE FROM challenges_3v3 WHERE match_id = ?", (challenger_team,))
+        if notification is not None:
+            db_enqueue_notifications(guild_id, recipient_ids, notification)
 
-        conn.commit()
-        conn.close()
+def db_remove_challenge(division_type: str, challenger_team: str):
+    """
+    Removes a challenge some specific team
+    in a specific division
+    """
+    with transaction() as cursor:
+        cursor.execute(f"DELETE FROM challenges WHERE challenger_id = ({TEAM_ID_QUERY})", (challenger_team, division_type))
 
 def remove_challenge(division_type: str, team_name: str):
     """
     Removes a challenge for a specific team.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-    
-    if division_type == '1v1':
-        cursor.execute("DELETE FROM challenges_1v1 WHERE challenger = ? OR challenged = ?", (team_name, team_name))
-    elif division_type == '2v2':
-        cursor.execute("DELETE FROM challenges_2v2 WHERE challenger = ? OR challenged = ?", (team_name, team_name))
-    elif division_type == '3v3':
-        cursor.execute("DELETE FROM challenges_3v3 WHERE challenger = ? OR challenged = ?", (team_name, team_name))
-    
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute(f'''
+        DELETE FROM challenges
+        WHERE challenger_id = ({TEAM_ID_QUERY})
+        OR challenged_id = ({TEAM_ID_QUERY})
+        ''', (team_name, division_type, team_name, division_type))
 
-def db_clear_all_challenges(division_type: str):
+def remove_match_challenge(division_type: str, winning_team: str, losing_team: str):
     """
-    Clears all challenges from the table corresponding to the given division type.
+    Removes the challenge between two teams, whichever
+    of them sent it. Returns how many challenges were removed.
     """
-    table_name = f"challenges_{division_type}"
-    
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        cursor.execute(f'''
+        DELETE FROM challenges
+        WHERE (challenger_id = ({TEAM_ID_QUERY}) AND challenged_id = ({TEAM_ID_QUERY}))
+        OR (challenger_id = ({TEAM_ID_QUERY}) AND challenged_id = ({TEAM_ID_QUERY}))
+        ''', (winning_team, division_type, losing_team, division_type, losing_team, division_type, winning_team, division_type))
 
-    cursor.execute(f"DELETE FROM {table_name}")
+        return cursor.rowcount
 
-    conn.commit()
-    conn.close()
+def db_clear_all_challenges(division_type: str):
+    """
+    Clears all challenges in the given division type.
+    """
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM challenges WHERE division = ?", (division_type,))
@@ -0,0 +1,166 @@
+#database/connection.py
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config.settings import LADDERBOT_DB, SQLITE_PERFORMANCE_PROFILE
+
+"""
+Shared connection manager for the whole
+database package. Every thread keeps one
+long-lived connection to ladderbot.db so the
+open/close cost is paid once and each
+connection's prepared statement cache
+stays warm between calls.
+"""
+
+# How many prepared statements each connection keeps cached
+STATEMENT_CACHE_SIZE = 256
+
+# Path of the database file connections are opened against
+database_path = LADDERBOT_DB
+
+# Per thread connection and transaction depth
+_local = threading.local()
+
+# Every connection that has been opened so they can all be closed on shutdown
+_open_connections = []
+_open_connections_lock = threading.Lock()
+
+# Bumped whenever connections are closed so other threads know to reconnect
+_generation = 0
+
+# SQLite reports these pragmas back as integers instead of their names
+PRAGMA_VALUE_NAMES = {
+    'synchronous': {0: 'OFF', 1: 'NORMAL', 2: 'FULL', 3: 'EXTRA'},
+    'temp_store': {0: 'DEFAULT', 1: 'FILE', 2: 'MEMORY'}
+}
+
+def open_connection(path: str):
+    """
+    Opens a new connection in autocommit mode,
+    transactions are handled explicitly by transaction()
+    """
+    conn = sqlite3.connect(
+        path,
+        isolation_level=None,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False
+    )
+
+    # Enforce the team references, e.g. removing a team removes its challenges
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    # Apply the performance profile from config/settings.py
+    for pragma, value in SQLITE_PERFORMANCE_PROFILE.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+    return conn
+
+def read_performance_profile():
+    """
+    Returns the value SQLite is actually using for every
+    setting in the performance profile, which can differ
+    from the configured one (e.g. WAL is not available
+    for in-memory databases and mmap_size has a compile time cap)
+    """
+    conn = get_connection()
+    effective_settings = {}
+
+    for pragma in SQLITE_PERFORMANCE_PROFILE:
+        value = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        effective_settings[pragma] = PRAGMA_VALUE_NAMES.get(pragma, {}).get(value, value)
+
+    return effective_settings
+
+def get_connection():
+    """
+    Returns the long-lived connection for the
+    calling thread, opening it the first time
+    """
+    conn = getattr(_local, 'conn', None)
+
+    if conn is None or _local.generation != _generation:
+        conn = open_connection(database_path)
+        _local.conn = conn
+        _local.depth = 0
+        _local.after_commit = []
+        _local.generation = _generation
+
+        with _open_connections_lock:
+            _open_connections.append(conn)
+
+    return conn
+
+@contextmanager
+def transaction():
+    """
+    Context manager that yields a cursor inside
+    a write transaction. Commits when the block
+    finishes and rolls back if it raises.
+
+    Nested transactions on the same thread join
+    the outermost one so several database functions
+    can be grouped into a single commit.
+    """
+    conn = get_connection()
+
+    if _local.depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    _local.depth += 1
+
+    try:
+        yield conn.cursor()
+    except BaseException:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.rollback()
+            _local.after_commit.clear()
+        raise
+    else:
+        _local.depth -= 1
+        if _local.depth == 0:
+            conn.commit()
+
+            # Run the callbacks registered during the transaction now that it is visible to everyone
+            callbacks = list(_local.after_commit)
+            _local.after_commit.clear()
+            for callback in callbacks:
+                callback()
+
+def call_after_commit(callback):
+    """
+    Calls callback once the current transaction commits,
+    or straight away if there is no transaction open.
+    The callback is dropped if the transaction rolls back.
+    """
+    get_connection()
+
+    if _local.depth == 0:
+        callback()
+    else:
+        _local.after_commit.append(callback)
+
+def close_all_connections():
+    """
+    Closes every connection opened by the manager.
+    Threads will reconnect on their next call.
+    """
+    global _generation
+
+    with _open_connections_lock:
+        for conn in _open_connections:
+            conn.close()
+        _open_connections.clear()
+        _generation += 1
+
+def set_database_path(path: str):
+    """
+    Points the manager at a different database
+    file, closing any connections to the old one
+    """
+    global database_path
+
+    close_all_connections()
+    database_path = path
@@ -1,27 +1,21 @@
 #database/database_setup.py
 
-import sqlite3
-from config.settings import LADDERBOT_DB
+from config.settings import VALID_DIVISION_TYPES, SQLITE_PERFORMANCE_PROFILE
+from logs.logger import logger
+
+from .connection import transaction, read_performance_profile, call_after_commit
+from .state_management import invalidate_states
 
 """
 All the functions needed for setting
 up SQLite database and tables.
 """
-def connect_db():
-    """
-    Connect to the SQLite database.
-    """
-    return sqlite3.connect(LADDERBOT_DB)
-
-def create_tables(conn):
+def create_tables(cursor):
     """
     Create the necessary tables for
     all data needed in divisions, etc
     for the database.
     """
-    # Create SQL cursor
-    cursor = conn.cursor()
-    
     # Create a Teams tables with team_name, division, rank, wins, losses, and members
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS teams (
@@ -119,14 +113,300 @@ def create_tables(conn):
     participation_count INTEGER NOT NULL                                             
 )
 ''')
-
-    # Commit the changes
-    conn.commit()
     
+def migrate_add_lookup_indexes(cursor):
+    """
+    Schema version 1
+
+    Adds indexes on the columns every command
+    looks teams, challenges and members up by
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_division_rank ON teams (division, rank)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_team_name ON teams (team_name)")
+
+    for division_type in VALID_DIVISION_TYPES:
+        table_name = f"challenges_{division_type}"
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_challenger ON {table_name} (challenger)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_challenged ON {table_name} (challenged)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_match_id ON {table_name} (match_id)")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_discord_id ON members (discord_id)")
+
+def migrate_unified_challenges_table(cursor):
+    """
+    Schema version 2
+
+    Replaces challenges_1v1, challenges_2v2 and challenges_3v3
+    with one challenges table that has a division column and
+    references both teams by their id. Existing challenges are
+    copied over, any whose teams no longer exist are dropped.
+    """
+    cursor.execute('''
+    CREATE TABLE challenges (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        division TEXT NOT NULL,
+        challenger_id INTEGER NOT NULL REFERENCES teams (id) ON DELETE CASCADE,
+        challenged_id INTEGER NOT NULL REFERENCES teams (id) ON DELETE CASCADE,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+''')
+
+    for division_type in VALID_DIVISION_TYPES:
+        table_name = f"challenges_{division_type}"
+
+        # Swap the team names for team ids while copying in the original order
+        cursor.execute(f'''
+        INSERT INTO challenges (division, challenger_id, challenged_id, status)
+        SELECT ?, challenger.id, challenged.id, old.status
+        FROM {table_name} AS old
+        JOIN teams AS challenger ON challenger.team_name = old.challenger AND challenger.division = ?
+        JOIN teams AS challenged ON challenged.team_name = old.challenged AND challenged.division = ?
+        ORDER BY old.id
+        ''', (division_type, division_type, division_type))
+
+        cursor.execute(f"DROP TABLE {table_name}")
+
+    cursor.execute("CREATE INDEX idx_challenges_division ON challenges (division)")
+    cursor.execute("CREATE INDEX idx_challenges_challenger_id ON challenges (challenger_id)")
+    cursor.execute("CREATE INDEX idx_challenges_challenged_id ON challenges (challenged_id)")
+
+def migrate_team_members_table(cursor):
+    """
+    Schema version 3
+
+    Moves team membership out of the comma separated
+    teams.members string into a team_members table with
+    one row per member. Teams registered before this only
+    have display names so their discord_id is left NULL.
+
+    Dropping the old column needs SQLite 3.35 or newer.
+    """
+    cursor.execute('''
+    CREATE TABLE team_members (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER NOT NULL REFERENCES teams (id) ON DELETE CASCADE,
+        discord_id INTEGER DEFAULT NULL,
+        display_name TEXT NOT NULL
+)
+''')
+
+    # Split every members string into rows, keeping the order they were registered in
+    cursor.execute("SELECT id, members FROM teams ORDER BY id")
+    team_members = [
+        (team_id, member.strip())
+        for team_id, members_string in cursor.fetchall()
+        for member in members_string.split(",")
+        if member.strip()
+    ]
+    cursor.executemany("INSERT INTO team_members (team_id, display_name) VALUES (?, ?)", team_members)
+
+    cursor.execute("ALTER TABLE teams DROP COLUMN members")
+
+    cursor.execute("CREATE INDEX idx_team_members_team_id ON team_members (team_id, discord_id)")
+    cursor.execute("CREATE INDEX idx_team_members_discord_id ON team_members (discord_id)")
+    cursor.execute("CREATE INDEX idx_team_members_display_name ON team_members (display_name)")
+
+def migrate_board_message_ids(cursor):
+    """
+    Schema version 4
+
+    Stores the ID of each division's standings, challenges
+    and teams board message next to its channel ID so the
+    boards can be edited directly instead of searching
+    the channel history for them.
+    """
+    cursor.execute("ALTER TABLE states ADD COLUMN standings_message_id INTEGER DEFAULT NULL")
+    cursor.execute("ALTER TABLE states ADD COLUMN challenges_message_id INTEGER DEFAULT NULL")
+    cursor.execute("ALTER TABLE states ADD COLUMN teams_message_id INTEGER DEFAULT NULL")
+
+def migrate_backfill_team_member_ids(cursor):
+    """
+    Schema version 5
+
+    Fills in the discord_id of team members registered
+    before IDs were stored, using the members stat table
+    which has every registered player's display name and ID.
+    Names shared by more than one player are left NULL
+    rather than guessing which player it was.
+    """
+    cursor.execute('''
+    UPDATE team_members
+    SET discord_id = (
+        SELECT members.discord_id FROM members
+        WHERE members.display_name = team_members.display_name
+    )
+    WHERE discord_id IS NULL
+    AND (SELECT COUNT(DISTINCT members.discord_id) FROM members WHERE members.display_name = team_members.display_name) = 1
+    ''')
+    logger.info(f'Database: Backfilled the Discord ID of {cursor.rowcount} team members')
+
+def migrate_notification_outbox(cursor):
+    """
+    Schema version 6
+
+    Creates the outbox table of direct message notifications
+    waiting to be delivered. A notification is written in the
+    same transaction as the change that caused it and deleted
+    once it is sent, so notifications left over when the bot
+    stops are delivered after it starts again.
+    """
+    cursor.execute('''
+    CREATE TABLE outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER,
+        recipient_id INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT DEFAULT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+''')
+
+    cursor.execute("CREATE INDEX idx_outbox_status_next_attempt_at ON outbox (status, next_attempt_at)")
+
+def migrate_board_messages_table(cursor):
+    """
+    Schema version 7
+
+    Moves the board message IDs out of the states table
+    into a board_messages table with one row per page, so
+    a board too long for one Discord message can be split
+    into several. Each row keeps a hash of the page's
+    content so pages that have not changed are not edited.
+
+    Dropping the old columns needs SQLite 3.35 or newer.
+    """
+    cursor.execute('''
+    CREATE TABLE board_messages (
+        division TEXT NOT NULL,
+        board TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        message_id INTEGER NOT NULL,
+        content_hash TEXT DEFAULT NULL,
+        PRIMARY KEY (division, board, page)
+)
+''')
+
+    # The existing board messages become page 0, with no hash so their next edit always goes through
+    for board in ('standings', 'challenges', 'teams'):
+        cursor.execute(f'''
+        INSERT INTO board_messages (division, board, page, message_id)
+        SELECT division, ?, 0, {board}_message_id FROM states WHERE {board}_message_id IS NOT NULL
+        ''', (board,))
+        cursor.execute(f"ALTER TABLE states DROP COLUMN {board}_message_id")
+
+def migrate_rank_changes_table(cursor):
+    """
+    Schema version 8
+
+    Creates the rank_changes table, the log of rank changes
+    not yet written to the teams rank column. A command only
+    adds its one or two changes here and the rank column is
+    brought up to date later in a batch, so moving a team in a
+    large division does not rewrite every rank it passes while
+    the command waits. A row is either a shift (every team
+    ranked first_rank to last_rank moves by rank_offset) or a
+    placement (team_name gets rank).
+    """
+    cursor.execute('''
+    CREATE TABLE rank_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        division TEXT NOT NULL,
+        team_name TEXT DEFAULT NULL,
+        rank INTEGER DEFAULT NULL,
+        first_rank INTEGER DEFAULT NULL,
+        last_rank INTEGER DEFAULT NULL,
+        rank_offset INTEGER DEFAULT NULL
+)
+''')
+
+def migrate_sparse_rank_keys(cursor):
+    """
+    Schema version 9
+
+    Adds the rank_mode of each division and the rank_key
+    column used by divisions in the 'sparse' mode. Every
+    division starts out 'dense' as before, db_set_rank_mode
+    moves a division over to sparse rank keys.
+    """
+    cursor.execute("ALTER TABLE states ADD COLUMN rank_mode TEXT NOT NULL DEFAULT 'dense'")
+    cursor.execute("ALTER TABLE teams ADD COLUMN rank_key INTEGER DEFAULT NULL")
+
+    # Partial so lookups by team name keep using idx_teams_team_name
+    cursor.execute("CREATE INDEX idx_teams_division_rank_key ON teams (division, rank_key) WHERE rank_key IS NOT NULL")
+
+# Every schema migration in the order they are applied.
+# A migration's schema version is its position in the list starting at 1,
+# so new migrations must only ever be added to the end.
+MIGRATIONS = [
+    migrate_add_lookup_indexes,
+    migrate_unified_challenges_table,
+    migrate_team_members_table,
+    migrate_board_message_ids,
+    migrate_backfill_team_member_ids,
+    migrate_notification_outbox,
+    migrate_board_messages_table,
+    migrate_rank_changes_table,
+    migrate_sparse_rank_keys,
+]
+
+def get_schema_version(cursor):
+    """
+    Returns the schema version recorded in the database file
+    """
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+def apply_migrations(cursor):
+    """
+    Upgrades the database in place by running every
+    migration newer than the recorded schema version
+    """
+    current_version = get_schema_version(cursor)
+
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        if version <= current_version:
+            continue
+
+        migration(cursor)
+        cursor.execute(f"PRAGMA user_version = {version}")
+        logger.info(f'Database: Applied schema migration {version} "{migration.__name__}"')
+
+def check_performance_profile():
+    """
+    Startup check that logs which SQLite performance
+    settings are in effect and warns about any that
+    differ from config/settings.py
+    """
+    effective_settings = read_performance_profile()
+
+    for pragma, configured_value in SQLITE_PERFORMANCE_PROFILE.items():
+        effective_value = effective_settings[pragma]
+
+        if str(effective_value).upper() == str(configured_value).upper():
+            logger.info(f'Database: PRAGMA {pragma} = {effective_value}')
+        else:
+            logger.warning(f'Database: PRAGMA {pragma} is {effective_value} but {configured_value} is configured')
+
+    return effective_settings
+
 def initialize_database():
     """
-    Init the database, creating tables if they do not exist.
+    Init the database, creating tables if they do not exist
+    and bringing the schema up to the latest version.
     """
-    conn = connect_db()
-    create_tables(conn)
-    conn.close()
\ No newline at end of file
+    with transaction() as cursor:
+        # create_tables builds the original schema, only brand new files need it
+        if get_schema_version(cursor) == 0:
+            create_tables(cursor)
+
+        apply_migrations(cursor)
+
+        # The states rows may have been created or migrated
+        call_after_commit(invalidate_states)
+
+    check_performance_profile()
@@ -0,0 +1,46 @@
+#database/match_reporting.py
+
+from .connection import transaction
+from .team_management import db_update_rankings
+from .challenge_management import remove_match_challenge
+from .member_management import add_division_wins_losses
+
+"""
+Match reporting service. Applies every change
+a reported match makes to the database in one
+transaction so a result is either fully applied
+or not applied at all, with a single commit.
+"""
+
+def db_report_match(division_type: str, winning_team: str, losing_team: str, rank_diff: dict, winner_ids: list, loser_ids: list):
+    """
+    Applies a match result in one transaction:
+        - Removing the challenge between the two teams
+        - The rank change the ladder engine planned, if any
+        - The win and loss for both teams
+        - The win/loss and participation stats of every member
+
+    The challenge is removed first and nothing else is applied unless
+    exactly one was removed, so a match reported twice is only counted once.
+
+    Args:
+        division_type (str): The division the match was played in.
+        winning_team (str): The team that won.
+        losing_team (str): The team that lost.
+        rank_diff (dict): The ladder engine's plan for the match, empty when nothing moves.
+        winner_ids (list): Discord IDs of the winning team's members.
+        loser_ids (list): Discord IDs of the losing team's members.
+
+    Raises:
+        ValueError: If there is no challenge between the teams left to report.
+    """
+    with transaction():
+        if remove_match_challenge(division_type, winning_team, losing_team) != 1:
+            raise ValueError(f"No challenge between Team {winning_team} and Team {losing_team} is left to report in the {division_type} division")
+
+        # Any rank change, then the win and loss for the teams
+        db_update_rankings(division_type, winning_team, losing_team, rank_diff)
+
+        # One batched stat update per side of the match
+        add_division_wins_losses(winner_ids, division_type, win=True)
+        add_division_wins_losses(loser_ids, division_type, win=False)
@@ -1,8 +1,6 @@
 import sqlite3
-from config import LADDERBOT_DB
 
-def connect_db():
-    return sqlite3.connect(LADDERBOT_DB)
+from .connection import get_connection, transaction
 
 def is_member_in_members_table(discord_id):
     """
@@ -11,74 +9,89 @@ def is_member_in_members_table(discord_id):
     the same ID twice in one table.
     """
 
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     cursor.execute("SELECT COUNT(*) FROM members WHERE discord_id = ?", (discord_id,))
     count = cursor.fetchone()[0]
-    conn.close()
     return count == 1
 
 def increment_all_teams_count(discord_id):
     """
     Adds 1 to all_teams_count stat for given discord ID
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE members SET all_teams_count = all_teams_count + 1 WHERE discord_id = ?", (discord_id,))
-
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE members SET all_teams_count = all_teams_count + 1 WHERE discord_id = ?", (discord_id,))
 
 def increment_participation_count(discord_id):
     """
     
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE members SET participation_count = participation_count + 1 WHERE discord_id = ?", (discord_id,))
-
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE members SET participation_count = participation_count + 1 WHERE discord_id = ?", (discord_id,))
 
 def add_division_win(discord_id, division_type):
     """
     Used to increment divisional wins for members stats
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute(f"UPDATE members SET total_{division_type}_wins = total_{division_type}_wins + 1 WHERE discord_id = ?", (discord_id,))
-
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute(f"UPDATE members SET total_{division_type}_wins = total_{division_type}_wins + 1 WHERE discord_id = ?", (discord_id,))
     
 def add_division_loss(discord_id, division_type):
     """
     Used to increment divisional losses for members stats
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        cursor.execute(f"UPDATE members SET total_{division_type}_losses = total_{division_type}_losses + 1 WHERE discord_id = ?", (discord_id,))
 
-    cursor.execute(f"UPDATE members SET total_{division_type}_losses = total_{division_type}_losses + 1 WHERE discord_id = ?", (discord_id,))
+def get_registered_member_ids(discord_ids: list):
+    """
+    Returns the set of the given discord IDs that
+    are already in the members table, in one query
+    """
+    if not discord_ids:
+        return set()
+
+    cursor = get_connection().cursor()
+
+    placeholders = ", ".join("?" for _ in discord_ids)
+    cursor.execute(f"SELECT discord_id FROM members WHERE discord_id IN ({placeholders})", tuple(discord_ids))
+    return {discord_id for (discord_id,) in cursor.fetchall()}
 
-    conn.commit()
-    conn.close()    
+def increment_all_teams_counts(discord_ids: list):
+    """
+    Batch version of increment_all_teams_count,
+    adds 1 to all_teams_count for every given discord ID
+    """
+    with transaction() as cursor:
+        cursor.executemany(
+            "UPDATE members SET all_teams_count = all_teams_count + 1 WHERE discord_id = ?",
+            [(discord_id,) for discord_id in discord_ids]
+        )
+
+def add_division_wins_losses(discord_ids: list, division_type: str, win: bool):
+    """
+    Batch stat update for one side of a match.
+    Adds 1 to total_{division_type}_wins (win=True) or
+    total_{division_type}_losses (win=False) and to
+    participation_count for every given discord ID
+    """
+    column = f"total_{division_type}_wins" if win else f"total_{division_type}_losses"
+
+    with transaction() as cursor:
+        cursor.executemany(
+            f"UPDATE members SET {column} = {column} + 1, participation_count = participation_count + 1 WHERE discord_id = ?",
+            [(discord_id,) for discord_id in discord_ids]
+        )
 
 def get_player_stats(discord_id):
     """
     
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     cursor.execute("SELECT * FROM members WHERE discord_id = ?", (discord_id,))
     stats = cursor.fetchall()
 
-    conn.close()
-
     return stats
 
 def db_register_member(display_name, discord_id):
@@ -91,19 +104,29 @@ def db_register_member(display_name, discord_id):
     if display_name is None or discord_id is None:
         raise ValueError("display_name and discord_id cannot be None")
 
-    conn = connect_db()
     try:
-        cursor = conn.cursor()
+        with transaction() as cursor:
+            default_zero = 0
+            cursor.execute('''
+                INSERT INTO members (display_name, discord_id, total_1v1_wins, total_1v1_losses, total_2v2_wins, total_2v2_losses, total_3v3_wins, total_3v3_losses, champion_1v1_title, champion_2v2_title, champion_3v3_title, all_teams_count, participation_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (display_name, discord_id, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, 1, default_zero))
+    except sqlite3.Error as e:
+        print(f"An error occurred while trying to register a member: {e}")
 
-        default_zero = 0
-        cursor.execute('''
+def db_register_members(members: list):
+    """
+    Batch version of db_register_member, takes a list
+    of (display_name, discord_id) tuples and adds them
+    all to the members table with one executemany
+    """
+    default_zero = 0
+
+    with transaction() as cursor:
+        cursor.executemany('''
             INSERT INTO members (display_name, discord_id, total_1v1_wins, total_1v1_losses, total_2v2_wins, total_2v2_losses, total_3v3_wins, total_3v3_losses, champion_1v1_title, champion_2v2_title, champion_3v3_title, all_teams_count, participation_count)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (display_name, discord_id, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, 1, default_zero))
-
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"An error occurred while trying to register a member: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+        ''', [
+            (display_name, discord_id, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, default_zero, 1, default_zero)
+            for display_name, discord_id in members
+        ])
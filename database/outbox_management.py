@@ -0,0 +1,68 @@
+import time
+
+from .connection import get_connection, transaction
+
+"""
+The outbox of direct message notifications. Notifications
+are written here in the same transaction as the change that
+caused them and the NotificationDispatcher delivers them,
+deleting each row once its message has been sent.
+"""
+
+def db_enqueue_notifications(guild_id: int, recipient_ids: list, message: str):
+    """
+    Adds the message to the outbox once for every
+    recipient, due to be delivered straight away.
+    Joins the caller's transaction if there is one.
+    """
+    with transaction() as cursor:
+        cursor.executemany(
+            "INSERT INTO outbox (guild_id, recipient_id, message) VALUES (?, ?, ?)",
+            [(guild_id, recipient_id, message) for recipient_id in recipient_ids]
+        )
+
+def get_due_notifications(limit: int):
+    """
+    Returns up to limit (id, guild_id, recipient_id, message, attempts)
+    pending notifications that are due, the oldest first
+    """
+    cursor = get_connection().cursor()
+
+    cursor.execute('''
+    SELECT id, guild_id, recipient_id, message, attempts
+    FROM outbox
+    WHERE status = 'pending' AND next_attempt_at <= ?
+    ORDER BY next_attempt_at, id
+    LIMIT ?
+    ''', (time.time(), limit))
+    return cursor.fetchall()
+
+def get_next_notification_attempt_at():
+    """
+    Returns the time (seconds since the epoch) the next
+    pending notification is due, or None if there are none
+    """
+    cursor = get_connection().cursor()
+
+    cursor.execute("SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'")
+    return cursor.fetchone()[0]
+
+def db_record_notification_results(sent_ids: list, retries: list, failures: list):
+    """
+    Records the results of a batch of deliveries in one transaction
+
+    Args:
+        sent_ids (list): IDs of the notifications that were sent, they are deleted.
+        retries (list): (id, next_attempt_at, error) of notifications to try again later.
+        failures (list): (id, error) of notifications that will not be tried again.
+    """
+    with transaction() as cursor:
+        cursor.executemany("DELETE FROM outbox WHERE id = ?", [(notification_id,) for notification_id in sent_ids])
+        cursor.executemany(
+            "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            [(next_attempt_at, error, notification_id) for notification_id, next_attempt_at, error in retries]
+        )
+        cursor.executemany(
+            "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+            [(error, notification_id) for notification_id, error in failures]
+        )
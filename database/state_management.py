@@ -1,40 +1,102 @@
-import sqlite3
-from config import LADDERBOT_DB
+import threading
 
-def connect_db():
-    return sqlite3.connect(LADDERBOT_DB)
+from . import connection
+from .connection import get_connection, transaction, call_after_commit
+from .board_message_management import db_delete_board_pages
+
+# In memory copy of the states table, division -> {column: value}.
+# Loaded on first use and dropped by every writer once its change commits.
+_states_cache = None
+
+# Bumped by every invalidation so a load that raced a write is not kept
+_states_version = 0
+
+# The connection generation the cache was loaded from, a new database file means a reload
+_states_connection_generation = None
+
+_states_lock = threading.Lock()
+
+def get_states():
+    """
+    Returns the cached states table as
+    {division: {column: value}}, loading
+    it from the database if needed
+    """
+    global _states_cache, _states_connection_generation
+
+    conn = get_connection()
+
+    # Inside a transaction read the table itself so its own uncommitted writes are seen
+    with _states_lock:
+        if _states_cache is not None and _states_connection_generation == connection._generation and not conn.in_transaction:
+            return _states_cache
+        states_version = _states_version
+        connection_generation = connection._generation
 
-def is_ladder_running(division_type):
-    conn = connect_db()
     cursor = conn.cursor()
 
-    # Query to find boolean for ladder_running in given division type
-    cursor.execute("SELECT ladder_running FROM states WHERE division = ?", (division_type,))
-    match = cursor.fetchone()
+    cursor.execute("SELECT * FROM states")
+    columns = [description[0] for description in cursor.description]
+    states = {row[columns.index('division')]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    # Never keep uncommitted values or a load that raced a write
+    if not conn.in_transaction:
+        with _states_lock:
+            if states_version == _states_version:
+                _states_cache = states
+                _states_connection_generation = connection_generation
+
+    return states
+
+def invalidate_states():
+    """
+    Drops the cached states table so the
+    next read loads it from the database
+    """
+    global _states_cache, _states_version
+
+    with _states_lock:
+        _states_cache = None
+        _states_version += 1
+
+def get_state(division_type: str, column: str):
+    """
+    Returns one column of a division's states row from
+    the cache, or None if the division has no row
+    """
+    division_state = get_states().get(division_type)
+    return division_state[column] if division_state else None
+
+def get_rank_mode(division_type: str):
+    """
+    Returns how the division stores ranks,
+    'dense' or 'sparse'
+    """
+    return get_state(division_type, 'rank_mode') or 'dense'
 
-    conn.close()
+def is_ladder_running(division_type):
+    # Find boolean for ladder_running in given division type
+    division_state = get_states().get(division_type)
 
-    if match is None:
+    if division_state is None:
         print(f"No entry found in the database for division: {division_type}")
         return False
-    return match[0] == 1
+    return division_state['ladder_running'] == 1
 
 def set_ladder_running(division_type: str, true_or_false: bool):
     """
     Sets the ladder in a given division type
     to either true or false
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        if true_or_false:
+            cursor.execute("UPDATE states SET ladder_running = ? WHERE division = ?", (1, division_type))
 
-    if true_or_false:
-        cursor.execute("UPDATE states SET ladder_running = ? WHERE division = ?", (1, division_type))
-    
-    else:
-        cursor.execute("UPDATE states SET ladder_running = ? WHERE division = ?", (0, division_type))
-    
-    conn.commit()
-    conn.close()
+        else:
+            cursor.execute("UPDATE states SET ladder_running = ? WHERE division = ?", (0, division_type))
+
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def is_standings_channel_set(division_type: str):
     """
@@ -43,13 +105,7 @@ def is_standings_channel_set(division_type: str):
     will return true or false
     """
 
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT standings_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'standings_channel_id')
 
     if result is None:
         return False
@@ -62,13 +118,7 @@ def get_standings_channel_id(division_type: str):
     Returns the integer id for the channel
     that is set for the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT standings_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'standings_channel_id')
 
     if result is not None:
         return result
@@ -79,13 +129,7 @@ def is_challenges_channel_set(division_type: str):
     division's challenge channel id that
     will return true or false
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT challenges_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'challenges_channel_id')
 
     if result is None:
         return False
@@ -98,13 +142,7 @@ def get_challenges_channel_id(division_type: str):
     Returns the integer id for the channel
     that is set for the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT challenges_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'challenges_channel_id')
 
     if result is not None:
         return result
@@ -115,13 +153,7 @@ def is_teams_channel_set(division_type: str):
     division's teams channel id that
     will return true or false
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT teams_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'teams_channel_id')
 
     if result is None:
         return False
@@ -134,13 +166,7 @@ def get_teams_channel_id(division_type: str):
     Returns the integer id for the channel
     that is set for the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT teams_channel_id FROM states WHERE division = ?", (division_type,))
-    result = cursor.fetchone()[0]
-
-    conn = conn.close()
+    result = get_state(division_type, 'teams_channel_id')
 
     if result is not None:
         return result
@@ -151,27 +177,27 @@ def db_set_standings_channel(division_type: str, channel_id: int):
     standings to given integer value
     and given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        # Update table with channel id integer
+        cursor.execute("UPDATE states SET standings_channel_id = ? WHERE division = ?", (channel_id, division_type))
 
-    # Update table with channel id integer
-    cursor.execute("UPDATE states SET standings_channel_id = ? WHERE division = ?", (channel_id, division_type))
+        # A new channel starts without any board messages
+        db_delete_board_pages(division_type, 'standings')
 
-    conn.commit()
-    conn.close()
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def db_clear_standings_channel(division_type: str):
     """
     Sets the standings channel id to None
     in the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE states SET standings_channel_id = ? WHERE division = ?", (None, division_type))
+    with transaction() as cursor:
+        cursor.execute("UPDATE states SET standings_channel_id = ? WHERE division = ?", (None, division_type))
+        db_delete_board_pages(division_type, 'standings')
 
-    conn.commit()
-    conn.close()
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def db_set_challenges_channel(division_type: str, channel_id: int):
     """
@@ -179,27 +205,27 @@ def db_set_challenges_channel(division_type: str, channel_id: int):
     challenges to the given integer
     value and given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        # Update table with channel id integer
+        cursor.execute("UPDATE states SET challenges_channel_id = ? WHERE division = ?", (channel_id, division_type))
 
-    # Update table with channel id integer
-    cursor.execute("UPDATE states SET challenges_channel_id = ? WHERE division = ?", (channel_id, division_type))
+        # A new channel starts without any board messages
+        db_delete_board_pages(division_type, 'challenges')
 
-    conn.commit()
-    conn.close()
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def db_clear_challenges_channel(division_type: str):
     """
     Sets the challenges channel id to None
     in the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE states SET challenges_channel_id = ? WHERE division = ?", (None, division_type))
+    with transaction() as cursor:
+        cursor.execute("UPDATE states SET challenges_channel_id = ? WHERE division = ?", (None, division_type))
+        db_delete_board_pages(division_type, 'challenges')
 
-    conn.commit()
-    conn.close()
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def db_set_teams_channel(division_type: str, channel_id: int):
     """
@@ -207,24 +233,24 @@ def db_set_teams_channel(division_type: str, channel_id: int):
     teams board to the given integer
     value and given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        # Update table with channel id integer
+        cursor.execute("UPDATE states SET teams_channel_id = ? WHERE division = ?", (channel_id, division_type))
 
-    # Update table with channel id integer
-    cursor.execute("UPDATE states SET teams_channel_id = ? WHERE division = ?", (channel_id, division_type))
+        # A new channel starts without any board messages
+        db_delete_board_pages(division_type, 'teams')
 
-    conn.commit()
-    conn.close()
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
 
 def db_clear_teams_channel(division_type: str):
     """
     Sets the teams channel id to None
     in the given division type
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE states SET teams_channel_id = ? WHERE division = ?", (None, division_type))
+    with transaction() as cursor:
+        cursor.execute("UPDATE states SET teams_channel_id = ? WHERE division = ?", (None, division_type))
+        db_delete_board_pages(division_type, 'teams')
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
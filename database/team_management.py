@@ -1,8 +1,25 @@
-import sqlite3
-from config import LADDERBOT_DB
+from config.settings import VALID_RANK_MODES, RANK_KEY_GAP, RANK_KEY_REBALANCE_GAP
 
-def connect_db():
-    return sqlite3.connect(LADDERBOT_DB)
+from .connection import get_connection, transaction, call_after_commit
+from .state_management import get_states, get_rank_mode, invalidate_states
+
+# Matches a team_members row to a player by Discord ID, falling back to the
+# display name only for rows from before Discord IDs were stored
+MEMBER_MATCH = "(team_members.discord_id = ? OR (team_members.discord_id IS NULL AND team_members.display_name = ?))"
+
+class StaleRankDiffError(ValueError):
+    """
+    Raised when a rank diff was planned from ranks
+    the division no longer has in the database
+    """
+
+# The rank shown for a team: the rank column in a dense division, the
+# team's position by rank_key in a sparse one, numbered at read time
+DISPLAY_RANK = """
+CASE WHEN (SELECT rank_mode FROM states WHERE states.division = teams.division) = 'sparse'
+THEN ROW_NUMBER() OVER (PARTITION BY teams.division ORDER BY teams.rank_key, teams.id)
+ELSE teams.rank END
+"""
 
 def count_teams(division_type: str):
     """
@@ -12,8 +29,7 @@ def count_teams(division_type: str):
     Will be useful to use like when assigning
     rank to newly created teams
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     # Query database for specific division in teams
     cursor.execute('''
@@ -22,7 +38,6 @@ def count_teams(division_type: str):
 ''', (division_type,))
     
     count = cursor.fetchone()[0]
-    conn.close()
 
     return count
 
@@ -36,12 +51,10 @@ def is_team_name_unique(team_name: str) -> bool:
     Returns:
         bool: True if the team name is unique, False otherwise.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     cursor.execute("SELECT COUNT(*) FROM teams WHERE team_name = ?", (team_name,))
     count = cursor.fetchone()[0]
-    conn.close()
     return count == 0
 
 def does_team_exist(team_name: str):
@@ -49,106 +62,86 @@ def does_team_exist(team_name: str):
     Checks if a team name exists within
     a specified division type.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     cursor.execute("SELECT COUNT(*) FROM teams WHERE team_name = ?", (team_name,))
     count = cursor.fetchone()[0]
-    conn.close()
     return count > 0
 
-def is_member_registered(division_type: str, member_name: str):
+def is_member_registered(division_type: str, discord_id: int, member_name: str = None):
     """
-    TODO
-
     Checks if a given player is already registered
     to a team in a given division
 
     Args:
         division_type (str): The division type to check.
-        member_name (str): The members name to check.
+        discord_id (int): The members Discord ID to check.
+        member_name (str): The members name, only matched against
+            team members registered without a Discord ID.
 
     Returns:
         bool: True if player is on team in division already, False otherwise.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT members FROM teams WHERE division = ?", (division_type,))
-    results = cursor.fetchall()
-
-    conn.close()
-
-    # Iterate over each team's members string in the results
-    for result in results:
-        members_string = result[0]
+    cursor = get_connection().cursor()
 
-        # Split string into list for names and strip white space
-        members_list = [member.strip() for member in members_string.split(",")]
-
-        # Look for member_name in the list
-        if member_name in members_list:
-            return True
-    
-    # If no match found, return False
-    return False
+    cursor.execute(f'''
+    SELECT COUNT(*) FROM team_members
+    JOIN teams ON teams.id = team_members.team_id
+    WHERE {MEMBER_MATCH} AND teams.division = ?
+    ''', (discord_id, member_name, division_type))
+    count = cursor.fetchone()[0]
+    return count > 0
 
-def is_member_on_team(display_name: str, team_name: str):
+def is_member_on_team(discord_id: int, team_name: str, display_name: str = None):
     """
     Checks if a person is apart of a certain team
     Will be used for author purposes of command calls
     to make sure people are making changes to their own
     teams and cant cancel challenges or make challenges for
     a team that they are not on.
-    """
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT members FROM teams WHERE team_name = ?", (team_name,))
-    results = cursor.fetchall()
-    
-    conn.close()
-
-    # Iterate over each member in the members strings results
-    for result in results:
-        members_string = result[0]
 
-    # Split string into list for names and strip white space
-        members_list = [member.strip() for member in members_string.split(",")]
+    The display name is only matched against team
+    members registered without a Discord ID.
+    """
+    cursor = get_connection().cursor()
 
-        if display_name in members_list:
-            return True
-    
-    # If display name is not found in members_list, return False
-    return False
+    cursor.execute(f'''
+    SELECT COUNT(*) FROM team_members
+    WHERE team_id = (SELECT id FROM teams WHERE team_name = ?)
+    AND {MEMBER_MATCH}
+    ''', (team_name, discord_id, display_name))
+    count = cursor.fetchone()[0]
+    return count > 0
 
 def get_team_members(team_name: str):
     """
-    Returns all members on a given team
+    Returns the display names of all members
+    on a given team in the order they registered
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
-    cursor.execute("SELECT members FROM teams WHERE team_name =?", (team_name,))
-    members = cursor.fetchone()
-
-    conn.close()
+    cursor.execute('''
+    SELECT display_name FROM team_members
+    WHERE team_id = (SELECT id FROM teams WHERE team_name = ?)
+    ORDER BY id
+    ''', (team_name,))
+    members = [display_name for (display_name,) in cursor.fetchall()]
 
     return members if members else None
 
-
 def give_team_rank(division_type: str, team_name: str):
     """
     Returns the rank of a given team in a given division type.
     If the team does not exist, returns None.
+
+    This is the materialized rank, run db_materialize_ranks
+    first if rank changes may still be in the log.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
-    cursor.execute("SELECT rank FROM teams WHERE division = ? AND team_name = ?", (division_type, team_name,))
+    cursor.execute(f"SELECT display_rank FROM (SELECT team_name, {DISPLAY_RANK} AS display_rank FROM teams WHERE division = ?) WHERE team_name = ?", (division_type, team_name,))
     rank_result = cursor.fetchone()
     
-    conn.close()
     
     # If the team is found, return the rank (first element of the tuple)
     return rank_result[0] if rank_result else None
@@ -157,41 +150,31 @@ def add_team_wins_losses(division_type: str, team_name: str, win: bool):
     """
     Updates wins or losses for a team.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-    
-    if win:
-        cursor.execute(f'''
-        UPDATE teams
-        SET wins = wins + 1, win_streak = win_streak + 1, lose_streak = 0
-        WHERE team_name = ? AND division = ?
-        ''', (team_name, division_type))
-    else:
-        cursor.execute(f'''
-        UPDATE teams
-        SET losses = losses + 1, lose_streak = lose_streak + 1, win_streak = 0
-        WHERE team_name = ? AND division = ?
-        ''', (team_name, division_type))
-    
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        if win:
+            cursor.execute(f'''
+            UPDATE teams
+            SET wins = wins + 1, win_streak = win_streak + 1, lose_streak = 0
+            WHERE team_name = ? AND division = ?
+            ''', (team_name, division_type))
+        else:
+            cursor.execute(f'''
+            UPDATE teams
+            SET losses = losses + 1, lose_streak = lose_streak + 1, win_streak = 0
+            WHERE team_name = ? AND division = ?
+            ''', (team_name, division_type))
 
 def subtract_team_wins_losses(division_type: str, team_name: str, win_or_loss: bool):
     """
     Subtract a win with True
     Subtract a loss with False
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with transaction() as cursor:
+        if win_or_loss:
+            cursor.execute(f"UPDATE teams SET wins = wins - 1 WHERE team_name = ? AND division = ?", (team_name, division_type))
 
-    if win_or_loss:
-        cursor.execute(f"UPDATE teams SET wins = wins - 1 WHERE team_name = ? AND division = ?", (team_name, division_type))
-    
-    else:
-        cursor.execute(f"UPDATE teams SET losses = losses - 1 WHERE team_name = ? AND division = ?", (team_name, division_type))
-    
-    conn.commit()
-    conn.close()
+        else:
+            cursor.execute(f"UPDATE teams SET losses = losses - 1 WHERE team_name = ? AND division = ?", (team_name, division_type))
 
 def get_wins_or_losses(team_name: str, wins_or_losses: bool):
     """
@@ -203,8 +186,7 @@ def get_wins_or_losses(team_name: str, wins_or_losses: bool):
     amount if used incorrectly
     """
     
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     
     # If True
     if wins_or_losses:
@@ -215,7 +197,6 @@ def get_wins_or_losses(team_name: str, wins_or_losses: bool):
         cursor.execute("SELECT losses FROM teams WHERE team_name = ?", (team_name,))
         result = cursor.fetchone()[0]
     
-    conn.close()
     return result
 
 def check_team_division(team_name: str):
@@ -224,34 +205,33 @@ def check_team_division(team_name: str):
     and returns the division type back
     in a string
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     cursor.execute("SELECT division FROM teams WHERE team_name = ?", (team_name,))
     result = cursor.fetchone()[0]
 
-    conn.close()
     return result
 
 def get_standings_data(division_type: str):
     """
     Used to grab data to format
     to a string for the post_standings method
+
+    Ranks are the materialized ranks, the changes from
+    get_all_rank_changes_data still have to be replayed on top.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     # Fetch team data
-    cursor.execute("""
-        SELECT team_name, rank, wins, losses 
+    cursor.execute(f"""
+        SELECT team_name, {DISPLAY_RANK} AS display_rank, wins, losses
         FROM teams 
         WHERE division = ? 
-        ORDER BY rank
+        ORDER BY display_rank
     """, (division_type,))
 
     # Store data in teams
     teams = cursor.fetchall()
-    conn.close()
 
     # Return teams to be used in helper function to format neatly
     return teams
@@ -262,185 +242,368 @@ def get_teams_data(division_type: str):
     for the given division
     """
 
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
-    # Fetch data for teams channel
-    cursor.execute("SELECT team_name, members FROM teams WHERE division = ? ORDER BY id", (division_type,))
+    # Fetch data for teams channel, joining each team's members back into one string
+    cursor.execute('''
+    SELECT team_name, (
+        SELECT GROUP_CONCAT(display_name, ', ') FROM (
+            SELECT display_name FROM team_members
+            WHERE team_id = teams.id
+            ORDER BY id
+        )
+    )
+    FROM teams
+    WHERE division = ?
+    ORDER BY id
+    ''', (division_type,))
 
     teams_data = cursor.fetchall()
-    conn.close()
 
     return teams_data
     
-def db_set_rank(division_type: str, team_name: str, new_rank: int, current_rank: int):
+def get_all_teams_data():
     """
-    Provides the logic for the set rank command
-    that will be used by Admins if they need
-    to manually change a teams rank
+    Grabs every team across all divisions
+    in the order they were registered
+
+    Ranks are the materialized ranks, the changes from
+    get_all_rank_changes_data still have to be replayed on top.
     """
+    cursor = get_connection().cursor()
 
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor.execute(f"SELECT team_name, division, {DISPLAY_RANK}, wins, losses FROM teams ORDER BY id")
+    teams_data = cursor.fetchall()
 
-    # Update the rank of the given team
-    cursor.execute(" UPDATE teams SET rank = ? WHERE division = ? AND team_name = ?",
-                   (new_rank, division_type, team_name))
-    
-    # Adjust the ranks of other teams in the division
-    if new_rank < current_rank:
-        # If the rank is moved up, push other teams down
-        cursor.execute("UPDATE teams SET rank = rank + 1 WHERE division = ? AND rank >= ? AND team_name != ?",
-                       (division_type, new_rank, team_name)
-                       )
-    elif new_rank > current_rank:
-        # If rank is moved down, pull other teams up
-        cursor.execute(
-            "UPDATE teams SET rank = rank - 1 WHERE division = ? AND rank <= ? AND team_name != ?",
-            (division_type, new_rank, team_name)
-        )
-    
-    conn.commit()
-    conn.close()
+    return teams_data
 
-def db_update_rankings(division_type: str, winning_team: str, losing_team: str):
+def get_all_rank_changes_data():
     """
-    Updates rankings and records based on the result of a match.
+    Grabs every rank change not yet materialized
+    across all divisions, in the order they were logged
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
-    # Step 1: Retrieve and store all teams' ranks
-    cursor.execute(f'''
-    SELECT team_name, rank FROM teams
-    WHERE division = ?
-    ORDER BY rank
-    ''', (division_type,))
-    teams = cursor.fetchall()
+    cursor.execute("SELECT division, team_name, rank, first_rank, last_rank, rank_offset FROM rank_changes ORDER BY id")
+    rank_changes = cursor.fetchall()
 
-    # Create a dictionary to easily access team ranks
-    team_ranks = {team[0]: team[1] for team in teams}
+    return rank_changes
 
-    # Get the current ranks for winning and losing teams
-    winning_team_rank = team_ranks.get(winning_team)
-    losing_team_rank = team_ranks.get(losing_team)
+def get_all_team_members_data():
+    """
+    Grabs every team member across all divisions
+    with the team they are on, in the order
+    they were registered
+    """
+    cursor = get_connection().cursor()
 
-    if winning_team_rank is None or losing_team_rank is None:
-        conn.close()
-        return "Error: One or both teams not found."
+    cursor.execute('''
+    SELECT teams.team_name, team_members.display_name, team_members.discord_id
+    FROM team_members
+    JOIN teams ON teams.id = team_members.team_id
+    ORDER BY team_members.id
+    ''')
+    members_data = cursor.fetchall()
 
-    # Step 2: Update ranks for winning and losing teams
-    if winning_team_rank > losing_team_rank:
+    return members_data
 
-        # First, shift all teams ranked between the losing team and winning team up by one
-        for team, rank in team_ranks.items():
-            if losing_team_rank < rank < winning_team_rank:
-                team_ranks[team] = rank + 1
+def shift_ranks(cursor, division_type: str, first_rank: int, last_rank: int, offset: int):
+    """
+    Moves every team ranked from first_rank to last_rank
+    (inclusive) in the given division by offset with a
+    single range UPDATE, so only the affected rows are touched
+    """
+    cursor.execute(
+        "UPDATE teams SET rank = rank + ? WHERE division = ? AND rank BETWEEN ? AND ?",
+        (offset, division_type, first_rank, last_rank)
+    )
 
-        # Now, set the winning team to the rank of the losing team
-        team_ranks[winning_team] = losing_team_rank
+def get_logged_ranks(cursor, division_type: str, team_names: list):
+    """
+    Returns {team_name: rank} of the given teams in a dense division:
+    their rank column with the rank changes still in the log replayed
+    on top, the same way db_materialize_ranks replays them
+    """
+    if not team_names:
+        return {}
 
-        # Finally, set the losing team to the rank previously held by the winning team
-        team_ranks[losing_team] = winning_team_rank
+    # One lookup per team, so each one is a search of the team name index
+    ranks = {}
+    for team_name in team_names:
+        cursor.execute("SELECT rank FROM teams WHERE division = ? AND team_name = ?", (division_type, team_name))
+        result = cursor.fetchone()
+        if result:
+            ranks[team_name] = result[0]
 
-    elif winning_team_rank < losing_team_rank:
-        conn.close()
-        return "Error: The winning team rank is not greater than the losing team rank."
+    cursor.execute("SELECT team_name, rank, first_rank, last_rank, rank_offset FROM rank_changes WHERE division = ? ORDER BY id", (division_type,))
+    return replay_rank_changes(ranks, cursor.fetchall())
 
-    # Step 3: Apply new ranking order
-    sorted_teams = sorted(team_ranks.items(), key=lambda item: item[1])
-    for index, (team_name, _) in enumerate(sorted_teams):
-        cursor.execute(f'''
-        UPDATE teams
-        SET rank = ?
-        WHERE team_name = ?
-        AND division = ?
-        ''', (index + 1, team_name, division_type))
+def replay_rank_changes(ranks: dict, rank_changes: list):
+    """
+    Applies (team_name, rank, first_rank, last_rank, rank_offset)
+    rows of one division's rank_changes log, in log order, to
+    {team_name: rank} and returns it. A change of a team missing
+    from ranks is skipped.
+    """
+    for changed_team, rank, first_rank, last_rank, offset in rank_changes:
+        if changed_team is None:
+            for team_name, team_rank in ranks.items():
+                if first_rank <= team_rank <= last_rank:
+                    ranks[team_name] = team_rank + offset
+        elif changed_team in ranks:
+            ranks[changed_team] = rank
 
-    # Update wins and losses
-    cursor.execute(f'''
-    UPDATE teams
-    SET wins = wins + 1, win_streak = win_streak + 1, lose_streak = 0
-    WHERE team_name = ?
-    AND division = ?
-    ''', (winning_team, division_type))
+    return ranks
 
-    cursor.execute(f'''
-    UPDATE teams
-    SET losses = losses + 1, lose_streak = lose_streak + 1, win_streak = 0
-    WHERE team_name = ?
-    AND division = ?
-    ''', (losing_team, division_type))
+def get_rank_key(cursor, division_type: str, team_name: str):
+    """
+    Returns the team's sparse rank key, None for no team
+    """
+    if team_name is None:
+        return None
 
-    conn.commit()
-    conn.close()
+    cursor.execute("SELECT rank_key FROM teams WHERE division = ? AND team_name = ?", (division_type, team_name))
+    result = cursor.fetchone()
+    return result[0] if result else None
 
-def db_register_team(division_type: str, team_name: str, members: str):
+def spread_rank_keys(cursor, division_type: str):
     """
-    INSERT's given data into correct table
-    in ladderbot.db based on the division type given.
+    Gives the teams of a sparse division evenly spread
+    rank keys in their current order, RANK_KEY_GAP apart
     """
-    # Count the total teams in given division and assign team rank to bottom
-    starting_rank = count_teams(division_type) + 1
-    
-    # Create teams with 0 wins and losses
-    default_win_loss = 0
+    cursor.execute("SELECT id FROM teams WHERE division = ? ORDER BY rank_key, id", (division_type,))
+    cursor.executemany("UPDATE teams SET rank_key = ? WHERE id = ?",
+                       [(position * RANK_KEY_GAP, team_id) for position, (team_id,) in enumerate(cursor.fetchall(), start=1)])
 
-    # Connect to ladderbot.db and create cursor
-    conn = connect_db()
-    cursor = conn.cursor()
+def place_rank_key(cursor, division_type: str, team_name: str, team_above: str, team_below: str):
+    """
+    Gives a team in a sparse division the rank key halfway between
+    the teams that end up above and below it, the only row a move
+    writes. The division's keys are spread out first if the two
+    neighbors have no key left between them.
+    """
+    key_above = get_rank_key(cursor, division_type, team_above)
+    key_below = get_rank_key(cursor, division_type, team_below)
 
-    # INSERT data in correct division for the team
-    cursor.execute('''
-        INSERT INTO teams (team_name, division, rank, wins, losses, members, win_streak, lose_streak)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-''', (team_name, division_type, starting_rank, default_win_loss, default_win_loss, members, default_win_loss, default_win_loss))
-    
-    # Commit and close the connection to the database
-    conn.commit()
-    conn.close()
+    # A neighbor that is gone means the move was planned from an order the division no longer has
+    if (team_above is not None and key_above is None) or (team_below is not None and key_below is None):
+        raise StaleRankDiffError(f"The neighbors of Team {team_name} in the {division_type} division are not where the rank diff expected them")
 
-def db_remove_team(division_type: str, team_name: str):
+    if key_above is not None and key_below is not None and key_below - key_above < 2:
+        spread_rank_keys(cursor, division_type)
+        key_above = get_rank_key(cursor, division_type, team_above)
+        key_below = get_rank_key(cursor, division_type, team_below)
+
+    if key_above is None and key_below is None:
+        rank_key = RANK_KEY_GAP
+    elif key_above is None:
+        rank_key = key_below - RANK_KEY_GAP
+    elif key_below is None:
+        rank_key = key_above + RANK_KEY_GAP
+    else:
+        rank_key = (key_above + key_below) // 2
+
+    cursor.execute("UPDATE teams SET rank_key = ? WHERE division = ? AND team_name = ?", (rank_key, division_type, team_name))
+
+def apply_rank_diff(cursor, division_type: str, rank_diff: dict):
     """
-    DELETE's a given team from a given division
-    in the ladderbot.db and updates the ranks accordingly.
+    Writes a rank diff planned by the ladder engine: DELETE's
+    the removed teams, then in a sparse division gives every
+    placed team a rank key between its neighbors. In a dense
+    division the shifts and placements go in the rank_changes
+    log instead, one row each, for db_materialize_ranks to write
+    to the rank column later.
+
+    Raises StaleRankDiffError, leaving the ranks as they are, if the diff
+    was planned from ranks the division no longer has. Replaying
+    its shifts would give teams the same rank for good.
     """
-    # Connect to ladderbot.db and create cursor
-    conn = connect_db()
-    cursor = conn.cursor()
+    rank_mode = get_rank_mode(division_type)
 
-    # DELETE the specified team
-    cursor.execute("DELETE FROM teams WHERE team_name = ? AND division = ?", (team_name, division_type))
+    if rank_mode == 'dense':
+        expected_ranks = dict(rank_diff['expected'])
+        logged_ranks = get_logged_ranks(cursor, division_type, list(expected_ranks))
+        if logged_ranks != expected_ranks:
+            raise StaleRankDiffError(f"The {division_type} rank diff expected the ranks {expected_ranks} but the division has {logged_ranks}")
 
-    # Retrieve and store all remaining teams' ranks in the division
-    cursor.execute(f'''
-    SELECT team_name FROM teams
-    WHERE division = ?
-    ORDER BY rank
-    ''', (division_type,))
-    remaining_teams = cursor.fetchall()
+    cursor.executemany("DELETE FROM teams WHERE team_name = ? AND division = ?",
+                       [(team_name, division_type) for team_name in rank_diff['removed']])
+
+    # Sparse keys keep their order without the teams in between being touched
+    if rank_mode == 'sparse':
+        for team_name, team_above, team_below in rank_diff['neighbors']:
+            place_rank_key(cursor, division_type, team_name, team_above, team_below)
+        return
+
+    cursor.executemany("INSERT INTO rank_changes (division, first_rank, last_rank, rank_offset) VALUES (?, ?, ?, ?)",
+                       [(division_type, first_rank, last_rank, offset) for first_rank, last_rank, offset in rank_diff['shifts']])
+
+    cursor.executemany("INSERT INTO rank_changes (division, team_name, rank) VALUES (?, ?, ?)",
+                       [(division_type, team_name, rank) for team_name, rank in rank_diff['ranks']])
+
+def db_apply_rank_diff(division_type: str, rank_diff: dict):
+    """
+    Persists a rank diff from the ladder engine in one
+    transaction, used for the set rank command and for
+    removing a team
+    """
+    with transaction() as cursor:
+        apply_rank_diff(cursor, division_type, rank_diff)
+
+def db_materialize_ranks():
+    """
+    Brings the rank column up to date by replaying the
+    rank_changes log in order and emptying it, all in one
+    transaction. Returns how many changes were written.
+
+    Raises ValueError and rolls back if a division does not end
+    up ranked 1 to n without gaps or duplicates.
+    """
+    with transaction() as cursor:
+        cursor.execute("SELECT id, division, team_name, rank, first_rank, last_rank, rank_offset FROM rank_changes ORDER BY id")
+        rank_changes = cursor.fetchall()
+
+        for change_id, division_type, team_name, rank, first_rank, last_rank, offset in rank_changes:
+            if team_name is None:
+                shift_ranks(cursor, division_type, first_rank, last_rank, offset)
+            else:
+                cursor.execute("UPDATE teams SET rank = ? WHERE division = ? AND team_name = ?", (rank, division_type, team_name))
+
+        for division_type in {change[1] for change in rank_changes}:
+            cursor.execute("SELECT COUNT(*), COUNT(DISTINCT rank), MIN(rank), MAX(rank) FROM teams WHERE division = ?", (division_type,))
+            team_count, rank_count, min_rank, max_rank = cursor.fetchone()
+            if team_count and not (team_count == rank_count == max_rank and min_rank == 1):
+                raise ValueError(f"The {division_type} division would have {team_count} teams with {rank_count} distinct ranks from {min_rank} to {max_rank}")
+
+        if rank_changes:
+            cursor.execute("DELETE FROM rank_changes WHERE id <= ?", (rank_changes[-1][0],))
+
+    return len(rank_changes)
+
+def db_rebalance_rank_keys():
+    """
+    Spreads out the rank keys of every sparse division where
+    two neighbors have ended up closer than RANK_KEY_REBALANCE_GAP,
+    so later moves still find room between them. Returns the
+    divisions that were rebalanced.
+    """
+    rebalanced = []
+
+    with transaction() as cursor:
+        for division_type, division_state in get_states().items():
+            if division_state['rank_mode'] != 'sparse':
+                continue
+
+            cursor.execute('''
+            SELECT MIN(gap) FROM (
+                SELECT rank_key - LAG(rank_key) OVER (ORDER BY rank_key) AS gap
+                FROM teams WHERE division = ? AND rank_key IS NOT NULL
+            )
+            ''', (division_type,))
+            smallest_gap = cursor.fetchone()[0]
 
-    # Update ranks of remaining teams
-    for index, (team_name,) in enumerate(remaining_teams):
+            if smallest_gap is not None and smallest_gap < RANK_KEY_REBALANCE_GAP:
+                spread_rank_keys(cursor, division_type)
+                rebalanced.append(division_type)
+
+    return rebalanced
+
+def db_set_rank_mode(division_type: str, rank_mode: str):
+    """
+    Switches how the division stores ranks. Going sparse turns
+    the materialized ranks into rank keys RANK_KEY_GAP apart,
+    going dense writes each team's position back to the rank column.
+    """
+    if rank_mode not in VALID_RANK_MODES:
+        raise ValueError(f"Unknown rank mode {rank_mode}")
+
+    with transaction() as cursor:
+        if get_rank_mode(division_type) == rank_mode:
+            return
+
+        if rank_mode == 'sparse':
+            # Logged dense changes have to be in the rank column before it is converted
+            db_materialize_ranks()
+            cursor.execute("UPDATE teams SET rank_key = rank * ? WHERE division = ?", (RANK_KEY_GAP, division_type))
+        else:
+            cursor.execute("SELECT id FROM teams WHERE division = ? ORDER BY rank_key, id", (division_type,))
+            cursor.executemany("UPDATE teams SET rank = ?, rank_key = NULL WHERE id = ?",
+                               [(position, team_id) for position, (team_id,) in enumerate(cursor.fetchall(), start=1)])
+
+        cursor.execute("UPDATE states SET rank_mode = ? WHERE division = ?", (rank_mode, division_type))
+
+        # Drop the cached states once the change commits
+        call_after_commit(invalidate_states)
+
+def db_update_rankings(division_type: str, winning_team: str, losing_team: str, rank_diff: dict):
+    """
+    Updates rankings and records based on the result of a match.
+    rank_diff is the ladder engine's plan for the match, empty
+    when nothing moves.
+    """
+    with transaction() as cursor:
+        # The winning challenger takes the rank of the losing team
+        apply_rank_diff(cursor, division_type, rank_diff)
+
+        # Update wins and losses
         cursor.execute(f'''
         UPDATE teams
-        SET rank = ?
+        SET wins = wins + 1, win_streak = win_streak + 1, lose_streak = 0
         WHERE team_name = ?
         AND division = ?
-        ''', (index + 1, team_name, division_type))
+        ''', (winning_team, division_type))
 
-    # Commit changes and close the connection
-    conn.commit()
-    conn.close()
-    
-def db_clear_all_teams(division_type: str):
+        cursor.execute(f'''
+        UPDATE teams
+        SET losses = losses + 1, lose_streak = lose_streak + 1, win_streak = 0
+        WHERE team_name = ?
+        AND division = ?
+        ''', (losing_team, division_type))
+
+def db_register_team(division_type: str, team_name: str, members: list, rank_diff: dict):
     """
-    Clear all teams in the given division from the database.
+    INSERT's given data into correct table
+    in ladderbot.db based on the division type given.
+
+    members is a list of (display_name, discord_id) tuples,
+    discord_id can be None for members without a Discord account
+    such as the test teams.
+
+    rank_diff is the ladder engine's plan placing the team at the
+    bottom. The team is stored with rank 0, which no shift touches,
+    until db_materialize_ranks gives it its rank.
+
+    Raises ValueError if a team in any division already has the name,
+    StaleRankDiffError if rank_diff no longer matches the division.
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    # Create teams with 0 wins and losses
+    default_win_loss = 0
 
-    cursor.execute("DELETE FROM teams WHERE division = ?", (division_type,))
+    with transaction() as cursor:
+        # Team names are unique across every division
+        cursor.execute("SELECT COUNT(*) FROM teams WHERE team_name = ?", (team_name,))
+        if cursor.fetchone()[0] > 0:
+            raise ValueError(f"Team {team_name} is already registered")
+
+        # INSERT data in correct division for the team
+        cursor.execute('''
+            INSERT INTO teams (team_name, division, rank, wins, losses, win_streak, lose_streak)
+            VALUES (?, ?, 0, ?, ?, ?, ?)
+''', (team_name, division_type, default_win_loss, default_win_loss, default_win_loss, default_win_loss))
+        team_id = cursor.lastrowid
+
+        apply_rank_diff(cursor, division_type, rank_diff)
+
+        # One team_members row per member
+        cursor.executemany(
+            "INSERT INTO team_members (team_id, display_name, discord_id) VALUES (?, ?, ?)",
+            [(team_id, display_name, discord_id) for display_name, discord_id in members]
+        )
 
-    conn.commit()
-    conn.close()
+def db_clear_all_teams(division_type: str):
+    """
+    Clear all teams in the given division from the database.
+    """
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM teams WHERE division = ?", (division_type,))
+        cursor.execute("DELETE FROM rank_changes WHERE division = ?", (division_type,))
@@ -0,0 +1,398 @@
+"""
+The ladder rules, kept apart from SQLite and Discord.
+
+A DivisionLadder holds the rank order of one division in memory
+and works out what every rank changing action does to it:
+registering at the bottom, the challenge window, the challenger
+taking the rank of the team it beat, closing the gap a removed
+team leaves and an Admin moving a team by hand.
+
+Every action is planned first. A plan is a rank diff that
+changes nothing by itself:
+    {
+        'removed': [team_name, ...],                   teams taken off the ladder
+        'shifts': [(first_rank, last_rank, offset)],  every team ranked first_rank to last_rank moves by offset
+        'ranks': [(team_name, rank), ...]              teams placed at a rank, after the shifts
+        'neighbors': [(team_name, team_above, team_below), ...]
+                                                       the teams next to each placed team afterwards, None at either end
+        'expected': [(team_name, rank), ...]           ranks the plan was made from, before the change
+    }
+The database persists the diff and the ladder applies it once the
+write succeeded, so both always agree without the rules living in SQL.
+The database rejects a diff whose expected ranks it no longer has,
+a diff planned from a stale order would otherwise corrupt the ranks.
+Dense ranks are stored from the shifts and ranks, sparse rank keys
+only need each placed team's neighbors.
+
+The rank order is kept in a RankTree, so looking up ranks and moving,
+adding or removing a team stay O(log n) in the largest divisions.
+"""
+
+import random
+
+# How many ranks above itself a team may challenge
+CHALLENGE_WINDOW = 2
+
+def create_rank_diff(removed: list = None, shifts: list = None, ranks: list = None, neighbors: list = None, expected: list = None):
+    """
+    Returns a rank diff, an empty one when nothing is given
+    """
+    return {'removed': removed or [], 'shifts': shifts or [], 'ranks': ranks or [], 'neighbors': neighbors or [], 'expected': expected or []}
+
+def is_rank_diff_empty(rank_diff: dict):
+    """
+    Checks if the diff changes nothing
+    """
+    return not (rank_diff['removed'] or rank_diff['shifts'] or rank_diff['ranks'])
+
+def is_in_challenge_window(challenger_rank: int, challenged_rank: int):
+    """
+    Checks if a team at challenger_rank may challenge the team at
+    challenged_rank, only teams up to two ranks above are allowed
+    """
+    return challenger_rank - CHALLENGE_WINDOW <= challenged_rank < challenger_rank
+
+class RankTreeNode:
+    """
+    One team in a RankTree
+    """
+    __slots__ = ('team_name', 'priority', 'size', 'left', 'right', 'parent')
+
+    def __init__(self, team_name: str, priority: float):
+        self.team_name = team_name
+        self.priority = priority
+        self.size = 1
+        self.left = None
+        self.right = None
+        self.parent = None
+
+def node_size(node: RankTreeNode):
+    """
+    Returns how many nodes are in the subtree, 0 for None
+    """
+    return node.size if node is not None else 0
+
+def update_node(node: RankTreeNode):
+    """
+    Recounts the node's subtree size and
+    points its children back at it
+    """
+    node.size = 1 + node_size(node.left) + node_size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+
+def split_nodes(node: RankTreeNode, count: int):
+    """
+    Splits a subtree into its first count nodes and the rest
+    """
+    if node is None:
+        return None, None
+
+    if node_size(node.left) >= count:
+        left, node.left = split_nodes(node.left, count)
+        update_node(node)
+        if left is not None:
+            left.parent = None
+        return left, node
+
+    node.right, right = split_nodes(node.right, count - node_size(node.left) - 1)
+    update_node(node)
+    if right is not None:
+        right.parent = None
+    return node, right
+
+def merge_nodes(left: RankTreeNode, right: RankTreeNode):
+    """
+    Joins two subtrees, every node of left ending up before every node of right
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        left.right = merge_nodes(left.right, right)
+        update_node(left)
+        return left
+
+    right.left = merge_nodes(left, right.left)
+    update_node(right)
+    return right
+
+class RankTree:
+    """
+    Order statistic tree of team names in rank order.
+
+    An implicit treap: nodes are ordered by position instead of
+    a key and every node knows the size of its subtree, so the
+    rank of a node, the node at a rank, inserting and removing
+    all take O(log n) expected time however large the division is.
+    """
+    def __init__(self, team_names: list = ()):
+        """
+        Builds the tree from team_names in rank order in O(n)
+        """
+        self.random = random.Random()
+        self.root = None
+
+        # Cartesian tree over random priorities, the right spine is kept on a stack
+        spine = []
+        for team_name in team_names:
+            node = RankTreeNode(team_name, self.random.random())
+
+            last = None
+            while spine and spine[-1].priority < node.priority:
+                last = spine.pop()
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+
+        if spine:
+            self.root = spine[0]
+            # Sizes and parents bottom up, children always come after their parent in a preorder
+            preorder = []
+            stack = [self.root]
+            while stack:
+                node = stack.pop()
+                preorder.append(node)
+                stack.extend(child for child in (node.left, node.right) if child is not None)
+            for node in reversed(preorder):
+                update_node(node)
+
+    def __len__(self):
+        return node_size(self.root)
+
+    def __iter__(self):
+        """
+        Yields every team name in rank order
+        """
+        stack = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.team_name
+            node = node.right
+
+    def rank_of(self, node: RankTreeNode):
+        """
+        Returns the rank of a node in the tree, rank 1 first
+        """
+        rank = node_size(node.left) + 1
+        while node.parent is not None:
+            if node is node.parent.right:
+                rank += node_size(node.parent.left) + 1
+            node = node.parent
+        return rank
+
+    def node_at(self, rank: int):
+        """
+        Returns the node at the rank, which has to be in the tree
+        """
+        node = self.root
+        while True:
+            left_size = node_size(node.left)
+            if rank <= left_size:
+                node = node.left
+            elif rank == left_size + 1:
+                return node
+            else:
+                rank -= left_size + 1
+                node = node.right
+
+    def insert(self, rank: int, team_name: str):
+        """
+        Inserts a team at the rank, the teams from that
+        rank down move one lower. Returns the team's node.
+        """
+        node = RankTreeNode(team_name, self.random.random())
+        left, right = split_nodes(self.root, rank - 1)
+        self.root = merge_nodes(merge_nodes(left, node), right)
+        self.root.parent = None
+        return node
+
+    def remove(self, node: RankTreeNode):
+        """
+        Removes a node, the teams below it move one higher
+        """
+        rank = self.rank_of(node)
+        left, rest = split_nodes(self.root, rank - 1)
+        removed, right = split_nodes(rest, 1)
+        self.root = merge_nodes(left, right)
+        if self.root is not None:
+            self.root.parent = None
+
+class DivisionLadder:
+    """
+    In memory rank order of the teams in one division,
+    every read and every change is O(log n)
+    """
+    def __init__(self, division_type: str, team_names: list = ()):
+        """
+        Constructs the ladder with team_names in rank order, rank 1 first
+        """
+        self.division_type = division_type
+
+        # Team names in rank order, rank 1 first
+        self.tree = RankTree(team_names)
+
+        # team_name -> the team's node in the tree
+        self.nodes = {}
+        self.index_nodes(self.tree.root)
+
+    # NOTE: READS
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, team_name: str):
+        return team_name in self.nodes
+
+    def __iter__(self):
+        return iter(self.tree)
+
+    def rank_of(self, team_name: str):
+        """
+        Returns the rank of the team or None if it is not on the ladder
+        """
+        node = self.nodes.get(team_name)
+        return self.tree.rank_of(node) if node is not None else None
+
+    def team_at(self, rank: int):
+        """
+        Returns the team at the rank or None if no team has it
+        """
+        if 1 <= rank <= len(self.nodes):
+            return self.tree.node_at(rank).team_name
+        return None
+
+    def get_ranking(self):
+        """
+        Returns every team name in rank order
+        """
+        return list(self.tree)
+
+    def can_challenge(self, challenger_team: str, challenged_team: str):
+        """
+        Checks if both teams are on the ladder and the challenged
+        team is within the challenger's challenge window
+        """
+        challenger_rank = self.rank_of(challenger_team)
+        challenged_rank = self.rank_of(challenged_team)
+
+        if challenger_rank is None or challenged_rank is None:
+            return False
+        return is_in_challenge_window(challenger_rank, challenged_rank)
+
+    # NOTE: PLANS, each returns a rank diff and leaves the ladder as it is
+
+    def plan_register(self, team_name: str):
+        """
+        A new team starts at the bottom of the ladder
+        """
+        if team_name in self.nodes:
+            raise ValueError(f"Team {team_name} is already on the {self.division_type} ladder")
+
+        return create_rank_diff(ranks=[(team_name, len(self.nodes) + 1)], neighbors=[(team_name, self.team_at(len(self.nodes)), None)],
+                                expected=self.get_expected_ranks(len(self.nodes)))
+
+    def plan_remove(self, team_name: str):
+        """
+        Removing a team pulls every team below it up one
+        """
+        removed_rank = self.require_rank(team_name)
+
+        shifts = []
+        if removed_rank < len(self.nodes):
+            shifts.append((removed_rank + 1, len(self.nodes), -1))
+
+        return create_rank_diff(removed=[team_name], shifts=shifts, expected=self.get_expected_ranks(removed_rank, removed_rank + 1, len(self.nodes)))
+
+    def plan_move(self, team_name: str, new_rank: int):
+        """
+        Moves the team to new_rank, the teams it passes shift by one
+        """
+        current_rank = self.require_rank(team_name)
+
+        if not 1 <= new_rank <= len(self.nodes):
+            raise ValueError(f"Rank {new_rank} is not between 1 and {len(self.nodes)} in the {self.division_type} ladder")
+
+        if new_rank < current_rank:
+            # Moved up, the teams it passes are pushed down
+            shifts = [(new_rank, current_rank - 1, 1)]
+            neighbors = (self.team_at(new_rank - 1), self.team_at(new_rank))
+        elif new_rank > current_rank:
+            # Moved down, the teams it passes are pulled up
+            shifts = [(current_rank + 1, new_rank, -1)]
+            neighbors = (self.team_at(new_rank), self.team_at(new_rank + 1))
+        else:
+            return create_rank_diff()
+
+        return create_rank_diff(shifts=shifts, ranks=[(team_name, new_rank)], neighbors=[(team_name, *neighbors)],
+                                expected=self.get_expected_ranks(current_rank, *shifts[0][:2]))
+
+    def plan_match(self, winning_team: str, losing_team: str, challenger_won: bool):
+        """
+        A challenger that wins takes the rank of the team it beat,
+        which moves down one with everyone between them. Nothing
+        moves when the challenged team wins.
+        """
+        winning_rank = self.require_rank(winning_team)
+        losing_rank = self.require_rank(losing_team)
+
+        if challenger_won and winning_rank > losing_rank:
+            return self.plan_move(winning_team, losing_rank)
+
+        return create_rank_diff()
+
+    # NOTE: APPLY, call only after the diff was persisted
+
+    def apply(self, rank_diff: dict):
+        """
+        Applies a rank diff planned by this ladder
+        """
+        for team_name in rank_diff['removed']:
+            self.tree.remove(self.nodes.pop(team_name))
+
+        # Placing a team where it belongs shifts everyone the diff's shifts describe
+        for team_name, rank in rank_diff['ranks']:
+            node = self.nodes.get(team_name)
+            if node is not None:
+                self.tree.remove(node)
+            self.nodes[team_name] = self.tree.insert(rank, team_name)
+
+    def index_nodes(self, root: RankTreeNode):
+        """
+        Adds every node under root to the team name index
+        """
+        stack = [root] if root is not None else []
+        while stack:
+            node = stack.pop()
+            self.nodes[node.team_name] = node
+            stack.extend(child for child in (node.left, node.right) if child is not None)
+
+    def get_expected_ranks(self, *ranks: int):
+        """
+        Returns the (team_name, rank) of the teams at the
+        given ranks now, skipping ranks no team has
+        """
+        expected_ranks = []
+        for rank in dict.fromkeys(ranks):
+            team_name = self.team_at(rank)
+            if team_name is not None:
+                expected_ranks.append((team_name, rank))
+        return expected_ranks
+
+    def require_rank(self, team_name: str):
+        """
+        Returns the rank of a team that has to be on the ladder
+        """
+        rank = self.rank_of(team_name)
+        if rank is None:
+            raise ValueError(f"Team {team_name} is not on the {self.division_type} ladder")
+        return rank
@@ -1,14 +1,23 @@
+import asyncio
+import contextlib
+
 import discord
 from discord.ext import tasks
 
 from stat_manager import StatManager
 from rival_manager import RivalManager
+from ladder_state_cache import LadderStateCache, BOARD_TYPES
+from board_publisher import BoardPublisher
+from board_scheduler import BoardScheduler
+from board_renderer import BoardRenderer, BOARD_FORMATS
+from notification_dispatcher import NotificationDispatcher
+from member_directory import MemberDirectory
 
-from database import initialize_database, count_teams, db_register_team, db_remove_team, db_set_rank, db_update_rankings, is_team_name_unique, is_member_registered, is_member_on_team, check_team_division, does_team_exist, is_team_challenged, has_team_challenged, find_opponent_team, give_team_rank, db_register_challenge, db_remove_challenge, add_team_wins_losses, remove_challenge, is_ladder_running, set_ladder_running, subtract_team_wins_losses, get_wins_or_losses, get_standings_data, get_challenges_data, db_set_standings_channel, db_set_challenges_channel, is_standings_channel_set, get_standings_channel_id, is_challenges_channel_set, get_challenges_channel_id, db_clear_standings_channel, db_clear_challenges_channel, get_team_members, db_clear_all_challenges, db_clear_all_teams, get_teams_data, db_set_teams_channel, db_clear_teams_channel, is_teams_channel_set, get_teams_channel_id, is_member_in_members_table, db_register_member
+from database import StaleRankDiffError, run_db, db_report_match, initialize_database, db_register_team, db_apply_rank_diff, db_materialize_ranks, db_rebalance_rank_keys, db_set_rank_mode, get_rank_mode, db_register_challenge, db_remove_challenge, add_team_wins_losses, set_ladder_running, subtract_team_wins_losses, db_set_standings_channel, db_set_challenges_channel, is_standings_channel_set, get_standings_channel_id, is_challenges_channel_set, get_challenges_channel_id, db_clear_standings_channel, db_clear_challenges_channel, db_clear_all_challenges, db_clear_all_teams, db_set_teams_channel, db_clear_teams_channel, is_teams_channel_set, get_teams_channel_id, get_board_pages, db_set_board_page, db_delete_board_pages
 
-from utils import is_correct_member_size, is_valid_division_type, has_duplicate_members, create_members_string, format_standings_data, format_challenges_data, format_teams_data, add_time_stamp
+from utils import is_correct_member_size, is_valid_division_type, has_duplicate_members, create_members_string, add_time_stamp
 
-from config import VALID_DIVISION_TYPES
+from config import VALID_DIVISION_TYPES, VALID_RANK_MODES, BOARD_RESYNC_MINUTES, RANK_MATERIALIZE_SECONDS
 
 from logs.logger import logger 
 
@@ -37,46 +46,109 @@ class LadderManager:
         # Instantiate the StatManager and RivalManager
         self.stat_manager = StatManager()
         self.rival_manager = RivalManager()
+
+        # Index of every guild's members by display name and ID, built in on_ready
+        self.member_directory = MemberDirectory()
         
         #Init the ladderbot.db when the LadderManager is instantiated
         initialize_database()
 
-        # Starts the update of standings, challenges, and teams if they are set
-        self.periodic_update_standings.start()
-        self.periodic_update_challenges.start()
-        self.periodic_update_teams.start()
+        # Load the ladder state into memory, every change is written through to it after the database
+        self.state_cache = LadderStateCache()
+        self.state_cache.load()
+
+        # One lock per division, held from planning a rank change on the ladder engine until it is applied
+        # to the state cache, so no other change in the division is planned from the order it replaces
+        self.division_locks = {division_type: asyncio.Lock() for division_type in VALID_DIVISION_TYPES}
+
+        # (division_type, board) -> board version last edited into its channel
+        self.published_board_versions = {}
+
+        # Publishes a board whenever the ladder state behind it changes
+        self.board_publisher = BoardPublisher(self.publish_board)
+        self.state_cache.on_board_changed = self.board_publisher.notify
+
+        # Renders the boards into pages, only formatting the rows that changed since the last render
+        self.board_renderer = BoardRenderer()
+
+        # Sends every board edit to Discord, coalesced and within each channel's rate limit
+        self.board_scheduler = BoardScheduler(self.edit_board)
+
+        # Delivers the notifications in the outbox, started in on_ready once the member caches are filled
+        self.notification_dispatcher = NotificationDispatcher(self.get_notification_recipient)
+
+        # Starts the board publisher, the board scheduler, the low frequency safety resync of every board and writing logged rank changes to the rank column
+        self.board_publisher.start()
+        self.board_scheduler.start()
+        self.periodic_resync_boards.start()
+        self.periodic_materialize_ranks.start()
+
+    def get_team_lock(self, team_name: str):
+        """
+        Internal method that returns the lock of the team's division.
+        A team that does not exist gets a lock nothing else holds,
+        the caller's own check then reports the missing team.
+        """
+        if self.state_cache.does_team_exist(team_name):
+            return self.division_locks[self.state_cache.check_team_division(team_name)]
+        return asyncio.Lock()
+
+    async def register_test_team(self, division_type: str, team_name: str, members: list):
+        """
+        Registers a test team in the database and the state
+        cache, returns False if the team name is already used
+        """
+        async with self.division_locks[division_type]:
+            if self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: team_name already found in database for "register_test_team". Skipping: {team_name}')
+                return False
+
+            rank_diff = self.state_cache.get_ladder(division_type).plan_register(team_name)
+            await run_db(db_register_team, division_type, team_name, members, rank_diff)
+            self.state_cache.register_team(division_type, team_name, members, rank_diff)
+            return True
 
-    def create_test_teams(self, division_type: str) -> str:
+    async def create_test_teams(self, division_type: str) -> str:
 
         if not is_valid_division_type(division_type):
             logger.error(f'LadderManager: Wrong division type given for "create_test_teams". User entered: {division_type}')
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. ❌"
 
-
-        if division_type == '1v1':
-            
-            db_register_team('1v1', "Alpha", "TestName1")
-            db_register_team('1v1', "Bravo", "TestName2")
-            db_register_team('1v1', "Charlie", "TestName3")
-            db_register_team('1v1', "Delta", "TestName4")
-            db_register_team('1v1', "Echo", "TestName5")
-            return f"Created five 1v1 test teams"
-        
-        if division_type == '2v2':
-            db_register_team('2v2', "Apple", "TestName1, TestName10")
-            db_register_team('2v2', "Butler", "TestName2, TestName1337")
-            db_register_team('2v2', "Carlos", "TestName123165, TestName112312")
-            db_register_team('2v2', "Dynasty", "TestName3425, TestName15234123")
-            db_register_team('2v2', "Ellen", "TestName11323, TestName1123124")
-            return f"Created five 2v2 test teams"
-        
-        if division_type == '3v3':
-            db_register_team('3v3', "AngelWing", "Theinfection1991, TestName87650, TestNameLength")
-            db_register_team('3v3', "Bittersweet", "TestName12435, TestName654, TestName1267544")
-            db_register_team('3v3', "Corn", "TestName3242634, Ladderbot3, TestName96")
-            db_register_team('3v3', "DeerDiary", "TestName323266, TestName73546, TestNamTestNameeLength")
-            db_register_team('3v3', "Elephant", "TestName2632464, LadTestNameTestNamederbot3, TestName6t234652Length")
-            return f"Created five 3v3 test teams"
+        test_teams = {
+            '1v1': [
+                ("Alpha", [("TestName1", None)]),
+                ("Bravo", [("TestName2", None)]),
+                ("Charlie", [("TestName3", None)]),
+                ("Delta", [("TestName4", None)]),
+                ("Echo", [("TestName5", None)])
+            ],
+            '2v2': [
+                ("Apple", [("TestName1", None), ("TestName10", None)]),
+                ("Butler", [("TestName2", None), ("TestName1337", None)]),
+                ("Carlos", [("TestName123165", None), ("TestName112312", None)]),
+                ("Dynasty", [("TestName3425", None), ("TestName15234123", None)]),
+                ("Ellen", [("TestName11323", None), ("TestName1123124", None)])
+            ],
+            '3v3': [
+                ("AngelWing", [("Theinfection1991", None), ("TestName87650", None), ("TestNameLength", None)]),
+                ("Bittersweet", [("TestName12435", None), ("TestName654", None), ("TestName1267544", None)]),
+                ("Corn", [("TestName3242634", None), ("Ladderbot3", None), ("TestName96", None)]),
+                ("DeerDiary", [("TestName323266", None), ("TestName73546", None), ("TestNamTestNameeLength", None)]),
+                ("Elephant", [("TestName2632464", None), ("LadTestNameTestNamederbot3", None), ("TestName6t234652Length", None)])
+            ]
+        }
+
+        # Test teams whose name is already used are skipped
+        skipped_teams = []
+        for team_name, members in test_teams[division_type]:
+            if not await self.register_test_team(division_type, team_name, members):
+                skipped_teams.append(team_name)
+
+        if not skipped_teams:
+            return f"Created five {division_type} test teams"
+
+        created_count = len(test_teams[division_type]) - len(skipped_teams)
+        return f"Created {created_count} {division_type} test teams, skipped {', '.join(skipped_teams)} since the team name is already being used"
   
     async def on_ready(self):
         """
@@ -87,56 +159,57 @@ class LadderManager:
         print(f"Logged in as {self.bot.user}")
         logger.info(f'LadderManager: "on_ready" initiated. Logged in as {self.bot.user}')
 
+        # Index the members of every guild the bot is in
+        for guild in self.bot.guilds:
+            self.member_directory.build_guild(guild)
+
+        # Deliver notifications, including any left in the outbox when the bot last stopped
+        self.notification_dispatcher.start()
+
         # Check if any ladders are currently running, if so print which ones
         for division_type in VALID_DIVISION_TYPES:
         # Ladder Running Check
-            if is_ladder_running(division_type):
+            if self.state_cache.is_ladder_running(division_type):
                 logger.info(f'LadderManager: "on_ready" found ladder running in {division_type} division.')
                 print(f"The {division_type} division of the ladder is currently running.")
 
             # Challenge Channel Logic
-            if is_challenges_channel_set(division_type):
-                challenge_channel_id = get_challenges_channel_id(division_type)
+            if await run_db(is_challenges_channel_set, division_type):
+                challenge_channel_id = await run_db(get_challenges_channel_id, division_type)
                 challenge_channel = self.bot.get_channel(challenge_channel_id)
                 logger.info(f'LadderManager: "on_ready" found challenges channel ID {challenge_channel} set for {division_type} division.')
 
                 if isinstance(challenge_channel, discord.TextChannel):
                     await self.update_challenges_message(division_type, challenge_channel)
                     logger.info(f'LadderManager: "on_ready" updating the challenges channel message in {challenge_channel} for {division_type} division.')
-                    self.periodic_update_challenges.restart()
-                    logger.info(f'LadderManager: "on_ready" starting the periodic update to the challenges channel in {challenge_channel} for {division_type} division.')
             else:
                 logger.warning(f'LadderManager: "on_ready" no challenges channel set for {division_type} division.')
 
             # Standings Channel Logic
-            if is_standings_channel_set(division_type):
-                standings_channel_id = get_standings_channel_id(division_type)
+            if await run_db(is_standings_channel_set, division_type):
+                standings_channel_id = await run_db(get_standings_channel_id, division_type)
                 standings_channel = self.bot.get_channel(standings_channel_id)
                 logger.info(f'LadderManager: "on_ready" found standings channel ID {standings_channel} set for {division_type} division.')
 
                 if isinstance(standings_channel, discord.TextChannel):
                     await self.update_standings_message(division_type, standings_channel)
                     logger.info(f'LadderManager: "on_ready" updating the standings channel message in {standings_channel} for {division_type} division.')
-                    self.periodic_update_standings.restart()
-                    logger.info(f'LadderManager: "on_ready" starting the periodic update to the standings channel in {standings_channel} for {division_type} division.')
             else:
                 logger.warning(f'LadderManager: "on_ready" no standings channel set for {division_type} division.')
             
             # Teams Channel Logic
-            if is_teams_channel_set(division_type):
-                teams_channel_id = get_teams_channel_id(division_type)
+            if await run_db(is_teams_channel_set, division_type):
+                teams_channel_id = await run_db(get_teams_channel_id, division_type)
                 teams_channel = self.bot.get_channel(teams_channel_id)
-                logger.info(f'LadderManager: "on_ready" found teams channel ID {standings_channel} set for {division_type} division.')
+                logger.info(f'LadderManager: "on_ready" found teams channel ID {teams_channel} set for {division_type} division.')
 
                 if isinstance(teams_channel, discord.TextChannel):
-                    await self.update_teams_message(division_type, standings_channel)
+                    await self.update_teams_message(division_type, teams_channel)
                     logger.info(f'LadderManager: "on_ready" updating the teams channel message in {teams_channel} for {division_type} division.')
-                    self.periodic_update_teams.restart()
-                    logger.info(f'LadderManager: "on_ready" starting the periodic update to the teams channel in {teams_channel} for {division_type} division.')
             else:
                 logger.warning(f'LadderManager: "on_ready" no teams channel set for {division_type} division.')
     
-    def start_ladder(self, division_type: str) -> str:
+    async def start_ladder(self, division_type: str) -> str:
         """
         Start the ladder for a given division type.
         """
@@ -144,45 +217,52 @@ class LadderManager:
             logger.error(f'LadderManager: Wrong division type given for "start_ladder". User entered: {division_type}')
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. ❌"
         
-        if is_ladder_running(division_type):
-            logger.error(f'LadderManager: The division given for "start_ladder" is already running. User entered: {division_type}')
-            return f"❌ The {division_type} division of the ladder is already running... ❌"
+        async with self.division_locks[division_type]:
+            if self.state_cache.is_ladder_running(division_type):
+                logger.error(f'LadderManager: The division given for "start_ladder" is already running. User entered: {division_type}')
+                return f"❌ The {division_type} division of the ladder is already running... ❌"
         
-        set_ladder_running(division_type, True)
-        logger.info(f'LadderManager: The {division_type} division of the ladder has started using "start_ladder" {division_type}')
-        return f"🔥 The {division_type} division of the ladder has started! 🔥"
+            await run_db(set_ladder_running, division_type, True)
+            self.state_cache.set_ladder_running(division_type, True)
+            logger.info(f'LadderManager: The {division_type} division of the ladder has started using "start_ladder" {division_type}')
+            return f"🔥 The {division_type} division of the ladder has started! 🔥"
     
     async def end_ladder(self, division_type):
         """
         End the ladder for a given division type.
+
+        Returns a list of messages to send, the announcement
+        and then each page of the final standings.
         """
         # Check if correct division type was entered
         if not is_valid_division_type(division_type):
             logger.error(f'LadderManager: Wrong division type given for "end_ladder". User entered: {division_type}')
-            return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. ❌"
+            return ["❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. ❌"]
 
-        if not is_ladder_running(division_type):
-            logger.error(f'LadderManager: The ladder for given division for "end_ladder" is not running. User entered: {division_type}')
-            return f"❌ The {division_type} division of the ladder is not currently running... ❌"
-        
-        final_standings = await self.post_standings(division_type)
-        
-        # Set ladder running to False for given division
-        set_ladder_running(division_type, False)
-        logger.info(f'LadderManager: The {division_type} division of the ladder has ended using "end_ladder" {division_type}')
+        async with self.division_locks[division_type]:
+            if not self.state_cache.is_ladder_running(division_type):
+                logger.error(f'LadderManager: The ladder for given division for "end_ladder" is not running. User entered: {division_type}')
+                return [f"❌ The {division_type} division of the ladder is not currently running... ❌"]
+
+            final_standings = await self.post_standings(division_type)
 
-        # Clear challenges and teams for given division
-        db_clear_all_challenges(division_type)
-        logger.info(f'LadderManager: All challenges in {division_type} division of the ladder has been erased.')
-        db_clear_all_teams(division_type)
-        logger.info(f'LadderManager: All teams in {division_type} division of the ladder has been removed.')
+            # Set ladder running to False for given division
+            await run_db(set_ladder_running, division_type, False)
+            self.state_cache.set_ladder_running(division_type, False)
+            logger.info(f'LadderManager: The {division_type} division of the ladder has ended using "end_ladder" {division_type}')
+
+            # Clear challenges and teams for given division
+            await run_db(db_clear_all_challenges, division_type)
+            logger.info(f'LadderManager: All challenges in {division_type} division of the ladder has been erased.')
+            await run_db(db_clear_all_teams, division_type)
+            self.state_cache.clear_division(division_type)
+            logger.info(f'LadderManager: All teams in {division_type} division of the ladder has been removed.')
 
         end_ladder_message = f"\t\t💥 The {division_type} division of the ladder has ended! 💥\n\n"
-        end_ladder_message += final_standings
         logger.info(f'LadderManager: Generated string informing users the {division_type} ladder has ended and prints the final standings for the {division_type} division.')
-        return end_ladder_message
+        return [end_ladder_message] + final_standings
 
-    def register_team(self, division_type: str, team_name: str, *members: discord.Member):
+    async def register_team(self, division_type: str, team_name: str, *members: discord.Member):
         """
         Takes the input from the discord user and
         uses a series of help and validation functions
@@ -190,7 +270,7 @@ class LadderManager:
         has been given to make a team correctly.
         """
         # Check if team name is unique and no other team is named the same in ANY division
-        if is_team_name_unique(team_name):
+        if self.state_cache.is_team_name_unique(team_name):
 
             # Check if correct divison type was entered
             if is_valid_division_type(division_type):
@@ -198,40 +278,53 @@ class LadderManager:
                 # Check if correct amount of members was given for the division type
                 if is_correct_member_size(division_type, *members):
 
-                    # Create a list of all the members display names
-                    member_display_names = [member.display_name for member in members]
+                    async with self.division_locks[division_type]:
+                        # Create a list of all the members display names
+                        member_display_names = [member.display_name for member in members]
 
-                    # Checks every members display name against the database
-                    for member_display_name in member_display_names:
+                        # Checks every member against the teams in the division
+                        for member in members:
+                            member_display_name = member.display_name
                         
-                        # If a player is already registered on a team in a given division type the process is stopped
-                        if is_member_registered(division_type, member_display_name):
-                            logger.error(f'LadderManager: Member already found on team in given division type. User entered: division_type={division_type} conflicting_member={member_display_name}')     
-                            return f"{member_display_name} is already registered on a team in the {division_type} division. Please try again."
+                            # If a player is already registered on a team in a given division type the process is stopped
+                            if self.state_cache.is_member_registered(division_type, member.id, member_display_name):
+                                logger.error(f'LadderManager: Member already found on team in given division type. User entered: division_type={division_type} conflicting_member={member_display_name}')     
+                                return f"{member_display_name} is already registered on a team in the {division_type} division. Please try again."
                         
-                    # Pass *members: discord.Member object as members                  
-                    if has_duplicate_members(members):
-                        logger.error(f'LadderManager: The same member is trying to be registered to the same team twice: division_type={division_type} members={member_display_names}')
-                        return f"❌ You are trying to register the same member twice. Please try again. Members entered: {member_display_names} ❌"
+                        # Pass *members: discord.Member object as members                  
+                        if has_duplicate_members(members):
+                            logger.error(f'LadderManager: The same member is trying to be registered to the same team twice: division_type={division_type} members={member_display_names}')
+                            return f"❌ You are trying to register the same member twice. Please try again. Members entered: {member_display_names} ❌"
                         
-                    # Turn all members into a string for the database
-                    members_string = create_members_string(*members)
-
-                    # Add team to the database with the given arguments
-                    db_register_team(division_type, team_name, members_string)
-                    logger.info(f'LadderManager: Successfully created new team with following parameters: team_name={team_name} division_type={division_type} members={members_string}')
-
-                    # Checks if members on team are already in the members table for stat tracking, if not they are added
-                    for member in members:
-                        if not is_member_in_members_table(member.id):
-                            db_register_member(member.display_name, member.id)
-                            logger.info(f'LadderManager: Member on team not found in members table for stat tracking. Registering: {member.display_name} {member.id} to database')
-                        else:
-                            self.stat_manager.increment_all_teams_count(member.id)
-                            logger.info(f'LadderManager: {member.display_name} {member.id} has had 1 added to their all_teams_count for stat tracking.')
-
-                    # Return confirmation message
-                    return f"🎖️ Team {team_name} has been registered in the {division_type} division with the following members: {members_string} 🎖️"
+                        # Turn all members into a string for the confirmation message
+                        members_string = create_members_string(*members)
+
+                        # Add team to the database with each member's display name and Discord ID
+                        team_members = [(member.display_name, member.id) for member in members]
+                        try:
+                            rank_diff = self.state_cache.get_ladder(division_type).plan_register(team_name)
+                            await run_db(db_register_team, division_type, team_name, team_members, rank_diff)
+                        except StaleRankDiffError as e:
+                            # The division's ranks in the database are not the ones the ladder engine planned from
+                            logger.error(f'LadderManager: The rank diff for "register_team" no longer matches the database. User entered: team_name={team_name} division_type={division_type} Error: {e}')
+                            return f"❌ The {division_type} ladder changed while Team {team_name} was being registered. Please try again. ❌"
+                        except ValueError:
+                            # Another registration took the name while this one waited
+                            logger.error(f'LadderManager: team_name already found in database for "register_team". User entered: {team_name}')
+                            return f"❌ Team {team_name} is already being used. Please choose another team name. ❌"
+                        self.state_cache.register_team(division_type, team_name, team_members, rank_diff)
+                        logger.info(f'LadderManager: Successfully created new team with following parameters: team_name={team_name} division_type={division_type} members={members_string}')
+
+                        # Adds members not in the members table yet for stat tracking, everyone else has 1 added to their all_teams_count
+                        new_members = await run_db(self.stat_manager.register_team_members, team_members)
+                        for display_name, discord_id in team_members:
+                            if (display_name, discord_id) in new_members:
+                                logger.info(f'LadderManager: Member on team not found in members table for stat tracking. Registering: {display_name} {discord_id} to database')
+                            else:
+                                logger.info(f'LadderManager: {display_name} {discord_id} has had 1 added to their all_teams_count for stat tracking.')
+
+                        # Return confirmation message
+                        return f"🎖️ Team {team_name} has been registered in the {division_type} division with the following members: {members_string} 🎖️"
                 
                 else:
                     members_list = [member.display_name for member in members]
@@ -246,155 +339,200 @@ class LadderManager:
             logger.error(f'LadderManager: team_name already found in database for "register_team". User entered: {team_name}')
             return f"❌ Team {team_name} is already being used. Please choose another team name. ❌"
         
-    def remove_team(self, team_name):
+    async def remove_team(self, team_name):
         """
         Finds the correct team and tells
         the database to remove them completely
         """
-        # See if team exists in the database
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team with given team_name found in database for "remove_team". User entered: {team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            # See if team exists in the database
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team with given team_name found in database for "remove_team". User entered: {team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
         
-        # If team exists grab the division they are in
-        division_type = check_team_division(team_name)
+            # If team exists grab the division they are in
+            division_type = self.state_cache.check_team_division(team_name)
+
+            # The ladder engine plans closing the gap the team leaves in the ranks
+            rank_diff = self.state_cache.get_ladder(division_type).plan_remove(team_name)
 
-        db_remove_team(division_type, team_name)
-        logger.info(f'LadderManager: Successfully removed team from {division_type} division with following parameters: team_name={team_name}')
-        return f"🛑 Team {team_name} from the {division_type} division has been removed from the Ladder. 🛑"
+            await run_db(db_apply_rank_diff, division_type, rank_diff)
+            self.state_cache.remove_team(team_name, rank_diff)
+            logger.info(f'LadderManager: Successfully removed team from {division_type} division with following parameters: team_name={team_name}')
+            return f"🛑 Team {team_name} from the {division_type} division has been removed from the Ladder. 🛑"
 
-    async def get_member_id_from_display_names(self, guild: discord.Guild, members_string: str):
+    async def get_member_ids(self, guild: discord.Guild, team_members: list):
         """
-        
+        Returns the Discord IDs of a team's
+        (display_name, discord_id) members.
+
+        The stored IDs are used as they are. Only members
+        registered before IDs were stored are looked up by
+        display name in the member directory.
         """
-        display_names = [name.strip() for name in members_string.split(",")]
         member_ids = []
         
-        for display_name in display_names:
-            member = discord.utils.get(guild.members, display_name=display_name)
-            if member:
-                member_ids.append(member.id)
+        # A team without members has None instead of a list
+        for display_name, discord_id in team_members or ():
+            if discord_id is None:
+                # A guild joined after on_ready is indexed on first use
+                if not self.member_directory.has_guild(guild):
+                    self.member_directory.build_guild(guild)
+
+                discord_id = self.member_directory.get_member_id(guild, display_name)
+
+            if discord_id is not None:
+                member_ids.append(discord_id)
             else:
                 print(f"Member with display name '{display_name}' not found in guild {guild.name}.")
         
         return member_ids
 
-    async def send_challenge_notification(self, ctx, challenger_team, challenged_team):
+    async def get_notification_recipient(self, guild_id: int, member_id: int):
+        """
+        Internal method used by the NotificationDispatcher to
+        find the member or user a notification is sent to,
+        asking Discord for the user if they are not cached
+        """
+        guild = self.bot.get_guild(guild_id)
+        member = self.member_directory.get_member(guild, member_id) if guild is not None else None
+        return member or self.bot.get_user(member_id) or await self.bot.fetch_user(member_id)
+
+    async def create_challenge_notification(self, ctx, challenger_team, challenged_team):
         """
-        Sends a notification to all members of the challenged team that they have been challenged.
+        Returns (member_ids, notification) telling all members of the challenged team that they
+        have been challenged, or ([], None) if the team has no members. The notification is put
+        in the outbox with the challenge and sent by the NotificationDispatcher.
+
+        A failure here is logged and gives ([], None), the
+        challenge is still made without the notification.
         """
         # Grab guild object from context
         guild = ctx.guild
 
         # Grab division type for custom message
-        division_type = check_team_division(challenged_team)
+        division_type = self.state_cache.check_team_division(challenged_team)
 
-        # Retrieve the members string and ensure it's in the correct format
-        members_string_tuple = get_team_members(challenged_team)
-        if isinstance(members_string_tuple, tuple) and len(members_string_tuple) == 1:
-            members_string = members_string_tuple[0]
-        else:
-            print("Unexpected format for members_string:", members_string_tuple)
-            return  # Early exit if the format is unexpected
+        # Retrieve the display names and IDs of the challenged team's members
+        team_members = self.state_cache.get_team_members(challenged_team)
+        if team_members is None:
+            print(f"No members found for Team {challenged_team}")
+            return [], None  # Early exit if the team has no members
 
-        member_ids = await self.get_member_id_from_display_names(guild, members_string)
+        try:
+            members_string = ", ".join(display_name for display_name, discord_id in team_members)
+            member_ids = await self.get_member_ids(guild, team_members)
+        except Exception as e:
+            logger.error(f'LadderManager: Failed to create challenge notification for challenger_team={challenger_team} challenged_team={challenged_team}. Error: {e}')
+            return [], None
 
-        for member_id in member_ids:
-            member = self.bot.get_user(member_id)
-            if member is not None:
-                try:
-                    # If member is found, send a message displaying who challenged them
-                    logger.info(f'LadderManager: Successfully sent challenge notification using parameters: challenger_team={challenger_team} challenged_team={challenged_team} | Sent notification to: members={members_string}')
-                    await member.send(f"⚔️ Your team, Team {challenged_team}, has been challenged by Team {challenger_team} in the {division_type} division! ⚔️")
-                except all as e:
-                    error_message = f"Could not send a message to {member} (ID: {member_id})."
-                    logger.error(error_message)
-                    print(f"{error_message} Error: {str(e)}")
-            else:
-                error_message = f"LadderManager: Member with ID {member_id} not found."
-                logger.error(error_message)
-                print(error_message)
+        logger.info(f'LadderManager: Created challenge notification using parameters: challenger_team={challenger_team} challenged_team={challenged_team} | Notifying members={members_string}')
 
-    async def challenge(self, ctx, challenger_team: str, challenged_team: str):
+        # A message to every member displaying who challenged them
+        return member_ids, f"⚔️ Your team, Team {challenged_team}, has been challenged by Team {challenger_team} in the {division_type} division! ⚔️"
+
+    def validate_challenge(self, eligibility: dict, command_name: str, challenger_team: str, challenged_team: str, display_name: str = None):
         """
-        Checks if teams exist, checks what division
-        type the teams are in, checks if either team
-        are currently under a challenge, checks if
-        challenger team is one or two ranks below the
-        challenged team,
+        Runs every challenge check against the facts from the
+        state cache's get_challenge_eligibility in the same order the
+        checks have always been made. Returns the error
+        message for the first failed check or None if the
+        challenge is allowed.
+
+        display_name is the caller of the command, it is only
+        checked against the challenger team when given,
+        admin_challenge leaves it out.
         """
         # Check if both teams exist
-        if not does_team_exist(challenger_team):
-            logger.error(f'LadderManager: No challenger team found for "challenge". User entered: challenger_team={challenger_team}')
+        if not eligibility['challenger_exists']:
+            logger.error(f'LadderManager: No challenger team found for "{command_name}". User entered: challenger_team={challenger_team}')
             return f"❌ No team found by the name of {challenger_team}. Please try again. ❌"
-        
-        if not does_team_exist(challenged_team):
-            logger.error(f'LadderManager: No challenged team found for "challenge". User entered: challenged_team={challenged_team}')
+
+        if not eligibility['challenged_exists']:
+            logger.error(f'LadderManager: No challenged team found for "{command_name}". User entered: challenged_team={challenged_team}')
             return f"❌ No team found by the name of {challenged_team}. Please try again. ❌"
-        
-        # Capture the author of the command call's display name
-        display_name = ctx.author.display_name
 
         # Check if the person calling the command is apart of the challenger team
-        if not is_member_on_team(display_name, challenger_team):
-            logger.error(f'LadderManager: User invoking command "challenge" is not part of challenger team. User entered: challenger_team={challenger_team} User: {display_name}')
+        if display_name is not None and not eligibility['author_on_challenger_team']:
+            logger.error(f'LadderManager: User invoking command "{command_name}" is not part of challenger team. User entered: challenger_team={challenger_team} User: {display_name}')
             return f"❌ You are not a member of Team {challenger_team} and may not issue a challenge on their behalf. ❌"
-        
-        # Check if both teams exist within the same division and stores which divison if so
-        challenger_division = check_team_division(challenger_team)
-        challenged_division = check_team_division(challenged_team)
-        
+
+        # Check if both teams exist within the same division
+        challenger_division = eligibility['challenger_division']
+        challenged_division = eligibility['challenged_division']
+
         if challenger_division != challenged_division:
             logger.error(f'LadderManager: User entered two teams that are not in the same division. User entered: challenger_team={challenger_team} challenger_team_division={challenger_division} | challenged_team={challenged_team} challenged_team_division={challenged_division}')
             return f"❌ Team {challenger_team} and Team {challenged_team} are not in the same division... ❌"
-        
-        # Set division type to use for helper functions
-        division_type = challenger_division
-        
-        # Check if the ladder is running in the given division type
-        if not is_ladder_running(division_type):
-            logger.error(f'LadderManager: The ladder is not currently running on the given division_type. User entered: {division_type}')
-            return f"❌ The {division_type} division of the ladder has not started yet... Please wait to send challenges. ❌"
-        
-        # Grab the rank of each team for comparison
-        challenger_rank = give_team_rank(division_type, challenger_team)
-        challenged_rank = give_team_rank(division_type, challenged_team)
 
-        # Check if the challenging team is challenging either one or two ranks above them
-        if challenged_rank > challenger_rank or challenged_rank <= challenger_rank - 3:
+        # Check if the ladder is running in the division
+        if not eligibility['ladder_running']:
+            logger.error(f'LadderManager: The ladder is not currently running on the given division_type. User entered: {challenger_division}')
+            return f"❌ The {challenger_division} division of the ladder has not started yet... Please wait to send challenges. ❌"
+
+        # Check with the ladder engine that the challenging team is challenging either one or two ranks above them
+        challenger_rank = eligibility['challenger_rank']
+        challenged_rank = eligibility['challenged_rank']
+
+        if not eligibility['in_challenge_window']:
             logger.error(f'LadderManager: Teams can only challenge other teams up to two ranks above their current rank. Parameters used: challenger_rank={challenger_rank} challenged_rank={challenged_rank}')
             return f"❌ Teams can only challenge other teams up to two ranks above their current rank. ❌"
-        
+
         # Check if either team has challenged or already been challenged
-        if is_team_challenged(division_type, challenged_team):
+        if eligibility['challenged_is_challenged']:
             logger.error(f'LadderManager: Challenged team has already been challenged. User entered: challenged_team={challenged_team}')
             return f"❌ {challenged_team} has already been challenged by another team and must complete that match first! ❌"
-        if has_team_challenged(division_type, challenged_team):
+        if eligibility['challenged_has_challenged']:
             logger.error(f'LadderManager: Challenged team has already sent out a challenge. User entered: challenged_team={challenged_team}')
             return f"❌ {challenged_team} has already sent out a challenge to a team and must complete that match first! ❌"
-        
-        if is_team_challenged(division_type, challenger_team):
+
+        if eligibility['challenger_is_challenged']:
             logger.error(f'LadderManager: Challenger team has already been challenged. User entered: challenger_team={challenger_team}')
             return f"❌ {challenger_team} has already been challenged by another team and must complete that match first! ❌"
-        if has_team_challenged(division_type, challenger_team):
+        if eligibility['challenger_has_challenged']:
             logger.error(f'LadderManager: Challenger team has already sent out a challenge. User entered: challenger_team={challenger_team}')
             return f"❌ {challenger_team} has already sent out a challenge to a team and must complete that match first! ❌"
-        
-        # Once all checks are passed then register the challenge in the correct table
-        db_register_challenge(division_type, challenger_team, challenged_team)
 
-        try:
-            await self.send_challenge_notification(ctx, challenger_team, challenged_team)
-        except:
-            error_message = 'Error: Most likely tried to send notification to Bot'
-            logger.error(f'LadderManager: {error_message}')
+        return None
+
+    async def challenge(self, ctx, challenger_team: str, challenged_team: str):
+        """
+        Checks if teams exist, checks what division
+        type the teams are in, checks if either team
+        are currently under a challenge, checks if
+        challenger team is one or two ranks below the
+        challenged team,
+        """
+        # Capture the author of the command call's display name
+        display_name = ctx.author.display_name
+
+        async with self.get_team_lock(challenger_team):
+            # Gather everything the checks need from the state cache
+            eligibility = self.state_cache.get_challenge_eligibility(challenger_team, challenged_team, ctx.author.id, display_name)
 
-        logger.info(f"LadderManager: A challenge in the {division_type} divison has been created between Team {challenger_team} with rank {challenger_rank} as the challenger and Team {challenged_team} with rank {challenged_rank} as the challenged team.")
+            error_message = self.validate_challenge(eligibility, "challenge", challenger_team, challenged_team, display_name)
+            if error_message is not None:
+                return error_message
 
-        result = f"⚔️ Team {challenger_team} has challenged Team {challenged_team} in the {division_type} division! ⚔️"
-        return result
+            # Set division type and ranks to use for helper functions
+            division_type = eligibility['challenger_division']
+            challenger_rank = eligibility['challenger_rank']
+            challenged_rank = eligibility['challenged_rank']
+
+            # Notification for the members of the challenged team
+            member_ids, notification = await self.create_challenge_notification(ctx, challenger_team, challenged_team)
+
+            # Once all checks are passed then register the challenge in the correct table, its notification goes in the outbox in the same transaction
+            await run_db(db_register_challenge, division_type, challenger_team, challenged_team, ctx.guild.id if ctx.guild else None, member_ids, notification)
+            self.state_cache.add_challenge(division_type, challenger_team, challenged_team)
+            self.notification_dispatcher.notify()
+
+            logger.info(f"LadderManager: A challenge in the {division_type} divison has been created between Team {challenger_team} with rank {challenger_rank} as the challenger and Team {challenged_team} with rank {challenged_rank} as the challenged team.")
+
+            result = f"⚔️ Team {challenger_team} has challenged Team {challenged_team} in the {division_type} division! ⚔️"
+            return result
     
-    def cancel_challenge(self, ctx, challenger_team: str):
+    async def cancel_challenge(self, ctx, challenger_team: str):
         """
         Method used by everyone to cancel a challenge
         sent by mistake or for whatever reason. Since the match ID
@@ -404,29 +542,31 @@ class LadderManager:
         is apart of the challenger team, and if there actually is
         a challenge sent out by the team. If there is, it is deleted.
         """
-        # Check if given team exists in the database
-        if not does_team_exist(challenger_team):
-            logger.error(f'LadderManager: No challenger team found for "cancel_challenge". User entered: challenger_team={challenger_team}')
-            return f"❌ No Team found by the name of {challenger_team}. Please try again. ❌"
+        async with self.get_team_lock(challenger_team):
+            # Check if given team exists in the database
+            if not self.state_cache.does_team_exist(challenger_team):
+                logger.error(f'LadderManager: No challenger team found for "cancel_challenge". User entered: challenger_team={challenger_team}')
+                return f"❌ No Team found by the name of {challenger_team}. Please try again. ❌"
         
-        # Capture the author of the command call's display name and team division
-        display_name = ctx.author.display_name
-        team_division = check_team_division(challenger_team)
+            # Capture the author of the command call's display name and team division
+            display_name = ctx.author.display_name
+            team_division = self.state_cache.check_team_division(challenger_team)
         
-        # Check if the person calling the command is apart of the challenger team
-        if not is_member_on_team(display_name, challenger_team):
-            logger.error(f'LadderManager: User invoking command "cancel_challenge" is not part of challenger team. User entered: challenger_team={challenger_team} User: {display_name}')
-            return f"❌ You are not a member of Team {challenger_team}. ❌"
-
-        # Check if the given team has sent out a challenge
-        if not has_team_challenged(team_division, challenger_team):
-            logger.error(f'LadderManager: Challenger team has not sent out a challenge to cancel. User entered: challenger_team={challenger_team}')
-            return f"❌ No challenge was found where Team {challenger_team} was the Challenger. Please try again. ❌"
+            # Check if the person calling the command is apart of the challenger team
+            if not self.state_cache.is_member_on_team(ctx.author.id, challenger_team, display_name):
+                logger.error(f'LadderManager: User invoking command "cancel_challenge" is not part of challenger team. User entered: challenger_team={challenger_team} User: {display_name}')
+                return f"❌ You are not a member of Team {challenger_team}. ❌"
+
+            # Check if the given team has sent out a challenge
+            if not self.state_cache.has_team_challenged(challenger_team):
+                logger.error(f'LadderManager: Challenger team has not sent out a challenge to cancel. User entered: challenger_team={challenger_team}')
+                return f"❌ No challenge was found where Team {challenger_team} was the Challenger. Please try again. ❌"
         
-        # If all checks are passed, delete the specified challenge from correct challenges table
-        db_remove_challenge(team_division, challenger_team)
-        logger.info(f"LadderManager: Successfully canceled the challenge made by {challenger_team} in the {team_division} division by {display_name}.")
-        return f"🚩 The challenge made by Team {challenger_team} in the {team_division} division has been canceled by a team member. 🚩"
+            # If all checks are passed, delete the specified challenge from correct challenges table
+            await run_db(db_remove_challenge, team_division, challenger_team)
+            self.state_cache.remove_challenge(team_division, challenger_team)
+            logger.info(f"LadderManager: Successfully canceled the challenge made by {challenger_team} in the {team_division} division by {display_name}.")
+            return f"🚩 The challenge made by Team {challenger_team} in the {team_division} division has been canceled by a team member. 🚩"
     
     async def admin_challenge(self, ctx, challenger_team: str, challenged_team: str):
         """
@@ -434,90 +574,55 @@ class LadderManager:
         functionality of grabbing the display name to
         check if the caller is on the challenger team.
         """
-        # Check if both teams exist
-        if not does_team_exist(challenger_team):
-            logger.error(f'LadderManager: No challenger team found for "admin_challenge". User entered: challenger_team={challenger_team}')
-            return f"❌ No team found by the name of {challenger_team}. Please try again. ❌"
-        
-        if not does_team_exist(challenged_team):
-            logger.error(f'LadderManager: No challenged team found for "admin_challenge". User entered: challenged_team={challenged_team}')
-            return f"❌ No team found by the name of {challenged_team}. Please try again. ❌"
-        
-        # Check if both teams exist within the same division and stores which divison if so
-        challenger_division = check_team_division(challenger_team)
-        challenged_division = check_team_division(challenged_team)
-        
-        if challenger_division != challenged_division:
-            logger.error(f'LadderManager: User entered two teams that are not in the same division. User entered: challenger_team={challenger_team} challenger_team_division={challenger_division} | challenged_team={challenged_team} challenged_team_division={challenged_division}')
-            return f"❌ Team {challenger_team} and Team {challenged_team} are not in the same division... ❌"
-        
-        # Set division type to use for helper functions
-        division_type = challenger_division
+        async with self.get_team_lock(challenger_team):
+            # Gather everything the checks need from the state cache
+            eligibility = self.state_cache.get_challenge_eligibility(challenger_team, challenged_team)
 
-        # Check if the ladder is running in the given division type
-        if not is_ladder_running(division_type):
-            logger.error(f'LadderManager: The ladder is not currently running on the given division_type. User entered: {division_type}')
-            return f"❌ The {division_type} division of the ladder has not started yet... Please wait to send challenges. ❌"
-        
-        # Grab the rank of each team for comparison
-        challenger_rank = give_team_rank(division_type, challenger_team)
-        challenged_rank = give_team_rank(division_type, challenged_team)
+            error_message = self.validate_challenge(eligibility, "admin_challenge", challenger_team, challenged_team)
+            if error_message is not None:
+                return error_message
 
-        # Check if the challenging team is challenging either one or two ranks above them
-        if challenged_rank > challenger_rank or challenged_rank <= challenger_rank - 3:
-            logger.error(f'LadderManager: Teams can only challenge other teams up to two ranks above their current rank. Parameters used: challenger_rank={challenger_rank} challenged_rank={challenged_rank}')
-            return f"❌ Teams can only challenge other teams up to two ranks above their current rank. ❌"
-        
-        # Check if either team has challenged or already been challenged
-        if is_team_challenged(division_type, challenged_team):
-            logger.error(f'LadderManager: Challenged team has already been challenged. User entered: challenged_team={challenged_team}')
-            return f"❌ {challenged_team} has already been challenged by another team and must complete that match first! ❌"
-        if has_team_challenged(division_type, challenged_team):
-            logger.error(f'LadderManager: Challenged team has already sent out a challenge. User entered: challenged_team={challenged_team}')
-            return f"❌ {challenged_team} has already sent out a challenge to a team and must complete that match first! ❌"
-        
-        if is_team_challenged(division_type, challenger_team):
-            logger.error(f'LadderManager: Challenger team has already been challenged. User entered: challenger_team={challenger_team}')
-            return f"❌ {challenger_team} has already been challenged by another team and must complete that match first! ❌"
-        if has_team_challenged(division_type, challenger_team):
-            logger.error(f'LadderManager: Challenger team has already sent out a challenge. User entered: challenger_team={challenger_team}')
-            return f"❌ {challenger_team} has already sent out a challenge to a team and must complete that match first! ❌"
-        
-        # Once all checks are passed then register the challenge in the correct table
-        db_register_challenge(division_type, challenger_team, challenged_team)
-        logger.info(f"LadderManager: A challenge in the {division_type} divison has been created between Team {challenger_team} with rank {challenger_rank} as the challenger and Team {challenged_team} with rank {challenged_rank} as the challenged team.")
+            # Set division type and ranks to use for helper functions
+            division_type = eligibility['challenger_division']
+            challenger_rank = eligibility['challenger_rank']
+            challenged_rank = eligibility['challenged_rank']
 
-        # Send a notificaiton to members in challenged team
-        try:
-            await self.send_challenge_notification(ctx, challenger_team, challenged_team)
-        except:
-            print('Error: Most likely tried to send notification to Bot')
+            # Notification for the members of the challenged team
+            member_ids, notification = await self.create_challenge_notification(ctx, challenger_team, challenged_team)
+
+            # Once all checks are passed then register the challenge in the correct table, its notification goes in the outbox in the same transaction
+            await run_db(db_register_challenge, division_type, challenger_team, challenged_team, ctx.guild.id if ctx.guild else None, member_ids, notification)
+            self.state_cache.add_challenge(division_type, challenger_team, challenged_team)
+            self.notification_dispatcher.notify()
+            logger.info(f"LadderManager: A challenge in the {division_type} divison has been created between Team {challenger_team} with rank {challenger_rank} as the challenger and Team {challenged_team} with rank {challenged_rank} as the challenged team.")
 
-        return f"⚔️ Team {challenger_team} has challenged Team {challenged_team} in the {division_type} division! ⚔️ -This challenge was created by an Administrator."
+            return f"⚔️ Team {challenger_team} has challenged Team {challenged_team} in the {division_type} division! ⚔️ -This challenge was created by an Administrator."
     
-    def admin_cancel_challenge(self, challenger_team: str):
+    async def admin_cancel_challenge(self, challenger_team: str):
         """
         This works the same way as cancel_challenge but removes the
         functionality of grabbing the display name to
         check if the caller is on the challenger team.
         """
-        # Check if given team exists in the database
-        if not does_team_exist(challenger_team):
-            logger.error(f'LadderManager: No challenger team found for "admin_cancel_challenge". User entered: challenger_team={challenger_team}')
-            return f"❌ No Team found by the name of {challenger_team}. Please try again. ❌"
+        async with self.get_team_lock(challenger_team):
+            # Check if given team exists in the database
+            if not self.state_cache.does_team_exist(challenger_team):
+                logger.error(f'LadderManager: No challenger team found for "admin_cancel_challenge". User entered: challenger_team={challenger_team}')
+                return f"❌ No Team found by the name of {challenger_team}. Please try again. ❌"
         
-        # Capture the team division of the challenger team
-        team_division = check_team_division(challenger_team)
+            # Capture the team division of the challenger team
+            team_division = self.state_cache.check_team_division(challenger_team)
 
-        # Check if the given team has sent out a challenge
-        if not has_team_challenged(team_division, challenger_team):
-            logger.error(f'LadderManager: Challenger team has not sent out a challenge to cancel. User entered: challenger_team={challenger_team}')
-            return f"❌ No challenge was found where Team {challenger_team} was the Challenger. Please try again. ❌"
+            # Check if the given team has sent out a challenge
+            if not self.state_cache.has_team_challenged(challenger_team):
+                logger.error(f'LadderManager: Challenger team has not sent out a challenge to cancel. User entered: challenger_team={challenger_team}')
+                return f"❌ No challenge was found where Team {challenger_team} was the Challenger. Please try again. ❌"
         
-        # If all checks are passed, delete the specified challenge from correct challenges table
-        db_remove_challenge(team_division, challenger_team)
-        logger.info(f"LadderManager: Successfully canceled the challenge made by {challenger_team} in the {team_division} division by an Admin.")
-        return f"🚩 The challenge made by Team {challenger_team} in the {team_division} division has been canceled by an Administrator. 🚩"
+            # If all checks are passed, delete the specified challenge from correct challenges table
+            await run_db(db_remove_challenge, team_division, challenger_team)
+            self.state_cache.remove_challenge(team_division, challenger_team)
+            logger.info(f"LadderManager: Successfully canceled the challenge made by {challenger_team} in the {team_division} division by an Admin.")
+            return f"🚩 The challenge made by Team {challenger_team} in the {team_division} division has been canceled by an Administrator. 🚩"
     
     async def report_win(self, ctx, winning_team: str):
         """
@@ -526,90 +631,49 @@ class LadderManager:
         updates ranks and wins/losses accordingly,
         and removes the challenge from the challenges table.
         """
-        # Checks if given team exists
-        if not does_team_exist(winning_team):
-            logger.error(f'LadderManager: No winning_team name found for "report_win". User entered: winning_team={winning_team}')
-            return f"❌ No team found by the name of {winning_team}. Please try again."
+        async with self.get_team_lock(winning_team):
+            # Checks if given team exists
+            if not self.state_cache.does_team_exist(winning_team):
+                logger.error(f'LadderManager: No winning_team name found for "report_win". User entered: winning_team={winning_team}')
+                return f"❌ No team found by the name of {winning_team}. Please try again."
         
-        # If team exists, grab its division type
-        division_type = check_team_division(winning_team)
+            # If team exists, grab its division type
+            division_type = self.state_cache.check_team_division(winning_team)
 
-        # Check if the ladder is running in the given division type
-        if not is_ladder_running(division_type):
-            logger.error(f'LadderManager: The ladder is not currently running on the given division_type. Parameter used: {division_type}')
-            return f"❌ The {division_type} division of the ladder has not started yet... ❌"
+            # Check if the ladder is running in the given division type
+            if not self.state_cache.is_ladder_running(division_type):
+                logger.error(f'LadderManager: The ladder is not currently running on the given division_type. Parameter used: {division_type}')
+                return f"❌ The {division_type} division of the ladder has not started yet... ❌"
         
-        # Check if author of command call is on the winning team
-        display_name = ctx.author.display_name
-        if not is_member_on_team(display_name, winning_team):
-            logger.error(f'LadderManager: User not part of winning team tried to report_win. User: {display_name}')
-            return f"❌ You are not a member of Team {winning_team}. ❌"
+            # Check if author of command call is on the winning team
+            display_name = ctx.author.display_name
+            if not self.state_cache.is_member_on_team(ctx.author.id, winning_team, display_name):
+                logger.error(f'LadderManager: User not part of winning team tried to report_win. User: {display_name}')
+                return f"❌ You are not a member of Team {winning_team}. ❌"
         
-        # Check if the given team is the challenger
-        if has_team_challenged(division_type, winning_team):
             # Find the opponent team to determine the loser
-            losing_team = find_opponent_team(division_type, winning_team)
-            
-            # Update ranks when challenger wins
-            logger.info(f"LadderManager: Challenger team has reported win over opponent challenged team. winning_challenger={winning_team} losing_challenged={losing_team}")
-            
-            db_update_rankings(division_type, winning_team, losing_team)
-            logger.info(f"LadderManager: Winning challenger team: {winning_team} takes the losing challenged team: {losing_team} rank and challenged losing team moves down one rank. Win and loss is added to appropriate teams.")
-
-            #Grab ID's of members to add to stat tracking logic
-            winner_members = get_team_members(winning_team)
-            loser_members = get_team_members(losing_team)
-            guild = ctx.guild
-
-            # Pass information to StatManager to update individual wins and losses for players
-            for winner_member in winner_members:
-                winner_member_id = await self.get_member_id_from_display_names(guild, winner_member)
-                for win_id in winner_member_id:
-                    self.stat_manager.add_to_wins_count(win_id, division_type)
-                    self.stat_manager.increment_participation_count(win_id)
+            losing_team = self.state_cache.find_opponent_team(winning_team)
+            if losing_team is None:
+                logger.error(f'LadderManager: No challenge found involving winning_team for "report_win". User entered: winning_team={winning_team}')
+                return f"❌ Team {winning_team} is not part of any challenge. ❌"
+
+            # Check if the given team is the challenger
+            if self.state_cache.has_team_challenged(winning_team):
+                # Update ranks when challenger wins
+                logger.info(f"LadderManager: Challenger team has reported win over opponent challenged team. winning_challenger={winning_team} losing_challenged={losing_team}")
+
+                await self.record_match_result(ctx, division_type, winning_team, losing_team, challenger_won=True)
+                logger.info(f"LadderManager: Winning challenger team: {winning_team} takes the losing challenged team: {losing_team} rank and challenged losing team moves down one rank. Win and loss is added to appropriate teams.")
+                logger.info(f"LadderManager: Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
             
-            for loser_member in loser_members:
-                loser_member_id = await self.get_member_id_from_display_names(guild, loser_member)
-                for loss_id in loser_member_id:
-                    self.stat_manager.add_to_losses_count(loss_id, division_type)
-                    self.stat_manager.increment_participation_count(loss_id)
-
-            remove_challenge(division_type, winning_team)
-            logger.info(f"LadderManager: Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
-            
-            return f"🏆 Team {winning_team} has won the match and taken the rank of Team {losing_team}! Team {losing_team} moves down one in the ranks. 🏆"
-        else:
-            # If the winning team was the challenged team, no rank change occurs
-            losing_team = find_opponent_team(division_type, winning_team)
-
-            #Grab ID's of members to add to stat tracking logic
-            winner_members = get_team_members(winning_team)
-            loser_members = get_team_members(losing_team)
-            guild = ctx.guild
-
-            # Pass information to StatManager to update individual wins and losses for players
-            for winner_member in winner_members:
-                winner_member_id = await self.get_member_id_from_display_names(guild, winner_member)
-                for win_id in winner_member_id:
-                    self.stat_manager.add_to_wins_count(win_id, division_type)
-                    self.stat_manager.increment_participation_count(win_id)
-            
-            for loser_member in loser_members:
-                loser_member_id = await self.get_member_id_from_display_names(guild, loser_member)
-                for loss_id in loser_member_id:
-                    self.stat_manager.add_to_losses_count(loss_id, division_type)
-                    self.stat_manager.increment_participation_count(loss_id)
-            
-            # LadderManager adds team wins and losses
-            add_team_wins_losses(division_type, winning_team, win=True)
-            add_team_wins_losses(division_type, losing_team, win=False)
-
-            logger.info(f"LadderManager: Team {winning_team} has won against Team {losing_team} in the {division_type} division, no rank change occurs since {winning_team} was the challenged team.")
-            
-            remove_challenge(division_type, losing_team)
-            logger.info(f"LadderManager: Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
+                return f"🏆 Team {winning_team} has won the match and taken the rank of Team {losing_team}! Team {losing_team} moves down one in the ranks. 🏆"
+            else:
+                # If the winning team was the challenged team, no rank change occurs
+                await self.record_match_result(ctx, division_type, winning_team, losing_team, challenger_won=False)
+                logger.info(f"LadderManager: Team {winning_team} has won against Team {losing_team} in the {division_type} division, no rank change occurs since {winning_team} was the challenged team.")
+                logger.info(f"LadderManager: Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
             
-            return f"🏆 Team {winning_team} has won the match against Team {losing_team}, but no rank changes occur since Team {winning_team} was the challenged team. 🏆"
+                return f"🏆 Team {winning_team} has won the match against Team {losing_team}, but no rank changes occur since Team {winning_team} was the challenged team. 🏆"
     
     async def admin_report_win(self, ctx, winning_team: str):
         """
@@ -617,258 +681,256 @@ class LadderManager:
         Works just like report_win but doesnt check
         if the author is part of winning_team
         """
-        # Checks if given team exists
-        if not does_team_exist(winning_team):
-            logger.error(f'LadderManager: No winning_team found by name given for "admin_report_win". User entered: winning_team={winning_team}')
-            return f"❌ No team found by the name of {winning_team}. Please try again. ❌"
+        async with self.get_team_lock(winning_team):
+            # Checks if given team exists
+            if not self.state_cache.does_team_exist(winning_team):
+                logger.error(f'LadderManager: No winning_team found by name given for "admin_report_win". User entered: winning_team={winning_team}')
+                return f"❌ No team found by the name of {winning_team}. Please try again. ❌"
         
-        # If team exists, grab its division type
-        division_type = check_team_division(winning_team)
+            # If team exists, grab its division type
+            division_type = self.state_cache.check_team_division(winning_team)
 
-        # Check if the ladder is running in the given division type
-        if not is_ladder_running(division_type):
-            logger.error(f'LadderManager: The ladder is not currently running on the given division_type. Parameter used: {division_type}')
-            return f"❌ The {division_type} division of the ladder has not started yet... ❌"
+            # Check if the ladder is running in the given division type
+            if not self.state_cache.is_ladder_running(division_type):
+                logger.error(f'LadderManager: The ladder is not currently running on the given division_type. Parameter used: {division_type}')
+                return f"❌ The {division_type} division of the ladder has not started yet... ❌"
         
-        # Check if the given team is the challenger
-        if has_team_challenged(division_type, winning_team):
             # Find the opponent team to determine the loser
-            losing_team = find_opponent_team(division_type, winning_team)
-            logger.info(f"LadderManager: 'admin_report_win' Admn has reported challenger team {winning_team} winning over opponent challenged team {losing_team} in the {division_type} division. winning_challenger={winning_team} losing_challenged={losing_team}")
-
-            # Update ranks when challenger wins
-            db_update_rankings(division_type, winning_team, losing_team)
-            logger.info(f"LadderManager: 'admin_report_win' Winning challenger team: {winning_team} takes the losing challenged team: {losing_team} rank and challenged losing team moves down one rank. Win and loss is added to appropriate teams.")
+            losing_team = self.state_cache.find_opponent_team(winning_team)
+            if losing_team is None:
+                logger.error(f'LadderManager: No challenge found involving winning_team for "admin_report_win". User entered: winning_team={winning_team}')
+                return f"❌ Team {winning_team} is not part of any challenge. ❌"
+
+            # Check if the given team is the challenger
+            if self.state_cache.has_team_challenged(winning_team):
+                logger.info(f"LadderManager: 'admin_report_win' Admn has reported challenger team {winning_team} winning over opponent challenged team {losing_team} in the {division_type} division. winning_challenger={winning_team} losing_challenged={losing_team}")
+
+                # Update ranks when challenger wins
+                await self.record_match_result(ctx, division_type, winning_team, losing_team, challenger_won=True)
+                logger.info(f"LadderManager: 'admin_report_win' Winning challenger team: {winning_team} takes the losing challenged team: {losing_team} rank and challenged losing team moves down one rank. Win and loss is added to appropriate teams.")
+                logger.info(f"LadderManager: 'admin_report_win' Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
             
-            #Grab ID's of members to add to stat tracking logic
-            winner_members = get_team_members(winning_team)
-            loser_members = get_team_members(losing_team)
-            guild = ctx.guild
-
-            # Pass information to StatManager to update individual wins and losses for players
-            for winner_member in winner_members:
-                winner_member_id = await self.get_member_id_from_display_names(guild, winner_member)
-                for win_id in winner_member_id:
-                    self.stat_manager.add_to_wins_count(win_id, division_type)
-                    self.stat_manager.increment_participation_count(win_id)
-            
-            for loser_member in loser_members:
-                loser_member_id = await self.get_member_id_from_display_names(guild, loser_member)
-                for loss_id in loser_member_id:
-                    self.stat_manager.add_to_losses_count(loss_id, division_type)
-                    self.stat_manager.increment_participation_count(loss_id)
-
-            # Remove the challenge
-            remove_challenge(division_type, winning_team)
-            logger.info(f"LadderManager: 'admin_report_win' Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
-            
-            return f"🏆 Team {winning_team} has won the match and taken the rank of Team {losing_team}! Team {losing_team} moves down one in the ranks. This report was made by an Administrator. 🏆"
-        else:
-            # If the winning team was the challenged team, no rank change occurs
-            losing_team = find_opponent_team(division_type, winning_team)
-
-            #Grab ID's of members to add to stat tracking logic
-            winner_members = get_team_members(winning_team)
-            loser_members = get_team_members(losing_team)
-            guild = ctx.guild
-
-            # Pass information to StatManager to update individual wins and losses for players
-            for winner_member in winner_members:
-                winner_member_id = await self.get_member_id_from_display_names(guild, winner_member)
-                for win_id in winner_member_id:
-                    self.stat_manager.add_to_wins_count(win_id, division_type)
-                    self.stat_manager.increment_participation_count(win_id)
-            
-            for loser_member in loser_members:
-                loser_member_id = await self.get_member_id_from_display_names(guild, loser_member)
-                for loss_id in loser_member_id:
-                    self.stat_manager.add_to_losses_count(loss_id, division_type)
-                    self.stat_manager.increment_participation_count(loss_id)
-            
-            # Add win/loss to correct team, no rank change when challenged team wins
-            add_team_wins_losses(division_type, winning_team, win=True)
-            add_team_wins_losses(division_type, losing_team, win=False)
-            logger.info(f"LadderManager: 'admin_report_win' Team {winning_team} has won against Team {losing_team} in the {division_type} division, no rank change occurs since {winning_team} was the challenged team.")
-
-            # Remove the challenge
-            remove_challenge(division_type, losing_team)
-            logger.info(f"LadderManager: 'admin_report_win' Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
+                return f"🏆 Team {winning_team} has won the match and taken the rank of Team {losing_team}! Team {losing_team} moves down one in the ranks. This report was made by an Administrator. 🏆"
+            else:
+                # Add win/loss to correct team, no rank change when challenged team wins
+                await self.record_match_result(ctx, division_type, winning_team, losing_team, challenger_won=False)
+                logger.info(f"LadderManager: 'admin_report_win' Team {winning_team} has won against Team {losing_team} in the {division_type} division, no rank change occurs since {winning_team} was the challenged team.")
+                logger.info(f"LadderManager: 'admin_report_win' Challenge from {division_type} division involving Team {winning_team} and Team {losing_team} removed from database.")
             
-            return f"🏆 Team {winning_team} has won the match against Team {losing_team}, but no rank changes occur since Team {winning_team} was the challenged team. This report was made by an Administrator. 🏆"
+                return f"🏆 Team {winning_team} has won the match against Team {losing_team}, but no rank changes occur since Team {winning_team} was the challenged team. This report was made by an Administrator. 🏆"
+
+    async def record_match_result(self, ctx, division_type: str, winning_team: str, losing_team: str, challenger_won: bool):
+        """
+        Internal method used by report_win and admin_report_win.
+        Grabs the ID's of both teams members for stat tracking
+        and applies the whole result to the database in one
+        transaction: ranks, team wins/losses, member stats
+        and removing the challenge. The caller holds the
+        division's lock from its checks until this returns.
+        """
+        winner_members = self.state_cache.get_team_members(winning_team)
+        loser_members = self.state_cache.get_team_members(losing_team)
+        guild = ctx.guild
+
+        winner_member_ids = await self.get_member_ids(guild, winner_members)
+        loser_member_ids = await self.get_member_ids(guild, loser_members)
 
-    def set_rank(self, team_name: str, new_rank: int):
+        # The ladder engine plans the rank change, the challenger takes the loser's rank if it won
+        rank_diff = self.state_cache.get_ladder(division_type).plan_match(winning_team, losing_team, challenger_won)
+
+        await run_db(db_report_match, division_type, winning_team, losing_team, rank_diff, winner_member_ids, loser_member_ids)
+        self.state_cache.report_match(winning_team, losing_team, rank_diff)
+
+    async def set_rank(self, team_name: str, new_rank: int):
         """
         Admin method for manually changing the rank
         of a team
         """
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team found by given team name for "set_rank". User entered: team_name={team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team found by given team name for "set_rank". User entered: team_name={team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
 
-        # If team exists, find division type
-        division_type = check_team_division(team_name)
+            # If team exists, find division type
+            division_type = self.state_cache.check_team_division(team_name)
 
-        # Find the teams current rank
-        current_rank = give_team_rank(division_type, team_name)
+            # Find the teams current rank
+            current_rank = self.state_cache.give_team_rank(team_name)
 
-        # Find the max rank
-        max_rank = count_teams(division_type)
-        
-        # Check if new rank is valid
-        if new_rank < 1 or new_rank > max_rank:
-            logger.error(f'LadderManager: Invalid rank given for "set_rank". max_rank={max_rank} min_rank=1 User entered: {new_rank}')
-            return f"❌ Invalid rank. The rank should be between 1 and {max_rank}. Please try again. ❌"
-        
-        # Check if new rank being entered is the current rank of given team
-        elif new_rank == current_rank:
-            logger.error(f'LadderManager: Given team is already at the given new rank for for "set_rank". team_name={team_name} current_rank={current_rank} new_rank_given={new_rank}')
-            return f"❌ {team_name} is already at rank {new_rank} in the {division_type} division. Please try again. ❌"
-        
-        else:
-            # Update the ranks if all conditions pass
-            db_set_rank(division_type, team_name, new_rank, current_rank)
-            logger.info(f'LadderManager: Given team was assigned to the new rank in their division with "set_rank" and all other teams were adjusted accordingly. team_name={team_name} new_rank={new_rank} division_type={division_type}')
-            return f"📈 Team {team_name} has been assigned to the rank of {new_rank} in the {division_type} division. 📈"
-    
-    def add_win(self, team_name: str):
+            # Find the max rank
+            max_rank = self.state_cache.count_teams(division_type)
+
+            # Check if new rank is valid
+            if new_rank < 1 or new_rank > max_rank:
+                logger.error(f'LadderManager: Invalid rank given for "set_rank". max_rank={max_rank} min_rank=1 User entered: {new_rank}')
+                return f"❌ Invalid rank. The rank should be between 1 and {max_rank}. Please try again. ❌"
+
+            # Check if new rank being entered is the current rank of given team
+            elif new_rank == current_rank:
+                logger.error(f'LadderManager: Given team is already at the given new rank for for "set_rank". team_name={team_name} current_rank={current_rank} new_rank_given={new_rank}')
+                return f"❌ {team_name} is already at rank {new_rank} in the {division_type} division. Please try again. ❌"
+
+            else:
+                # Update the ranks if all conditions pass
+                rank_diff = self.state_cache.get_ladder(division_type).plan_move(team_name, new_rank)
+                await run_db(db_apply_rank_diff, division_type, rank_diff)
+                self.state_cache.apply_rank_diff(division_type, rank_diff)
+                logger.info(f'LadderManager: Given team was assigned to the new rank in their division with "set_rank" and all other teams were adjusted accordingly. team_name={team_name} new_rank={new_rank} division_type={division_type}')
+                return f"📈 Team {team_name} has been assigned to the rank of {new_rank} in the {division_type} division. 📈"
+
+    async def add_win(self, team_name: str):
         """
         Admin method to manually increment ONE
         win to a given team
         """
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team found by given team name for "add_win". User entered: team_name={team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team found by given team name for "add_win". User entered: team_name={team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
         
-        # Grab division type if team is found
-        division_type = check_team_division(team_name)
+            # Grab division type if team is found
+            division_type = self.state_cache.check_team_division(team_name)
 
-        # Add win to team
-        add_team_wins_losses(division_type, team_name, True)
-        logger.info(f'LadderManager: Successfully added 1 win to the given team with "add_win". team_name={team_name} division_type={division_type}')
-        return f"📈 Team {team_name} has been given a win by an Administrator. 📈"
+            # Add win to team
+            await run_db(add_team_wins_losses, division_type, team_name, True)
+            self.state_cache.add_team_wins_losses(team_name, True)
+            logger.info(f'LadderManager: Successfully added 1 win to the given team with "add_win". team_name={team_name} division_type={division_type}')
+            return f"📈 Team {team_name} has been given a win by an Administrator. 📈"
 
-    def subtract_win(self, team_name: str):
+    async def subtract_win(self, team_name: str):
         """
         Admin method to manually decrement ONE
         win to a given team
         """
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team found by given team name for "subtract_win". User entered: team_name={team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team found by given team name for "subtract_win". User entered: team_name={team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
         
-        # Grab division type if team is found
-        division_type = check_team_division(team_name)
+            # Grab division type if team is found
+            division_type = self.state_cache.check_team_division(team_name)
         
-        # Grab team's current amount of wins
-        current_wins = get_wins_or_losses(team_name, True)
+            # Grab team's current amount of wins
+            current_wins = self.state_cache.get_wins_or_losses(team_name, True)
 
-        if current_wins < 1:
-            logger.error(f'LadderManager: Team found by given team name has no wins for "subtract_win" to minus from. User entered: team_name={team_name} team_name_wins={current_wins}')
-            return f"❌ Team {team_name} does not have any wins to take away. ❌" 
+            if current_wins < 1:
+                logger.error(f'LadderManager: Team found by given team name has no wins for "subtract_win" to minus from. User entered: team_name={team_name} team_name_wins={current_wins}')
+                return f"❌ Team {team_name} does not have any wins to take away. ❌" 
         
-        if current_wins >= 1:
-            subtract_team_wins_losses(division_type, team_name, True)
-            logger.info(f'LadderManager: Successfully subtracted 1 win from the given team with "subtract_win". This leaves Team {team_name} with {current_wins - 1}. team_name={team_name} division_type={division_type}')
-            return f"📈 Team {team_name} has had a win taken away by an Administrator. They now have {current_wins - 1} wins. 📈"
+            if current_wins >= 1:
+                await run_db(subtract_team_wins_losses, division_type, team_name, True)
+                self.state_cache.subtract_team_wins_losses(team_name, True)
+                logger.info(f'LadderManager: Successfully subtracted 1 win from the given team with "subtract_win". This leaves Team {team_name} with {current_wins - 1}. team_name={team_name} division_type={division_type}')
+                return f"📈 Team {team_name} has had a win taken away by an Administrator. They now have {current_wins - 1} wins. 📈"
     
-    def add_loss(self, team_name: str):
+    async def add_loss(self, team_name: str):
         """
         Admin method to manually increment ONE
         loss to a given team
         """
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team found by given team name for "add_loss". User entered: team_name={team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team found by given team name for "add_loss". User entered: team_name={team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
         
-        # Grab division type if team is found
-        division_type = check_team_division(team_name)
-
-        # Add loss to the team
-        add_team_wins_losses(division_type, team_name, False)
-        logger.info(f'LadderManager: Successfully added 1 loss to the given team with "add_loss". team_name={team_name} division_type={division_type}')
-        return f"📈 Team {team_name} has been given a loss by an Administrator. 📈"
+            # Grab division type if team is found
+            division_type = self.state_cache.check_team_division(team_name)
+
+            # Add loss to the team
+            await run_db(add_team_wins_losses, division_type, team_name, False)
+            self.state_cache.add_team_wins_losses(team_name, False)
+            logger.info(f'LadderManager: Successfully added 1 loss to the given team with "add_loss". team_name={team_name} division_type={division_type}')
+            return f"📈 Team {team_name} has been given a loss by an Administrator. 📈"
     
-    def subtract_loss(self, team_name: str):
+    async def subtract_loss(self, team_name: str):
         """
         Admin method to manually decrement ONE
         loss to a given team
         """
-        if not does_team_exist(team_name):
-            logger.error(f'LadderManager: No team found by given team name for "subtract_loss". User entered: team_name={team_name}')
-            return f"❌ No team found by the name of {team_name}. Please try again. ❌"
+        async with self.get_team_lock(team_name):
+            if not self.state_cache.does_team_exist(team_name):
+                logger.error(f'LadderManager: No team found by given team name for "subtract_loss". User entered: team_name={team_name}')
+                return f"❌ No team found by the name of {team_name}. Please try again. ❌"
 
-        # Grab division type if team is found
-        division_type = check_team_division(team_name)
+            # Grab division type if team is found
+            division_type = self.state_cache.check_team_division(team_name)
 
-        # Grab team's current amount of losses
-        current_losses = get_wins_or_losses(team_name, False)
+            # Grab team's current amount of losses
+            current_losses = self.state_cache.get_wins_or_losses(team_name, False)
 
-        if current_losses < 1:
-            logger.error(f'LadderManager: Team found by given team name has no losses for "subtract_loss" to minus from. User entered: team_name={team_name} team_name_wins={current_losses}')
-            return f"❌ Team {team_name} does not have any losses to take away. ❌"
+            if current_losses < 1:
+                logger.error(f'LadderManager: Team found by given team name has no losses for "subtract_loss" to minus from. User entered: team_name={team_name} team_name_wins={current_losses}')
+                return f"❌ Team {team_name} does not have any losses to take away. ❌"
         
-        if current_losses >= 1:
-            subtract_team_wins_losses(division_type, team_name, False)
-            logger.info(f'LadderManager: Successfully subtracted 1 loss from the given team with "subtract_loss". This leaves Team {team_name} with {current_losses - 1}. team_name={team_name} division_type={division_type}')
-            return f"📈 Team {team_name} has had a loss taken away by an Administrator. They now have {current_losses - 1} losses. 📈"
+            if current_losses >= 1:
+                await run_db(subtract_team_wins_losses, division_type, team_name, False)
+                self.state_cache.subtract_team_wins_losses(team_name, False)
+                logger.info(f'LadderManager: Successfully subtracted 1 loss from the given team with "subtract_loss". This leaves Team {team_name} with {current_losses - 1}. team_name={team_name} division_type={division_type}')
+                return f"📈 Team {team_name} has had a loss taken away by an Administrator. They now have {current_losses - 1} losses. 📈"
         
     async def post_standings(self, division_type: str):
         """
         Method for everyone to post the current
         standings of a given division type into
         the channel this was called from
+
+        Returns a list of messages to send, one per page
         """
         # Check if correct division type was entered
         if not is_valid_division_type(division_type):
             logger.error(f'LadderManager: Wrong division type given for "post_standings". User entered: {division_type}')
-            return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_standings 2v2 ❌"
+            return ["❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_standings 2v2 ❌"]
         
-        # Get standings data from database for given division type
-        raw_standings_data = get_standings_data(division_type)
+        # Get standings data from the state cache for given division type
+        raw_standings_data = self.state_cache.get_standings_data(division_type)
 
-        # Format the raw standings data into something pretty
-        formatted_standings_data = format_standings_data(division_type, raw_standings_data)
+        # Format the raw standings data into pages that each fit in one message
+        standings_pages = self.board_renderer.render(division_type, 'standings', raw_standings_data)
 
-        return formatted_standings_data
+        return [page_text for page_text, content_hash in standings_pages]
 
     async def post_challenges(self, division_type: str):
         """
         Method for everyone to post the current
         challenges of a given division type into
         the channel this was called from
+
+        Returns a list of messages to send, one per page
         """
         # Check if correct division type was entered
         if not is_valid_division_type(division_type):
             logger.error(f'LadderManager: Wrong division type given for "post_challenges". User entered: {division_type}')
-            return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_challenges 1v1 ❌"
+            return ["❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_challenges 1v1 ❌"]
         
-        # Get challenges data from database for given division type
-        raw_challenges_data = get_challenges_data(division_type)
+        # Get challenges data from the state cache for given division type
+        raw_challenges_data = self.state_cache.get_challenges_data(division_type)
 
-        # Format the raw standings data
-        formatted_challenges_data = format_challenges_data(division_type ,raw_challenges_data)
+        # Format the raw challenges data into pages that each fit in one message
+        challenges_pages = self.board_renderer.render(division_type, 'challenges', raw_challenges_data)
 
-        return formatted_challenges_data
+        return [page_text for page_text, content_hash in challenges_pages]
     
     async def post_teams(self, division_type: str):
         """
         Method for posting division specific
         teams directly into the channel this
         is called from.
+
+        Returns a list of messages to send, one per page
         """
         
         # Check if correct division type was entered
         if not is_valid_division_type(division_type):
             logger.error(f'LadderManager: Wrong division type given for "post_teams". User entered: {division_type}')
-            return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_teams 3v3 ❌"
+            return ["❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. Example: /post_teams 3v3 ❌"]
         
-        # Get teams data from database for given division
-        raw_teams_data = get_teams_data(division_type)
+        # Get teams data from the state cache for given division
+        raw_teams_data = self.state_cache.get_teams_data(division_type)
 
-        # Format the raw teams data
-        formatted_teams_data = format_teams_data(division_type, raw_teams_data)
+        # Format the raw teams data into pages that each fit in one message
+        teams_pages = self.board_renderer.render(division_type, 'teams', raw_teams_data)
 
-        return formatted_teams_data
+        return [page_text for page_text, content_hash in teams_pages]
     
     async def set_standings_channel(self, division_type: str, channel: discord.TextChannel):
         """
@@ -880,26 +942,21 @@ class LadderManager:
         if not is_valid_division_type(division_type):
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again using 1v1, 2v2, or 3v3 after /set_standings_channel\n\tExample: /set_standings_channel 2v2 #2v2-standings ❌"
             
-        db_clear_standings_channel(division_type)
+        await run_db(db_clear_standings_channel, division_type)
             
         # Grab channel's integer ID
         channel_id = channel.id
 
         # Tells database to add the integer to correct division type
-        db_set_standings_channel(division_type, channel_id)
+        await run_db(db_set_standings_channel, division_type, channel_id)
             
         # Initialize or update the standings message in the new channel
         await self.update_standings_message(division_type, channel)
         
-        try:
-            self.periodic_update_standings.restart()
-        except Exception as e:
-            print(f"Error starting periodic update task: {e}")
-
         return f"🏆 The {division_type} standings channel has been set to #{channel.mention}. 🏆"
 
     
-    def clear_standings_channel(self, division_type: str):
+    async def clear_standings_channel(self, division_type: str):
         """
         Admin method to clear a division's standings
         channel that has been set
@@ -909,11 +966,10 @@ class LadderManager:
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again."
         
         # Check if channel is actually set
-        if not is_standings_channel_set(division_type):
+        if not await run_db(is_standings_channel_set, division_type):
             return f"❌ The standings channel for the {division_type} division has not been set yet. You can set it for specific division types by using /set_standings_channel division_type #channel-name ❌"
         else:
-            self.periodic_update_standings.stop()
-            db_clear_standings_channel(division_type)
+            await run_db(db_clear_standings_channel, division_type)
             return f"🛑 The standings channel for the {division_type} division has been cleared. 🛑"
     
     async def set_challenges_channel(self, division_type: str, channel: discord.TextChannel):
@@ -926,25 +982,20 @@ class LadderManager:
         if not is_valid_division_type(division_type):
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again using 1v1, 2v2, or 3v3 after /set_challenges_channel\n\tExample: /set_challenges_channel 3v3 #3v3-challenges ❌"
         
-        db_clear_challenges_channel(division_type)
+        await run_db(db_clear_challenges_channel, division_type)
         
         # Grabs channel's integer ID
         channel_id = channel.id
 
         # Tell database to add integer to correct division type
-        db_set_challenges_channel(division_type, channel_id)
+        await run_db(db_set_challenges_channel, division_type, channel_id)
 
         # Init or update the challenges message in the channel
         await self.update_challenges_message(division_type, channel)
 
-        try:
-            self.periodic_update_challenges.restart()
-        except Exception as e:
-            print(f"Error starting periodic update task: {e}")
-
         return f"⚔️ The {division_type} challenges channel has been set to #{channel.mention}. ⚔️"
     
-    def clear_challenges_channel(self, division_type: str):
+    async def clear_challenges_channel(self, division_type: str):
         """
         Admin method to clear a division's challenges
         channel that has been set
@@ -954,11 +1005,10 @@ class LadderManager:
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again."
         
         # Check if channel is actually set
-        if not is_challenges_channel_set(division_type):
+        if not await run_db(is_challenges_channel_set, division_type):
             return f"❌ The challenges channel for the {division_type} division has not been set yet. You can set it for specific division types by using /set_challenges_channel division_type #channel-name ❌"
         else:
-            self.periodic_update_challenges.stop()
-            db_clear_challenges_channel(division_type)
+            await run_db(db_clear_challenges_channel, division_type)
             return f"🛑 The challenges channel for the {division_type} division has been cleared. 🛑"
     
     async def set_teams_channel(self, division_type: str, channel: discord.TextChannel):
@@ -975,22 +1025,17 @@ class LadderManager:
         channel_id = channel.id
 
         # Clear channel for safe measure
-        db_clear_teams_channel(division_type)
+        await run_db(db_clear_teams_channel, division_type)
 
         # Tell the db to add channel id to correct division type in table
-        db_set_teams_channel(division_type, channel_id)
+        await run_db(db_set_teams_channel, division_type, channel_id)
 
         # Init or update the teams message in the channel
         await self.update_teams_message(division_type, channel)
 
-        try:
-            self.periodic_update_teams.restart()
-        except Exception as e:
-            print(f"Error starting periodic update task: {e}")
-
         return f"👥 The {division_type} teams channel has been set to #{channel.mention}. 👥"
     
-    def clear_teams_channel(self, division_type: str):
+    async def clear_teams_channel(self, division_type: str):
         """
         Admin method to clear a division's teams
         channel that has been set
@@ -1000,165 +1045,301 @@ class LadderManager:
             return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again."
         
         # Check if channel is actually set
-        if not is_teams_channel_set(division_type):
+        if not await run_db(is_teams_channel_set, division_type):
             return f"❌ The teams channel for the {division_type} division has not been set yet. You can set it for specific division types by using /set_teams_channel division_type #channel-name ❌"
         else:
-            self.periodic_update_teams.stop()
-            db_clear_teams_channel(division_type)
+            await run_db(db_clear_teams_channel, division_type)
             return f"🛑 The teams channel for the {division_type} division has been cleared. 🛑"
     
-    async def update_standings_message(self, division_type: str, channel: discord.TextChannel):
+    async def update_board_message(self, division_type: str, board: str, channel: discord.TextChannel, board_pages: list, resync: bool = False):
         """
-        Internal method used to edit the scoreboard
-        that appears in the designated division standings channel.
+        Internal method used to put a board's (page_text, content_hash)
+        pages into its channel.
 
-        If no message exists to edit, a new message is
-        created in the designated division standings channel.
+        Every page has its own message, edited directly by the ID
+        stored in the board_messages table, and only pages whose
+        content changed since their last edit are edited unless
+        resync is given. Pages the board no longer needs are deleted.
+        If a page's message is gone every later page is posted again
+        so the pages stay in order. A board with no stored messages
+        falls back to the latest message in the channel for its first
+        page if the bot posted it and it is this board, such as a board
+        posted before message IDs were stored.
         """
-        try:
-            # Get the latest message from the channel's history
-            async for message in channel.history(limit=1):
-                standings_message = message
-                break
+        stored_pages = {page: (message_id, content_hash) for page, message_id, content_hash in await run_db(get_board_pages, division_type, board)}
+
+        # Set once a page has to be posted, every later page is posted after it
+        repost_from = None
+
+        for page, (page_text, content_hash) in enumerate(board_pages):
+            message_id, stored_hash = stored_pages.get(page, (None, None))
+
+            if repost_from is None and message_id is not None:
+                if stored_hash == content_hash and not resync:
+                    continue
+
+                try:
+                    # Edit without fetching the message first
+                    await self.board_scheduler.acquire_channel(channel.id)
+                    await channel.get_partial_message(message_id).edit(content=page_text)
+                    await run_db(db_set_board_page, division_type, board, page, message_id, content_hash)
+                    continue
+                except discord.NotFound:
+                    logger.warning(f'LadderManager: Page {page + 1} of the {division_type} {board} board, message {message_id}, was not found in {channel}, posting it and every later page again.')
+
+            if repost_from is None:
+                repost_from = page
+
+                # Remove the messages of the pages that are posted again so the board is not shown twice
+                await self.delete_board_messages(channel, [stored_pages[later_page][0] for later_page in stored_pages if later_page > page])
+
+            board_message = None
+            if not stored_pages and page == 0:
+                # Get the latest message from the channel's history, skipping the bot's other replies such as the channel set confirmation
+                board_title, table_header = BOARD_FORMATS[board][0](division_type)
+                await self.board_scheduler.acquire_channel(channel.id)
+                async for message in channel.history(limit=1):
+                    if message.author == self.bot.user and message.content.startswith(board_title):
+                        board_message = message
+
+            await self.board_scheduler.acquire_channel(channel.id)
+            if board_message:
+                # Update the existing message
+                await board_message.edit(content=page_text)
             else:
-                # If no messages are found, set to None
-                standings_message = None
+                # Send a new message if none exists
+                board_message = await channel.send(content=page_text)
 
-            # Generate the standings text
-            standings_text = await self.post_standings(division_type)
+            await run_db(db_set_board_page, division_type, board, page, board_message.id, content_hash)
 
-            # Add a time stamp
+        # Delete the messages of pages the board no longer has
+        if repost_from is None:
+            await self.delete_board_messages(channel, [message_id for page, (message_id, content_hash) in stored_pages.items() if page >= len(board_pages)])
+        await run_db(db_delete_board_pages, division_type, board, len(board_pages))
+
+    async def delete_board_messages(self, channel: discord.TextChannel, message_ids: list):
+        """
+        Internal method used to delete board page
+        messages, ignoring any that are already gone
+        """
+        for message_id in message_ids:
+            try:
+                await self.board_scheduler.acquire_channel(channel.id)
+                await channel.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                pass
+
+    async def update_standings_message(self, division_type: str, channel: discord.TextChannel, resync: bool = False):
+        """
+        Internal method used to edit the scoreboard
+        that appears in the designated division standings channel.
+
+        The board is rendered into pages that fit in a message by
+        the BoardRenderer and queued on the BoardScheduler, and if
+        no message exists to edit, a new message is created in the
+        designated channel.
+        """
+        # Version of the board this edit will show
+        board_version = self.state_cache.get_board_version(division_type, 'standings')
+
+        try:
+            # Generate the standings pages with a time stamp on the last page
             time_stamp = await add_time_stamp()
-            standings_text += time_stamp
+            standings_pages = self.board_renderer.render(division_type, 'standings', self.state_cache.get_standings_data(division_type), time_stamp)
 
-            if standings_message:
-                # Update the existing message in the given division standings channel
-                await standings_message.edit(content=standings_text)
-            else:
-                # Send a new message if none exists in the division standings channel
-                await channel.send(content=standings_text)
+            self.board_scheduler.submit(division_type, 'standings', channel, standings_pages, board_version, resync)
 
         except Exception as e:
             # Log the exception or handle it accordingly
             print(f"An error occurred: {e}")
 
-    async def update_challenges_message(self, division_type: str, channel: discord.TextChannel):
+    async def update_challenges_message(self, division_type: str, channel: discord.TextChannel, resync: bool = False):
         """
         Internal method used to edit the challenge board
         that appears in the designated division challenges channel.
 
-        If no message exists to edit, a new message is
-        created in the designated division standings channel.
+        The board is rendered into pages that fit in a message by
+        the BoardRenderer and queued on the BoardScheduler, and if
+        no message exists to edit, a new message is created in the
+        designated channel.
         """
-        try:
-            # Get latest message from channel history
-            async for message in channel.history(limit=1):
-                challenges_message = message
-                break
-            else:
-                # If no message is found, set to None
-                challenges_message = None
-
-            challenges_text = await self.post_challenges(division_type)
+        # Version of the board this edit will show
+        board_version = self.state_cache.get_board_version(division_type, 'challenges')
 
-            # Add time stamp
+        try:
+            # Generate the challenges pages with a time stamp on the last page
             time_stamp = await add_time_stamp()
-            challenges_text += time_stamp
+            challenges_pages = self.board_renderer.render(division_type, 'challenges', self.state_cache.get_challenges_data(division_type), time_stamp)
 
-            if challenges_message:
-                # Update the existing message
-                await challenges_message.edit(content=challenges_text)
-            else:
-                # Send a new message if none exists
-                await channel.send(content=challenges_text)
+            self.board_scheduler.submit(division_type, 'challenges', channel, challenges_pages, board_version, resync)
         
         except Exception as e:
             # Log the exception or handle it accordingly
             print(f"An error occurred: {e}")
 
-    async def update_teams_message(self, division_type: str, channel: discord.TextChannel):
+    async def update_teams_message(self, division_type: str, channel: discord.TextChannel, resync: bool = False):
         """
         Internal method used to edit the scoreboard
         that appears in the designated division teams channel.
 
-        If no message exists to edit, a new message is
-        created in the designated division standings channel.
+        The board is rendered into pages that fit in a message by
+        the BoardRenderer and queued on the BoardScheduler, and if
+        no message exists to edit, a new message is created in the
+        designated channel.
         """
-        try:
-            # Get the latest message from the channel's history
-            async for message in channel.history(limit=1):
-                standings_message = message
-                break
-            else:
-                # If no messages are found, set to None
-                standings_message = None
-
-            # Generate the standings text
-            teams_text = await self.post_teams(division_type)
+        # Version of the board this edit will show
+        board_version = self.state_cache.get_board_version(division_type, 'teams')
 
-            # Add a time stamp
+        try:
+            # Generate the teams pages with a time stamp on the last page
             time_stamp = await add_time_stamp()
-            teams_text += time_stamp
+            teams_pages = self.board_renderer.render(division_type, 'teams', self.state_cache.get_teams_data(division_type), time_stamp)
 
-            if standings_message:
-                # Update the existing message in the given division standings channel
-                await standings_message.edit(content=teams_text)
-            else:
-                # Send a new message if none exists in the division standings channel
-                await channel.send(content=teams_text)
+            self.board_scheduler.submit(division_type, 'teams', channel, teams_pages, board_version, resync)
 
         except Exception as e:
             # Log the exception or handle it accordingly
             print(f"An error occurred: {e}")
         
-    @tasks.loop(seconds=15)
-    async def periodic_update_standings(self):
+    async def edit_board(self, division_type: str, board: str, channel: discord.TextChannel, board_pages: list, board_version: int, resync: bool = False):
         """
-        Internal task method that will update
-        the separate scoreboard that appears in the
-        designated division standings channel every 15 seconds.
+        Internal method used by the BoardScheduler to put
+        a board into its channel and record the version
+        of the board that the channel now shows
         """
-        for division_type in VALID_DIVISION_TYPES:
-            channel_id = get_standings_channel_id(division_type)
-            if channel_id:
-                channel = self.bot.get_channel(channel_id)
-                if isinstance(channel, discord.TextChannel):
-                    await self.update_standings_message(division_type, channel)
-    
-    @tasks.loop(seconds=15)
-    async def periodic_update_challenges(self):
+        await self.update_board_message(division_type, board, channel, board_pages, resync)
+
+        self.published_board_versions[(division_type, board)] = board_version
+
+    def is_board_outdated(self, division_type: str, board: str):
         """
-        Internal task method that will update
-        the separate challenges that appears in the
-        designated division standings channel every 15 seconds.
+        Checks if a division's board has changed
+        since it was last edited into its channel
         """
-        for division_type in VALID_DIVISION_TYPES:
-            channel_id = get_challenges_channel_id(division_type)
-            if channel_id:
-                channel = self.bot.get_channel(channel_id)
-                if isinstance(channel, discord.TextChannel):
-                    await self.update_challenges_message(division_type, channel)
-    
-    @tasks.loop(seconds=15)
-    async def periodic_update_teams(self):
+        return self.published_board_versions.get((division_type, board)) != self.state_cache.get_board_version(division_type, board)
+
+    async def publish_board(self, division_type: str, board: str, force: bool = False):
+        """
+        Internal method used by the BoardPublisher to edit
+        one division's board into its channel if the channel
+        is set. Unless force is given the board is skipped
+        when it has not changed since it was last edited.
+        """
+        if not force and not self.is_board_outdated(division_type, board):
+            return
+
+        get_channel_id, update_message = {
+            'standings': (get_standings_channel_id, self.update_standings_message),
+            'challenges': (get_challenges_channel_id, self.update_challenges_message),
+            'teams': (get_teams_channel_id, self.update_teams_message)
+        }[board]
+
+        channel_id = await run_db(get_channel_id, division_type)
+        if channel_id:
+            channel = self.bot.get_channel(channel_id)
+            if isinstance(channel, discord.TextChannel):
+                await update_message(division_type, channel, force)
+
+    @tasks.loop(minutes=BOARD_RESYNC_MINUTES)
+    async def periodic_resync_boards(self):
         """
-        Internal task method that will update
-        the separate scoreboard that appears in the
-        designated division standings channel every 15 seconds.
+        Internal task method that republishes every board
+        as a safety net in case a board message was deleted
+        or an edit failed. Boards are otherwise published by
+        the BoardPublisher as soon as they change.
         """
         for division_type in VALID_DIVISION_TYPES:
-            channel_id = get_teams_channel_id(division_type)
-            if channel_id:
-                channel = self.bot.get_channel(channel_id)
-                if isinstance(channel, discord.TextChannel):
-                    await self.update_teams_message(division_type, channel)
-    
-    def request_my_stats_report(self, ctx):
+            self.board_publisher.notify(division_type, *BOARD_TYPES, force=True)
+
+    @tasks.loop(seconds=RANK_MATERIALIZE_SECONDS)
+    async def periodic_materialize_ranks(self):
+        """
+        Internal task method that writes the rank changes
+        commands logged since the last run to the rank column
+        in one batch and spreads out the rank keys of sparse
+        divisions that are running out of room. The ladder
+        engine already has every change, this only brings the
+        SQLite copy up to date.
+        """
+        try:
+            change_count = await run_db(db_materialize_ranks)
+            if change_count:
+                logger.info(f'LadderManager: Materialized {change_count} rank changes to the database.')
+
+            for division_type in await run_db(db_rebalance_rank_keys):
+                logger.info(f'LadderManager: Rebalanced the rank keys of the {division_type} division.')
+        except Exception as e:
+            logger.error(f'LadderManager: Failed to materialize rank changes. Error: {e}')
+
+    def board_queue_stats(self):
+        """
+        Admin method that reports the board
+        scheduler's queue depth and wait times
+        """
+        stats = self.board_scheduler.get_stats()
+
+        logger.info(f'LadderManager: "board_queue_stats" reported {stats}')
+        return (
+            f"📋 Board edits waiting: {stats['queue_depth']} (most at once: {stats['max_queue_depth']}, oldest waiting {stats['oldest_wait_seconds']:.1f}s)\n"
+            f"Wait before an edit: {stats['average_wait_seconds']:.1f}s average, {stats['max_wait_seconds']:.1f}s longest\n"
+            f"Edits: {stats['sent']} sent, {stats['failed']} failed, {stats['coalesced']} merged into a newer edit, {stats['rate_limited']} waits for a channel rate limit 📋"
+        )
+
+    async def verify_state_cache(self):
+        """
+        Admin method that compares the state cache
+        to the database and reports any difference
+        """
+        # Every division is locked so no change is in the database but not yet in the cache
+        async with contextlib.AsyncExitStack() as stack:
+            for division_type in VALID_DIVISION_TYPES:
+                await stack.enter_async_context(self.division_locks[division_type])
+
+            # A fresh copy is loaded on the database thread and compared here
+            database_state = LadderStateCache()
+            await run_db(database_state.load)
+            differences = self.state_cache.verify_against_database(database_state)
+
+            if not differences:
+                logger.info('LadderManager: "verify_state_cache" found the state cache matches the database.')
+                return "✅ The ladder state cache matches the database. ✅"
+
+            for difference in differences:
+                logger.error(f'LadderManager: "verify_state_cache" found a difference between the state cache and the database. {difference}')
+
+            # Take the state from the database so the cache is correct again
+            self.state_cache.load_from(database_state)
+        return f"❌ Found {len(differences)} difference(s) between the ladder state cache and the database. The cache has been reloaded from the database, check the log for details. ❌"
+
+    async def set_rank_mode(self, division_type: str, rank_mode: str):
+        """
+        Admin method to choose how a division stores its
+        ranks in the database, dense ranks or sparse rank keys
+        """
+        if not is_valid_division_type(division_type):
+            logger.error(f'LadderManager: Wrong division type given for "set_rank_mode". User entered: {division_type}')
+            return "❌ Please enter 1v1 2v2 or 3v3 for the division type and try again. ❌"
+
+        if rank_mode not in VALID_RANK_MODES:
+            logger.error(f'LadderManager: Wrong rank mode given for "set_rank_mode". User entered: {rank_mode}')
+            return "❌ Please enter dense or sparse for the rank mode and try again. ❌"
+
+        async with self.division_locks[division_type]:
+            if await run_db(get_rank_mode, division_type) == rank_mode:
+                logger.error(f'LadderManager: The division already uses the given rank mode for "set_rank_mode". division_type={division_type} rank_mode={rank_mode}')
+                return f"❌ The {division_type} division already stores {rank_mode} ranks. ❌"
+
+            # The ranks themselves do not change, only how the database stores them
+            await run_db(db_set_rank_mode, division_type, rank_mode)
+            logger.info(f'LadderManager: Successfully changed the rank mode with "set_rank_mode". division_type={division_type} rank_mode={rank_mode}')
+            return f"📈 The {division_type} division now stores {rank_mode} ranks. 📈"
+
+    async def request_my_stats_report(self, ctx):
         """
         Tells the StatManager to send a report
         of the caller of the my_stats command which
         is then sent back to the caller of the command
         """
         discord_id = ctx.author.id
-        my_stats_report = self.stat_manager.create_my_stats_report(discord_id)
+        my_stats_report = await run_db(self.stat_manager.create_my_stats_report, discord_id)
         return my_stats_report
\ No newline at end of file
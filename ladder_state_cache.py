@@ -0,0 +1,449 @@
+from database import get_all_teams_data, get_all_rank_changes_data, replay_rank_changes, get_all_team_members_data, get_all_challenges_data, is_ladder_running
+
+from config import VALID_DIVISION_TYPES
+
+from ladder_engine import DivisionLadder, is_rank_diff_empty
+
+from logs.logger import logger
+
+# The boards kept up to date in each division's channels
+BOARD_TYPES = ('standings', 'challenges', 'teams')
+
+class LadderStateCache:
+    """
+    In memory copy of the ladder state: every team with
+    its division, record and members, the ladder engine's
+    rank order of each division, the open challenges and
+    which divisions are running.
+
+    The LadderManager loads it once at startup and then
+    writes through it, every time a database function
+    changes the ladder the same change is applied here
+    afterwards. Reads that used to go to SQLite on every
+    command are then answered from memory.
+    """
+    def __init__(self):
+        """
+        Constructs an empty cache, call load
+        to fill it from the database
+        """
+        # Bumped every time something shown on a division's board changes
+        self.board_versions = {division_type: {board: 0 for board in BOARD_TYPES} for division_type in VALID_DIVISION_TYPES}
+
+        # Called as on_board_changed(division_type, *boards) after every bump, if set
+        self.on_board_changed = None
+
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the ladder state, the board
+        versions keep counting up
+        """
+        # team_name -> {'division', 'wins', 'losses', 'members'} in registration order
+        self.teams = {}
+
+        # The ranks of each division, kept by the ladder engine
+        self.ladders = {division_type: DivisionLadder(division_type) for division_type in VALID_DIVISION_TYPES}
+
+        # (challenger_team, challenged_team) of each division in the order they were made
+        self.challenges = {division_type: [] for division_type in VALID_DIVISION_TYPES}
+
+        self.ladder_running = {division_type: False for division_type in VALID_DIVISION_TYPES}
+
+        # discord_id -> team_name of every member in each division, and display_name -> team_name
+        # of the legacy members registered without a Discord ID
+        self.member_teams = {division_type: {} for division_type in VALID_DIVISION_TYPES}
+        self.legacy_member_teams = {division_type: {} for division_type in VALID_DIVISION_TYPES}
+
+    def index_team_members(self, team_name: str):
+        """
+        Adds the team's members to its division's member indexes
+        """
+        team = self.teams[team_name]
+        for display_name, discord_id in team['members']:
+            if discord_id is None:
+                self.legacy_member_teams[team['division']][display_name] = team_name
+            else:
+                self.member_teams[team['division']][discord_id] = team_name
+
+    def unindex_team_members(self, team_name: str, team: dict):
+        """
+        Drops the team's members from its division's member indexes
+        """
+        for display_name, discord_id in team['members']:
+            index, key = (self.legacy_member_teams, display_name) if discord_id is None else (self.member_teams, discord_id)
+            if index[team['division']].get(key) == team_name:
+                del index[team['division']][key]
+
+    def bump_board_versions(self, division_type: str, *boards: str):
+        """
+        Marks the given boards of the division as changed
+        and tells the listener about it
+        """
+        for board in boards:
+            self.board_versions[division_type][board] += 1
+
+        if self.on_board_changed is not None:
+            self.on_board_changed(division_type, *boards)
+
+    def get_board_version(self, division_type: str, board: str):
+        """
+        Returns the current version of a division's board
+        """
+        return self.board_versions[division_type][board]
+
+    def load(self):
+        """
+        Fills the cache from the database,
+        replacing anything already in it
+
+        Only reads, rank changes still in the log are
+        replayed on the ranks here instead of materialized
+        """
+        self.reset()
+
+        ranks = {division_type: {} for division_type in VALID_DIVISION_TYPES}
+        for team_name, division_type, rank, wins, losses in get_all_teams_data():
+            self.teams[team_name] = {'division': division_type, 'wins': wins, 'losses': losses, 'members': []}
+            ranks[division_type][team_name] = rank
+
+        rank_changes = {division_type: [] for division_type in VALID_DIVISION_TYPES}
+        for division_type, *rank_change in get_all_rank_changes_data():
+            rank_changes[division_type].append(rank_change)
+
+        for team_name, display_name, discord_id in get_all_team_members_data():
+            self.teams[team_name]['members'].append((display_name, discord_id))
+
+        for team_name in self.teams:
+            self.index_team_members(team_name)
+
+        for division_type in VALID_DIVISION_TYPES:
+            division_ranks = replay_rank_changes(ranks[division_type], rank_changes[division_type])
+            self.ladders[division_type] = DivisionLadder(division_type, sorted(division_ranks, key=division_ranks.get))
+            self.ladder_running[division_type] = is_ladder_running(division_type)
+
+        for division_type, challenger_team, challenged_team, created_at in get_all_challenges_data():
+            self.challenges[division_type].append((challenger_team, challenged_team))
+
+        # Anything published before the load has to be redone
+        for division_type in VALID_DIVISION_TYPES:
+            self.bump_board_versions(division_type, *BOARD_TYPES)
+
+        logger.info(f'LadderStateCache: Loaded {len(self.teams)} teams and {sum(len(challenges) for challenges in self.challenges.values())} challenges from the database.')
+
+    def load_from(self, database_state: 'LadderStateCache'):
+        """
+        Replaces the ladder state with that of a fresh
+        copy loaded from the database, such as one loaded
+        on the database thread
+        """
+        self.teams = database_state.teams
+        self.ladders = database_state.ladders
+        self.challenges = database_state.challenges
+        self.ladder_running = database_state.ladder_running
+        self.member_teams = database_state.member_teams
+        self.legacy_member_teams = database_state.legacy_member_teams
+
+        # Anything published before the load has to be redone
+        for division_type in VALID_DIVISION_TYPES:
+            self.bump_board_versions(division_type, *BOARD_TYPES)
+
+    def verify_against_database(self, database_state: 'LadderStateCache'):
+        """
+        Compares the cache to a fresh copy of the
+        ladder state loaded from the database
+
+        Returns:
+            list: A description of every difference found, empty if the cache matches.
+        """
+        differences = []
+
+        for team_name in self.teams.keys() | database_state.teams.keys():
+            cached_team = self.teams.get(team_name)
+            database_team = database_state.teams.get(team_name)
+            if cached_team != database_team:
+                differences.append(f"Team {team_name}: cache={cached_team} database={database_team}")
+
+        for division_type in VALID_DIVISION_TYPES:
+            cached_ranking = self.ladders[division_type].get_ranking()
+            database_ranking = database_state.ladders[division_type].get_ranking()
+            if cached_ranking != database_ranking:
+                differences.append(f"{division_type} rankings: cache={cached_ranking} database={database_ranking}")
+            if self.challenges[division_type] != database_state.challenges[division_type]:
+                differences.append(f"{division_type} challenges: cache={self.challenges[division_type]} database={database_state.challenges[division_type]}")
+            if self.ladder_running[division_type] != database_state.ladder_running[division_type]:
+                differences.append(f"{division_type} ladder_running: cache={self.ladder_running[division_type]} database={database_state.ladder_running[division_type]}")
+            if (self.member_teams[division_type], self.legacy_member_teams[division_type]) != (database_state.member_teams[division_type], database_state.legacy_member_teams[division_type]):
+                differences.append(f"{division_type} member index: cache={self.member_teams[division_type]} {self.legacy_member_teams[division_type]} database={database_state.member_teams[division_type]} {database_state.legacy_member_teams[division_type]}")
+
+        return differences
+
+    # NOTE: READS
+
+    def does_team_exist(self, team_name: str):
+        """
+        Checks if a team exists in any division
+        """
+        return team_name in self.teams
+
+    def is_team_name_unique(self, team_name: str):
+        """
+        Checks no team in any division uses the name
+        """
+        return team_name not in self.teams
+
+    def check_team_division(self, team_name: str):
+        """
+        Returns the division the team is in
+        """
+        return self.teams[team_name]['division']
+
+    def get_ladder(self, division_type: str):
+        """
+        Returns the ladder engine's model of the division,
+        plan rank changes on it and apply them here
+        """
+        return self.ladders[division_type]
+
+    def give_team_rank(self, team_name: str):
+        """
+        Returns the rank of the team or None if it does not exist
+        """
+        team = self.teams.get(team_name)
+        return self.ladders[team['division']].rank_of(team_name) if team else None
+
+    def get_wins_or_losses(self, team_name: str, wins_or_losses: bool):
+        """
+        True to grab wins, False to grab losses
+        """
+        return self.teams[team_name]['wins' if wins_or_losses else 'losses']
+
+    def count_teams(self, division_type: str):
+        """
+        Returns the amount of teams in the division
+        """
+        return len(self.ladders[division_type])
+
+    def is_ladder_running(self, division_type: str):
+        """
+        Checks if the ladder is running in the division
+        """
+        return self.ladder_running[division_type]
+
+    def get_team_members(self, team_name: str):
+        """
+        Returns the (display_name, discord_id) of every
+        member on the team or None if there are none
+        """
+        team = self.teams.get(team_name)
+        return list(team['members']) if team and team['members'] else None
+
+    def is_member_on_team(self, discord_id: int, team_name: str, display_name: str = None):
+        """
+        Checks if a Discord ID is on the team, the display name
+        is only matched against members without a Discord ID
+        """
+        team = self.teams.get(team_name)
+        return team is not None and any(
+            member_id == discord_id or (member_id is None and member_name == display_name)
+            for member_name, member_id in team['members']
+        )
+
+    def is_member_registered(self, division_type: str, discord_id: int, display_name: str = None):
+        """
+        Checks if a Discord ID is on any team in the division, the
+        display name is only matched against members without a Discord ID
+        """
+        return discord_id in self.member_teams[division_type] or display_name in self.legacy_member_teams[division_type]
+
+    def is_team_challenged(self, team_name: str):
+        """
+        Checks if the team has been challenged
+        """
+        team = self.teams.get(team_name)
+        return team is not None and any(challenged == team_name for challenger, challenged in self.challenges[team['division']])
+
+    def has_team_challenged(self, team_name: str):
+        """
+        Checks if the team has sent out a challenge
+        """
+        team = self.teams.get(team_name)
+        return team is not None and any(challenger == team_name for challenger, challenged in self.challenges[team['division']])
+
+    def find_opponent_team(self, team_name: str):
+        """
+        Returns who the team is facing or None
+        """
+        team = self.teams.get(team_name)
+        if team is None:
+            return None
+
+        for challenger, challenged in self.challenges[team['division']]:
+            if challenger == team_name:
+                return challenged
+            if challenged == team_name:
+                return challenger
+
+        return None
+
+    def get_challenge_eligibility(self, challenger_team: str, challenged_team: str, author_id: int = None, author_display_name: str = None):
+        """
+        Gathers every fact needed to validate a challenge
+        between two teams, answered from memory, including
+        whether the ladder engine puts the challenged team
+        in the challenger's window.
+
+        author_id is the Discord ID of the command caller, checked
+        against the challenger team, author_display_name is only
+        matched against members without a Discord ID. Division, rank
+        and challenge facts are None or False for a missing team.
+        """
+        challenger = self.teams.get(challenger_team)
+        challenged = self.teams.get(challenged_team)
+        same_division = challenger is not None and challenged is not None and challenger['division'] == challenged['division']
+
+        return {
+            'challenger_exists': challenger is not None,
+            'challenger_division': challenger['division'] if challenger else None,
+            'challenger_rank': self.give_team_rank(challenger_team),
+            'challenger_is_challenged': self.is_team_challenged(challenger_team),
+            'challenger_has_challenged': self.has_team_challenged(challenger_team),
+            'challenged_exists': challenged is not None,
+            'challenged_division': challenged['division'] if challenged else None,
+            'challenged_rank': self.give_team_rank(challenged_team),
+            'challenged_is_challenged': self.is_team_challenged(challenged_team),
+            'challenged_has_challenged': self.has_team_challenged(challenged_team),
+            'author_on_challenger_team': author_id is not None and self.is_member_on_team(author_id, challenger_team, author_display_name),
+            'in_challenge_window': same_division and self.ladders[challenger['division']].can_challenge(challenger_team, challenged_team),
+            'ladder_running': self.ladder_running[challenger['division']] if challenger else False
+        }
+
+    def get_standings_data(self, division_type: str):
+        """
+        Same rows as get_standings_data in the database:
+        (team_name, rank, wins, losses) in rank order
+        """
+        return [(team_name, rank, self.teams[team_name]['wins'], self.teams[team_name]['losses']) for rank, team_name in enumerate(self.ladders[division_type], start=1)]
+
+    def get_challenges_data(self, division_type: str):
+        """
+        Same rows as get_challenges_data in the database
+        """
+        return list(self.challenges[division_type])
+
+    def get_teams_data(self, division_type: str):
+        """
+        Same rows as get_teams_data in the database:
+        (team_name, members string) in registration order
+        """
+        return [
+            (team_name, ", ".join(display_name for display_name, discord_id in team['members']) or None)
+            for team_name, team in self.teams.items() if team['division'] == division_type
+        ]
+
+    # NOTE: WRITES, call each one only after the matching database write succeeded
+
+    def register_team(self, division_type: str, team_name: str, members: list, rank_diff: dict):
+        """
+        Adds the team at the bottom of its division
+        with the ladder engine's plan for it
+        """
+        self.ladders[division_type].apply(rank_diff)
+
+        self.teams[team_name] = {'division': division_type, 'wins': 0, 'losses': 0, 'members': list(members)}
+        self.index_team_members(team_name)
+        self.bump_board_versions(division_type, 'standings', 'teams')
+
+    def remove_team(self, team_name: str, rank_diff: dict):
+        """
+        Removes the team, applies the ladder engine's plan
+        that closes the gap in the ranks and drops its
+        challenges like the ON DELETE CASCADE does
+        """
+        team = self.teams.pop(team_name)
+        division_type = team['division']
+        self.unindex_team_members(team_name, team)
+
+        self.ladders[division_type].apply(rank_diff)
+
+        self.remove_team_challenges(team_name, division_type)
+        self.bump_board_versions(division_type, 'standings', 'teams')
+
+    def apply_rank_diff(self, division_type: str, rank_diff: dict):
+        """
+        Applies a rank change planned on the division's ladder,
+        such as moving a team with the set rank command
+        """
+        self.ladders[division_type].apply(rank_diff)
+        self.bump_board_versions(division_type, 'standings')
+
+    def add_team_wins_losses(self, team_name: str, win: bool):
+        """
+        Adds a win with True, a loss with False
+        """
+        self.teams[team_name]['wins' if win else 'losses'] += 1
+        self.bump_board_versions(self.teams[team_name]['division'], 'standings')
+
+    def subtract_team_wins_losses(self, team_name: str, win_or_loss: bool):
+        """
+        Subtracts a win with True, a loss with False
+        """
+        self.teams[team_name]['wins' if win_or_loss else 'losses'] -= 1
+        self.bump_board_versions(self.teams[team_name]['division'], 'standings')
+
+    def report_match(self, winning_team: str, losing_team: str, rank_diff: dict):
+        """
+        Mirrors db_report_match: the ladder engine's plan for the
+        match is applied, both records are updated and the
+        challenge between the teams is removed
+        """
+        if not is_rank_diff_empty(rank_diff):
+            self.apply_rank_diff(self.teams[winning_team]['division'], rank_diff)
+
+        self.add_team_wins_losses(winning_team, win=True)
+        self.add_team_wins_losses(losing_team, win=False)
+
+        self.remove_team_challenges(winning_team)
+
+    def add_challenge(self, division_type: str, challenger_team: str, challenged_team: str):
+        """
+        Adds a challenge to the end of the division
+        """
+        self.challenges[division_type].append((challenger_team, challenged_team))
+        self.bump_board_versions(division_type, 'challenges')
+
+    def remove_challenge(self, division_type: str, challenger_team: str):
+        """
+        Removes the challenge sent by challenger_team
+        """
+        self.challenges[division_type] = [challenge for challenge in self.challenges[division_type] if challenge[0] != challenger_team]
+        self.bump_board_versions(division_type, 'challenges')
+
+    def remove_team_challenges(self, team_name: str, division_type: str = None):
+        """
+        Removes every challenge the team is in
+        on either side
+        """
+        division_type = division_type or self.teams[team_name]['division']
+        self.challenges[division_type] = [challenge for challenge in self.challenges[division_type] if team_name not in challenge]
+        self.bump_board_versions(division_type, 'challenges')
+
+    def clear_division(self, division_type: str):
+        """
+        Removes every team and challenge in the division
+        """
+        for team_name in self.ladders[division_type]:
+            del self.teams[team_name]
+
+        self.ladders[division_type] = DivisionLadder(division_type)
+        self.challenges[division_type] = []
+        self.member_teams[division_type] = {}
+        self.legacy_member_teams[division_type] = {}
+        self.bump_board_versions(division_type, *BOARD_TYPES)
+
+    def set_ladder_running(self, division_type: str, running: bool):
+        """
+        Sets whether the division is running
+        """
+        self.ladder_running[division_type] = running
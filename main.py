@@ -5,6 +5,7 @@ import asyncio
 from logs.logger import logger
 
 from ladder_manager import LadderManager
+from database import shutdown_db_executor
 
 """
 Delete 'from my_token import MY_DISCORD_TOKEN' when manually
@@ -35,6 +36,31 @@ class Ladderbot(commands.Cog):
     async def on_ready(self):
         await self.ladder_manager.on_ready()
 
+    # Keep the member directory up to date as members come, go and change names
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.ladder_manager.member_directory.add_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.ladder_manager.member_directory.remove_member(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.ladder_manager.member_directory.update_member(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        self.ladder_manager.member_directory.update_user(after)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.ladder_manager.member_directory.build_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.ladder_manager.member_directory.remove_guild(guild)
+
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def start_ladder(self, ctx, division_type: str):
@@ -56,7 +82,7 @@ class Ladderbot(commands.Cog):
             The ladder in the 1v1 division has been started.
         """
         logger.info(f'Command "start_ladder" invoked by {ctx.author} with division_type={division_type}')
-        result = self.ladder_manager.start_ladder(division_type)
+        result = await self.ladder_manager.start_ladder(division_type)
         await ctx.send(result)
 
     @commands.command()
@@ -78,7 +104,7 @@ class Ladderbot(commands.Cog):
             5 test teams have been created in the 1v1 division.
         """
         logger.info(f'Command "create_test_teams" invoked by {ctx.author} with division_type={division_type}')
-        result = self.ladder_manager.create_test_teams(division_type)
+        result = await self.ladder_manager.create_test_teams(division_type)
         await ctx.send(result)
 
     @commands.command()
@@ -103,7 +129,8 @@ class Ladderbot(commands.Cog):
         """
         logger.info(f'Command "end_ladder" invoked by {ctx.author} with division_type={division_type}')
         result = await self.ladder_manager.end_ladder(division_type)
-        await ctx.send(result)
+        for message in result:
+            await ctx.send(message)
     
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -132,7 +159,7 @@ class Ladderbot(commands.Cog):
         """
         members_list = [member for member in members]
         logger.info(f'Command "register_team" invoked by {ctx.author} with team_name={team_name} division_type={division_type} members={members_list}')
-        result = self.ladder_manager.register_team(division_type, team_name, *members)
+        result = await self.ladder_manager.register_team(division_type, team_name, *members)
         await ctx.send(result)
     
     @commands.command()
@@ -156,7 +183,7 @@ class Ladderbot(commands.Cog):
             Team Delta from the 3v3 division has been removed from the Ladder.
         """
         logger.info(f'Command "remove_team" invoked by {ctx.author} with team_name={team_name}')
-        result = self.ladder_manager.remove_team(team_name)
+        result = await self.ladder_manager.remove_team(team_name)
         await ctx.send(result)
 
     @commands.command(aliases=['c'])
@@ -205,7 +232,7 @@ class Ladderbot(commands.Cog):
             The challenge made by Team Echo in the 3v3 division has been canceled by a team member.
         """
         logger.info(f'Command "cancel_challenge" invoked by {ctx.author} with challenger_team={challenger_team}')
-        result = self.ladder_manager.cancel_challenge(ctx, challenger_team)
+        result = await self.ladder_manager.cancel_challenge(ctx, challenger_team)
         await ctx.send(result)
     
     @commands.command()
@@ -254,7 +281,7 @@ class Ladderbot(commands.Cog):
             The challenge made by Team Echo in the 3v3 division has been canceled by an Administrator.
         """
         logger.info(f'Command "admin_cancel_challenge" invoked by {ctx.author} with challenger_team={challenger_team}')
-        result = self.ladder_manager.admin_cancel_challenge(challenger_team)
+        result = await self.ladder_manager.admin_cancel_challenge(challenger_team)
         await ctx.send(result)
     
     @commands.command()
@@ -334,7 +361,7 @@ class Ladderbot(commands.Cog):
             Team Alpha has been assigned to the rank of 1 in the 1v1 division.
         """
         logger.info(f'Command "set_rank" invoked by {ctx.author} with team_name={team_name} new_rank={new_rank}')
-        result = self.ladder_manager.set_rank(team_name, new_rank)
+        result = await self.ladder_manager.set_rank(team_name, new_rank)
         await ctx.send(result)
 
     @commands.command()
@@ -358,7 +385,7 @@ class Ladderbot(commands.Cog):
             Team Alpha has been given a win by an Administrator.
         """
         logger.info(f'Command "add_win" invoked by {ctx.author} with team_name={team_name}')
-        result = self.ladder_manager.add_win(team_name)
+        result = await self.ladder_manager.add_win(team_name)
         await ctx.send(result)
     
     @commands.command()
@@ -382,7 +409,7 @@ class Ladderbot(commands.Cog):
             Team Bravo has had a win taken away by an Administrator. They now have 5 wins.
         """
         logger.info(f'Command "subtract_win" invoked by {ctx.author} with team_name={team_name}')
-        result = self.ladder_manager.subtract_win(team_name)
+        result = await self.ladder_manager.subtract_win(team_name)
         await ctx.send(result)
 
     @commands.command()
@@ -406,7 +433,7 @@ class Ladderbot(commands.Cog):
             Team Delta has been given a loss by an Administrator.
         """
         logger.info(f'Command "add_loss" invoked by {ctx.author} with team_name={team_name}')
-        result = self.ladder_manager.add_loss(team_name)
+        result = await self.ladder_manager.add_loss(team_name)
         await ctx.send(result)
 
     @commands.command()
@@ -430,7 +457,7 @@ class Ladderbot(commands.Cog):
             Team Charlie has had a loss taken away by an Administrator. They now have 2 losses.
         """
         logger.info(f'Command "subtract_loss" invoked by {ctx.author} with team_name={team_name}')
-        result = self.ladder_manager.subtract_loss(team_name)
+        result = await self.ladder_manager.subtract_loss(team_name)
         await ctx.send(result)
     
     @commands.command()
@@ -451,7 +478,8 @@ class Ladderbot(commands.Cog):
         """
         logger.info(f'Command "post_standings" invoked by {ctx.author} with division_type={division_type}')
         result = await self.ladder_manager.post_standings(division_type)
-        await ctx.send(result)
+        for message in result:
+            await ctx.send(message)
 
     @commands.command()
     async def post_challenges(self, ctx, division_type: str):
@@ -471,7 +499,8 @@ class Ladderbot(commands.Cog):
         """
         logger.info(f'Command "post_challenges" invoked by {ctx.author} with division_type={division_type}')
         result = await self.ladder_manager.post_challenges(division_type)
-        await ctx.send(result)
+        for message in result:
+            await ctx.send(message)
     
     @commands.command()
     async def post_teams(self, ctx, division_type: str):
@@ -491,7 +520,8 @@ class Ladderbot(commands.Cog):
         """
         logger.info(f'Command "post_teams" invoked by {ctx.author} with division_type={division_type}')
         result = await self.ladder_manager.post_teams(division_type)
-        await ctx.send(result)
+        for message in result:
+            await ctx.send(message)
     
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -537,7 +567,7 @@ class Ladderbot(commands.Cog):
             The standings channel for the 3v3 division has been cleared.
         """
         logger.info(f'Command "clear_standings_channel" invoked by {ctx.author} with division_type={division_type}')
-        result = self.ladder_manager.clear_standings_channel(division_type)
+        result = await self.ladder_manager.clear_standings_channel(division_type)
         await ctx.send(result)
     
     @commands.command()
@@ -587,7 +617,7 @@ class Ladderbot(commands.Cog):
             The challenges channel for the 1v1 division has been cleared.
         """
         logger.info(f'Command "clear_challenges_channel" invoked by {ctx.author} with division_type={division_type}')
-        result = self.ladder_manager.clear_challenges_channel(division_type)
+        result = await self.ladder_manager.clear_challenges_channel(division_type)
         await ctx.send(result)
     
     @commands.command()
@@ -637,9 +667,79 @@ class Ladderbot(commands.Cog):
             The challenges channel for the 1v1 division has been cleared.
         """
         logger.info(f'Command "clear_teams_channel" invoked by {ctx.author} with division_type={division_type}')
-        result = self.ladder_manager.clear_teams_channel(division_type)
+        result = await self.ladder_manager.clear_teams_channel(division_type)
         await ctx.send(result)
     
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def verify_state_cache(self, ctx):
+        """
+        Admin method to compare the in memory
+        ladder state to the database and reload
+        it if they do not match.
+
+        Args:
+            ctx (discord.ext.commands.Context): The context of the command.
+
+        Example:
+            /verify_state_cache
+
+        Output:
+            The ladder state cache matches the database.
+        """
+        logger.info(f'Command "verify_state_cache" invoked by {ctx.author}')
+        result = await self.ladder_manager.verify_state_cache()
+        await ctx.send(result)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def board_queue_stats(self, ctx):
+        """
+        Admin method to show how many board edits
+        are waiting to be sent and how long board
+        edits have waited before being sent.
+
+        Args:
+            ctx (discord.ext.commands.Context): The context of the command.
+
+        Example:
+            /board_queue_stats
+
+        Output:
+            Board edits waiting: 0 (most at once: 3, oldest waiting 0.0s)
+        """
+        logger.info(f'Command "board_queue_stats" invoked by {ctx.author}')
+        result = self.ladder_manager.board_queue_stats()
+        await ctx.send(result)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def set_rank_mode(self, ctx, division_type: str, rank_mode: str):
+        """
+        Admin method to choose how a division stores
+        its ranks in the database.
+
+        dense stores every team's rank, so moving a team
+        rewrites the ranks of the teams it passes. sparse
+        stores sortable rank keys with gaps between them,
+        so a move or a promotion only rewrites the moved
+        team. Useful for very large divisions.
+
+        Args:
+            ctx (discord.ext.commands.Context): The context of the command.
+            division_type (str): The division to change.
+            rank_mode (str): dense or sparse.
+
+        Example:
+            /set_rank_mode 1v1 sparse
+
+        Output:
+            The 1v1 division now stores sparse ranks.
+        """
+        logger.info(f'Command "set_rank_mode" invoked by {ctx.author} with division_type={division_type} rank_mode={rank_mode}')
+        result = await self.ladder_manager.set_rank_mode(division_type, rank_mode)
+        await ctx.send(result)
+
     # NOTE: STATS RELATED COMMANDS
 
     @commands.command()
@@ -652,7 +752,7 @@ class Ladderbot(commands.Cog):
         which is gained from the ctx on the call itself.
         """
         logger.info(f'Command "my_stats" invoked by {ctx.author}')
-        result = self.ladder_manager.request_my_stats_report(ctx)
+        result = await self.ladder_manager.request_my_stats_report(ctx)
         await ctx.send(result)
 
 
@@ -715,6 +815,10 @@ async def main():
     BY DOING THIS METHOD, DO NOT DELETE THE 'from my_token import MY_DISCORD_TOKEN' AT TOP OF THIS CODE
     
     """
-    await bot.start(MY_DISCORD_TOKEN)
+    try:
+        await bot.start(MY_DISCORD_TOKEN)
+    finally:
+        # Let queued database calls finish before the process exits
+        shutdown_db_executor()
 
 asyncio.run(main())
\ No newline at end of file
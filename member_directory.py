@@ -0,0 +1,119 @@
+import discord
+
+from logs.logger import logger
+
+class MemberDirectory:
+    """
+    Per guild index of members by display name and by
+    Discord ID so resolving a name or an ID is a dictionary
+    lookup instead of a scan over every member in the guild.
+
+    Built from the member cache in on_ready and then kept up
+    to date by the member join, remove and update listeners.
+    """
+    def __init__(self):
+        """
+        Constructs an empty directory
+        """
+        # guild_id -> {discord_id: member}
+        self.members_by_id = {}
+
+        # guild_id -> {display_name: {discord_id: None}}, the inner dict keeps duplicate names in the order they were indexed
+        self.ids_by_name = {}
+
+        # guild_id -> {discord_id: display_name} the member is indexed under
+        self.indexed_names = {}
+
+    def build_guild(self, guild: discord.Guild):
+        """
+        Indexes every cached member of the guild,
+        replacing any index the guild already had
+        """
+        self.members_by_id[guild.id] = {}
+        self.ids_by_name[guild.id] = {}
+        self.indexed_names[guild.id] = {}
+
+        for member in guild.members:
+            self.add_member(member)
+
+        logger.info(f'MemberDirectory: Indexed {len(self.members_by_id[guild.id])} members of guild {guild.name}.')
+
+    def remove_guild(self, guild: discord.Guild):
+        """
+        Drops the index of a guild the bot left
+        """
+        self.members_by_id.pop(guild.id, None)
+        self.ids_by_name.pop(guild.id, None)
+        self.indexed_names.pop(guild.id, None)
+
+    def add_member(self, member: discord.Member):
+        """
+        Adds a member to their guild's index
+        """
+        guild_id = member.guild.id
+        if guild_id not in self.members_by_id:
+            return
+
+        # Re-adding an indexed member moves them to their current name
+        self.remove_member(member)
+
+        self.members_by_id[guild_id][member.id] = member
+        self.ids_by_name[guild_id].setdefault(member.display_name, {})[member.id] = None
+        self.indexed_names[guild_id][member.id] = member.display_name
+
+    def remove_member(self, member: discord.Member):
+        """
+        Removes a member from their guild's index
+        """
+        guild_id = member.guild.id
+        if guild_id not in self.members_by_id:
+            return
+
+        self.members_by_id[guild_id].pop(member.id, None)
+
+        display_name = self.indexed_names[guild_id].pop(member.id, None)
+        if display_name is not None:
+            name_ids = self.ids_by_name[guild_id][display_name]
+            name_ids.pop(member.id, None)
+            if not name_ids:
+                del self.ids_by_name[guild_id][display_name]
+
+    def update_member(self, member: discord.Member):
+        """
+        Re-indexes a member whose display name may have changed
+        """
+        if self.indexed_names.get(member.guild.id, {}).get(member.id) != member.display_name:
+            self.add_member(member)
+        elif member.guild.id in self.members_by_id:
+            self.members_by_id[member.guild.id][member.id] = member
+
+    def update_user(self, user: discord.User):
+        """
+        Re-indexes the user in every guild they are in, used when
+        their global name changes which changes their display name
+        in every guild where they have no nickname
+        """
+        for guild_id, members in self.members_by_id.items():
+            member = members.get(user.id)
+            if member is not None:
+                self.update_member(member)
+
+    def has_guild(self, guild: discord.Guild):
+        """
+        Checks if the guild has been indexed
+        """
+        return guild.id in self.members_by_id
+
+    def get_member_id(self, guild: discord.Guild, display_name: str):
+        """
+        Returns the Discord ID of the member with the display name,
+        the first one indexed if several share it, or None
+        """
+        name_ids = self.ids_by_name.get(guild.id, {}).get(display_name)
+        return next(iter(name_ids)) if name_ids else None
+
+    def get_member(self, guild: discord.Guild, discord_id: int):
+        """
+        Returns the member of the guild with the Discord ID or None
+        """
+        return self.members_by_id.get(guild.id, {}).get(discord_id)
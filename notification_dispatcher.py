@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import discord
+
+from database import run_db, get_due_notifications, get_next_notification_attempt_at, db_record_notification_results
+
+from config import NOTIFICATION_MAX_CONCURRENCY, NOTIFICATION_MAX_ATTEMPTS, NOTIFICATION_RETRY_BACKOFF_SECONDS, NOTIFICATION_OUTBOX_BATCH_SIZE
+
+from logs.logger import logger
+
+class NotificationDispatcher:
+    """
+    Delivers the direct message notifications in the outbox table.
+
+    A command writes its notifications to the outbox in the same
+    transaction as its change and answers straight away. The
+    dispatcher reads the due notifications in batches and sends
+    each one in its own task, with at most max_concurrency messages
+    in flight at once. A failed send is tried again later with an
+    exponential backoff, except when Discord says the recipient can
+    not be messaged at all. Sent notifications are deleted, so after
+    a restart whatever is left in the outbox is still delivered.
+    """
+    def __init__(self, get_recipient, max_concurrency: int = NOTIFICATION_MAX_CONCURRENCY, max_attempts: int = NOTIFICATION_MAX_ATTEMPTS, backoff_seconds: float = NOTIFICATION_RETRY_BACKOFF_SECONDS, batch_size: int = NOTIFICATION_OUTBOX_BATCH_SIZE):
+        """
+        Constructs the NotificationDispatcher
+
+        Args:
+            get_recipient: Coroutine function called as get_recipient(guild_id, recipient_id) that
+                returns the member or user to message.
+            max_concurrency (int): How many messages may be sending at once.
+            max_attempts (int): How many times a message is tried before giving up.
+            backoff_seconds (float): The wait before the first retry, doubled for every retry after it.
+            batch_size (int): How many notifications are read from the outbox at a time.
+        """
+        self.get_recipient = get_recipient
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.batch_size = batch_size
+
+        # Created here, not per send, so the cap holds across the whole batch
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Set when notifications are added to the outbox so a waiting run loop looks again
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def start(self):
+        """
+        Starts the dispatcher task if it is not running
+        """
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """
+        Stops the dispatcher task, notifications not
+        sent yet stay in the outbox for the next start
+        """
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def notify(self):
+        """
+        Wakes the dispatcher after notifications
+        have been added to the outbox
+        """
+        self.wakeup.set()
+
+    async def run(self):
+        """
+        Delivers the due notifications a batch at a time, then
+        sleeps until more are added or a retry becomes due
+        """
+        while True:
+            # Cleared before reading so a notification added during the batch is not missed
+            self.wakeup.clear()
+
+            try:
+                notifications = await run_db(get_due_notifications, self.batch_size)
+                if notifications:
+                    await self.deliver(notifications)
+                    continue
+
+                next_attempt_at = await run_db(get_next_notification_attempt_at)
+            except Exception as e:
+                logger.error(f'NotificationDispatcher: Failed to read or update the outbox. Error: {e}')
+                next_attempt_at = time.time() + self.backoff_seconds
+
+            timeout = None if next_attempt_at is None else max(0, next_attempt_at - time.time())
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def deliver(self, notifications: list):
+        """
+        Sends a batch of (id, guild_id, recipient_id, message, attempts)
+        notifications concurrently and records the results in the outbox
+        """
+        results = await asyncio.gather(*(
+            self.send(guild_id, recipient_id, message)
+            for notification_id, guild_id, recipient_id, message, attempts in notifications
+        ))
+
+        sent_ids = []
+        retries = []
+        failures = []
+        now = time.time()
+
+        for (notification_id, guild_id, recipient_id, message, attempts), (status, error) in zip(notifications, results):
+            attempt = attempts + 1
+
+            if status == 'sent':
+                sent_ids.append(notification_id)
+            elif status == 'retry' and attempt < self.max_attempts:
+                backoff = self.backoff_seconds * 2 ** attempts
+                logger.warning(f'NotificationDispatcher: Attempt {attempt} to message ID {recipient_id} failed, retrying in {backoff} seconds. Error: {error}')
+                retries.append((notification_id, now + backoff, error))
+            else:
+                logger.error(f'NotificationDispatcher: Could not send a message to ID {recipient_id} after {attempt} attempt(s). Error: {error}')
+                failures.append((notification_id, error))
+
+        await run_db(db_record_notification_results, sent_ids, retries, failures)
+
+    async def send(self, guild_id: int, recipient_id: int, message: str):
+        """
+        Sends one notification. Returns ('sent', None), or
+        ('retry', error) or ('failed', error) if it failed
+        """
+        async with self.semaphore:
+            try:
+                recipient = await self.get_recipient(guild_id, recipient_id)
+                await recipient.send(message)
+            except (discord.Forbidden, discord.NotFound) as e:
+                # DMs closed or the user is gone, retrying will not help
+                return 'failed', str(e)
+            except Exception as e:
+                return 'retry', str(e)
+
+        logger.info(f'NotificationDispatcher: Sent notification to {recipient} (ID: {recipient_id}).')
+        return 'sent', None
@@ -1,6 +1,6 @@
 import discord
 
-from database import get_player_stats, increment_all_teams_count, increment_participation_count, add_division_win, add_division_loss
+from database import transaction, get_player_stats, increment_all_teams_count, increment_participation_count, add_division_win, add_division_loss, get_registered_member_ids, increment_all_teams_counts, db_register_members
 
 from utils import format_my_stats_report
 
@@ -54,4 +54,23 @@ class StatManager:
         for player stat tracking
         """
         add_division_loss(discord_id, division_type)
-    
\ No newline at end of file
+    
+
+    def register_team_members(self, members: list):
+        """
+        Batch stat tracking for a newly registered team.
+        Members not in the members table yet are added,
+        everyone else gets ONE (1) added to all_teams_count.
+
+        Takes a list of (display_name, discord_id) tuples
+        and returns the ones that were newly added.
+        """
+        # One transaction from the read to the last write, so no registration in between counts a member twice or not at all
+        with transaction():
+            registered_ids = get_registered_member_ids([discord_id for _, discord_id in members])
+            new_members = [(display_name, discord_id) for display_name, discord_id in members if discord_id not in registered_ids]
+
+            db_register_members(new_members)
+            increment_all_teams_counts(list(registered_ids))
+
+        return new_members
@@ -1,4 +1,4 @@
 from .validators import is_correct_member_size, is_valid_division_type, has_duplicate_members
-from .helpers import create_members_string, format_standings_data, format_challenges_data, format_teams_data, add_time_stamp, format_my_stats_report
+from .helpers import create_members_string, join_board, split_board_rows, get_standings_header, format_standings_row, get_challenges_header, format_challenges_row, get_teams_header, format_teams_row, add_time_stamp, format_my_stats_report
 
-__all__ = ['is_correct_member_size', 'create_members_string', 'format_standings_data', 'format_challenges_data', 'add_time_stamp', 'is_valid_division_type', 'has_duplicate_members', 'format_teams_data', 'format_my_stats_report']
\ No newline at end of file
+__all__ = ['is_correct_member_size', 'create_members_string', 'add_time_stamp', 'is_valid_division_type', 'has_duplicate_members', 'format_my_stats_report', 'join_board', 'split_board_rows', 'get_standings_header', 'format_standings_row', 'get_challenges_header', 'format_challenges_row', 'get_teams_header', 'format_teams_row']
\ No newline at end of file
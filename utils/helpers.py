@@ -1,5 +1,7 @@
 import time
 
+from config import BOARD_PAGE_CHARACTER_LIMIT
+
 def create_members_string(*members):
     """
     Formats all members given into a CSV string
@@ -13,75 +15,106 @@ def create_members_string(*members):
     
     return display_names
 
-def format_standings_data(division_type: str, raw_standings_data):
+def join_board(title: str, table_header: str, rows: list, footer: str = ""):
+    """
+    Puts a board's title, table header, rows
+    and footer together into one message
+    """
+    return title + "```\n" + table_header + "\n".join(rows) + "\n```" + footer
+
+def split_board_rows(title: str, table_header: str, rows: list, footer: str = "", page_limit: int = BOARD_PAGE_CHARACTER_LIMIT):
+    """
+    Splits a board's rows into the rows of each page so
+    every page fits in one Discord message once joined
+    with join_board. The title is only on the first page
+    and the footer only on the last.
+    """
+    pages_rows = []
+    page_rows = []
+    page_length = 0
+
+    for row in rows:
+        # The title is only counted on the first page, the footer is counted on every page since any page could be the last
+        page_title = "" if pages_rows else title
+        page_base_length = len(join_board(page_title, table_header, [], footer))
+        row_length = len(row) + (1 if page_rows else 0)
+
+        if page_rows and page_base_length + page_length + row_length > page_limit:
+            pages_rows.append(page_rows)
+            page_rows = []
+            page_length = 0
+            row_length = len(row)
+
+        page_rows.append(row)
+        page_length += row_length
+
+    pages_rows.append(page_rows)
+
+    return pages_rows
+
+def get_standings_header(division_type: str):
     """
-    Formats standings data from a division
-    for post_standings into something
-    prettier than what comes directly from
-    the database
+    Returns the (title, table_header)
+    of a division's standings board
     """
-    # Prepare the standings message
-    header = f"🏆 **{division_type.upper()} Division Standings** 🏆\n"
-    header += "```\n"
-    header += "| Rank | Team Name                 | Wins | Losses |\n"
-    header += "|------|---------------------------|------|--------|\n"
+    title = f"🏆 **{division_type.upper()} Division Standings** 🏆\n"
+    table_header = "| Rank | Team Name                 | Wins | Losses |\n"
+    table_header += "|------|---------------------------|------|--------|\n"
 
-    standings_lines = [
+    return title, table_header
+
+def format_standings_row(team_name: str, rank: int, wins: int, losses: int):
+    """
+    Formats one team's row of the standings board
+    """
+    return (
         f"| {rank:<4} | {team_name:<23}   | {wins:<4} | {losses:<6} |"
         "\n|------|---------------------------|------|--------|"
-        for team_name, rank, wins, losses in raw_standings_data
-    ]
+    )
 
-    standings_message = header + "\n".join(standings_lines) + "\n```"
+def get_challenges_header(division_type: str):
+    """
+    Returns the (title, table_header)
+    of a division's challenges board
+    """
+    title = f"⚔️ **{division_type.upper()} Division Challenges** ⚔️\n"
+    table_header = "| Challenger              | Challenged              |\n"
+    table_header += "|-------------------------|-------------------------|\n"
 
-    return standings_message
+    return title, table_header
 
-def format_challenges_data(division_type: str, raw_challenges_data):
+def format_challenges_row(challenger: str, challenged: str):
     """
-    Formats raw challenges data for
-    a given division type into
-    something pretty for post_challenges
+    Formats one challenge's row of the challenges board
     """
-    # Prepare the challenges message
-    header = f"⚔️ **{division_type.upper()} Division Challenges** ⚔️\n"
-    header += "```\n"
-    header += "| Challenger              | Challenged              |\n"
-    header += "|-------------------------|-------------------------|\n"
-
-    challenges_lines = [
+    return (
         f"| {challenger:<23} | {challenged:<23} |"
         "\n|-------------------------|-------------------------|"
-        for challenger, challenged in raw_challenges_data
-    ]
+    )
 
-    challenges_message = header + "\n".join(challenges_lines) + "\n```"
-
-    return challenges_message
-
-def format_teams_data(division_type: str, raw_teams_data):
+def get_teams_header(division_type: str):
     """
-    Formats raw teams data for a given division type
-    into something pretty for display in the teams channel.
+    Returns the (title, table_header)
+    of a division's teams board
     """
+    title = f"👥 **{division_type.upper()} Division Teams** 👥\n"
+    table_header = "| Team Name                 | Members                            \n"
+    table_header += "|---------------------------|------------------------------------\n"
 
-    # Prepare the teams message
-    header = f"👥 **{division_type.upper()} Division Teams** 👥\n"
-    header += "```\n"
-    header += "| Team Name                 | Members                            \n"
-    header += "|---------------------------|------------------------------------\n"
+    return title, table_header
 
+def format_teams_row(team_name: str, members: str):
+    """
+    Formats one team's row of the teams board,
+    members is None for a team without members
+    """
     # Calculate the max width for the members column
     members_col_width = 32  # Adjust this value as needed
 
-    teams_lines = [
-        f"| {team_name:<23}   | {members:<{members_col_width}} "
+    return (
+        f"| {team_name:<23}   | {members or '':<{members_col_width}} "
         "\n|---------------------------|------------------------------------"
-        for team_name, members in raw_teams_data
-    ]
-
-    teams_message = header + "\n".join(teams_lines) + "\n```"
-
-    return teams_message
+    )
 
 async def add_time_stamp():
     """